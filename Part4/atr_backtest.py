@@ -0,0 +1,822 @@
+import itertools
+import os
+
+import pandas as pd
+import numpy as np
+
+import atr_kernel
+
+# 진입/청산 사유 코드 (배열 커널 내부용)
+_EXIT_REASONS = {1: 'stop_loss', 2: 'take_profit', 3: 'end_of_period'}
+
+
+def calculate_atr(df, period=14):
+    """
+    ATR (Average True Range) 계산
+
+    Parameters:
+    - df: DataFrame with 'high', 'low', 'close' columns
+    - period: ATR 계산 기간 (기본 14)
+
+    Returns:
+    - Series: ATR values
+    """
+    # 전일 기준 True Range의 단순이동평균 (atr_kernel의 배열 연산 사용)
+    return atr_kernel.calculate_atr(df, period=period, method='sma', lagged=True)
+
+
+def backtest_atr_strategy(ticker, df, initial_capital=100000,
+                         atr_entry_multiplier=0.5,  # ATR의 몇 배 이상 움직이면 매수
+                         stop_loss_atr=1.5,         # 손절선: ATR의 몇 배
+                         take_profit_atr=3.0,       # 익절선: ATR의 몇 배
+                         position_size_atr=2.0,     # 포지션 사이징: 자본금의 2%를 ATR 1배로 나눔
+                         commission_rate=0.001,     # 거래수수료 0.1%
+                         slippage_rate=0.001,      # 슬리피지 0.1%
+                         atr_period=14,            # ATR 계산 기간
+                         capital_ratio=0.5,
+                         position_sizing=0.02,
+                         engine='numpy'):
+    """
+    ATR 기반 변동성 돌파 전략 백테스트
+
+    매수 조건 (현실적인 접근):
+    1. 어제 ATR 기반으로 오늘 변동성 돌파 가격 설정
+    2. 돌파가격 = 오늘 시가 + (어제 ATR * multiplier)
+    3. 오늘 고가가 돌파가격을 상향 돌파하면 매수
+
+    포지션 사이징:
+    - 리스크 = 자본금의 2%
+    - 포지션 크기 = 리스크 / (ATR * stop_loss_atr)
+
+    청산 조건:
+    1. 손절: 매수가 - (ATR * stop_loss_atr)
+    2. 익절: 매수가 + (ATR * take_profit_atr)
+
+    Parameters:
+    - engine: 계산 엔진 (기본 'numpy')
+        'numpy' - 진입/청산 시점만 찾아가는 배열 커널 (결과 동일)
+        'python' - 08_01 노트북의 일별 루프
+
+    Returns:
+    - trades_df: 거래 내역 DataFrame
+    - portfolio_df: 일별 포트폴리오 DataFrame
+    """
+    params = dict(initial_capital=initial_capital, atr_entry_multiplier=atr_entry_multiplier,
+                  stop_loss_atr=stop_loss_atr, take_profit_atr=take_profit_atr,
+                  commission_rate=commission_rate, slippage_rate=slippage_rate,
+                  capital_ratio=capital_ratio, position_sizing=position_sizing)
+
+    if engine == 'python':
+        return _backtest_atr_python(ticker, df, atr_period=atr_period, **params)
+
+    df = df.copy()  # 원본 데이터프레임 보호
+    df['atr'] = calculate_atr(df, period=atr_period)
+    inputs = _prepare_atr_inputs(df)
+    state = _run_atr_kernel(inputs, **params)
+    return _build_atr_frames(ticker, df, inputs, state, initial_capital)
+
+
+def _backtest_atr_python(ticker, df, initial_capital=100000, atr_entry_multiplier=0.5,
+                         stop_loss_atr=1.5, take_profit_atr=3.0, commission_rate=0.001,
+                         slippage_rate=0.001, atr_period=14, capital_ratio=0.5, position_sizing=0.02):
+    """08_01 노트북의 일별 루프 (engine='python', 배열 커널 검증용)"""
+    # ATR 계산 (calculate_atr 함수 사용)
+    df = df.copy()  # 원본 데이터프레임 보호
+    df['atr'] = calculate_atr(df, period=atr_period)
+
+    # 전일 ATR 추가
+    df['prev_atr'] = df['atr'].shift(1)
+
+    # 백테스트 결과 저장용 변수
+    cash = initial_capital
+    position = 0
+    entry_price = 0
+    entry_atr = 0
+    trades = []
+
+    # 일별 수익률 및 포트폴리오 가치
+    portfolio_values = []
+    daily_returns = []
+    positions = []  # 매일의 포지션 수
+
+    for i in range(len(df)):
+        date = df.index[i]
+        row = df.iloc[i]
+
+        # 첫날이거나 전일 ATR이 없으면 스킵
+        if i == 0 or pd.isna(row['prev_atr']) or row['prev_atr'] <= 0:
+            portfolio_value = cash + (position * row['close'] if position > 0 else 0)
+            portfolio_values.append(portfolio_value)
+            daily_returns.append(0)
+            positions.append(position)
+            continue
+
+        # 포지션이 없을 때 - 진입 조건 확인
+        if position == 0:
+            # 변동성 돌파 가격 계산 (어제 ATR 기반)
+            breakout_price = row['open'] + (row['prev_atr'] * atr_entry_multiplier)
+
+            # 오늘 고가가 돌파 가격을 넘으면 매수
+            if row['high'] > breakout_price:
+                # 실제 매수가는 돌파 가격 (더 현실적)
+                buy_price = breakout_price * (1 + slippage_rate)
+
+                # 매수가가 오늘 고가를 넘으면 고가로 제한
+                buy_price = min(buy_price, row['high'])
+
+                # 포지션 사이징
+                risk_amount = cash * position_sizing  # 자본금의 2%
+                stop_loss_distance = row['prev_atr'] * stop_loss_atr
+                position_value = risk_amount / stop_loss_distance * buy_price
+
+                # 최대 자본금의 50%까지만 사용
+                position_value = min(position_value, cash * capital_ratio)
+
+                # 매수 실행
+                shares = int(position_value / buy_price)
+
+                if shares > 0 and shares * buy_price <= cash:
+                    position = shares
+                    entry_price = buy_price
+                    entry_atr = row['prev_atr']  # 어제 ATR 기록
+                    cash -= shares * buy_price * (1 + commission_rate)
+
+                    trades.append({
+                        'ticker': ticker,
+                        'entry_date': date,
+                        'entry_price': entry_price,
+                        'shares': shares,
+                        'entry_atr': entry_atr,
+                        'stop_loss': entry_price - (entry_atr * stop_loss_atr),
+                        'take_profit': entry_price + (entry_atr * take_profit_atr),
+                        'position_value': shares * entry_price,
+                        'breakout_price': breakout_price
+                    })
+
+        # 포지션이 있을 때 - 청산 조건 확인
+        else:
+            stop_loss = entry_price - (entry_atr * stop_loss_atr)
+            take_profit = entry_price + (entry_atr * take_profit_atr)
+
+            exit_signal = False
+            exit_reason = ""
+            exit_price = 0
+
+            # 손절 확인
+            if row['low'] <= stop_loss:
+                exit_price = stop_loss * (1 - slippage_rate)
+                exit_signal = True
+                exit_reason = "stop_loss"
+            # 익절 확인
+            elif row['high'] >= take_profit:
+                exit_price = take_profit * (1 - slippage_rate)
+                exit_signal = True
+                exit_reason = "take_profit"
+
+            # 청산 실행
+            if exit_signal:
+                # 실제 체결 가능한 가격으로 조정
+                if exit_reason == "stop_loss":
+                    exit_price = max(exit_price, row['low'])
+                elif exit_reason == "take_profit":
+                    exit_price = min(exit_price, row['high'])
+
+                cash += position * exit_price * (1 - commission_rate)
+
+                # 거래 기록 업데이트
+                trades[-1].update({
+                    'exit_date': date,
+                    'exit_price': exit_price,
+                    'exit_reason': exit_reason,
+                    'return': (exit_price - entry_price) / entry_price,
+                    'profit_loss': position * (exit_price - entry_price)
+                })
+
+                position = 0
+                entry_price = 0
+                entry_atr = 0
+
+        # 포트폴리오 가치 계산
+        portfolio_value = cash + (position * row['close'] if position > 0 else 0)
+        portfolio_values.append(portfolio_value)
+
+        # 일별 수익률 계산
+        if i > 0:
+            daily_return = (portfolio_value - portfolio_values[i-1]) / portfolio_values[i-1]
+            daily_returns.append(daily_return)
+        else:
+            daily_returns.append(0)
+
+        positions.append(position)
+
+    # 마지막에 포지션이 남아있다면 청산
+    if position > 0:
+        final_price = df.iloc[-1]['close'] * (1 - slippage_rate)
+        cash += position * final_price * (1 - commission_rate)
+
+        trades[-1].update({
+            'exit_date': df.index[-1],
+            'exit_price': final_price,
+            'exit_reason': 'end_of_period',
+            'return': (final_price - entry_price) / entry_price,
+            'profit_loss': position * (final_price - entry_price)
+        })
+
+        portfolio_values[-1] = cash
+
+    # 결과 DataFrame 생성
+    trades_df = pd.DataFrame(trades)
+
+    # 포트폴리오 DataFrame 생성 (추가 필드 포함)
+    portfolio_df = pd.DataFrame({
+        'date': df.index,
+        'portfolio_value': portfolio_values,
+        'daily_returns': daily_returns,
+        'position': positions,
+        'close': df['close'].values,
+        'atr': df['atr'].values
+    })
+    portfolio_df.set_index('date', inplace=True)
+
+    # 누적 수익률 계산
+    portfolio_df['cumulative_returns'] = (1 + portfolio_df['daily_returns']).cumprod()
+
+    # Buy & Hold 수익률 계산
+    portfolio_df['buy_hold_returns'] = portfolio_df['close'] / portfolio_df['close'].iloc[0]
+
+    # 전략 vs Buy & Hold 비교
+    portfolio_df['strategy_vs_buyhold'] = portfolio_df['cumulative_returns'] / portfolio_df['buy_hold_returns']
+
+    return trades_df, portfolio_df
+
+
+def _prepare_atr_inputs(df):
+    """ATR 컬럼이 계산된 DataFrame에서 커널 입력 배열 생성 (파라미터와 무관)"""
+    prev_atr = df['atr'].shift(1).to_numpy(dtype=float)
+    # 첫날, 전일 ATR이 없거나 0 이하인 날은 진입/청산 없이 넘어감
+    with np.errstate(invalid='ignore'):
+        skip = ~(prev_atr > 0)
+    if len(skip) > 0:
+        skip[0] = True
+    return {
+        'open': df['open'].to_numpy(dtype=float, na_value=np.nan),
+        'high': df['high'].to_numpy(dtype=float, na_value=np.nan),
+        'low': df['low'].to_numpy(dtype=float, na_value=np.nan),
+        'close': df['close'].to_numpy(dtype=float, na_value=np.nan),
+        'prev_atr': prev_atr,
+        'skip': skip
+    }
+
+
+def _first_exit(inputs, start, stop_loss, take_profit):
+    """start 이후 처음으로 손절/익절 조건이 맞는 행 위치 (없으면 -1)"""
+    n = len(inputs['close'])
+    window = 64
+    # 보유 기간은 대부분 짧으므로 구간을 두 배씩 늘려가며 검사
+    while start < n:
+        end = min(start + window, n)
+        hit = ~inputs['skip'][start:end] & (
+            (inputs['low'][start:end] <= stop_loss) | (inputs['high'][start:end] >= take_profit)
+        )
+        if hit.any():
+            return start + int(hit.argmax())
+        start = end
+        window *= 2
+    return -1
+
+
+def _run_atr_kernel(inputs, initial_capital=100000, atr_entry_multiplier=0.5, stop_loss_atr=1.5,
+                    take_profit_atr=3.0, commission_rate=0.001, slippage_rate=0.001,
+                    capital_ratio=0.5, position_sizing=0.02):
+    """
+    진입/청산 시점만 순서대로 찾아가는 상태 머신
+
+    포지션이 없는 구간은 돌파 신호가 있는 날만, 보유 구간은 손절/익절 조건이 맞는
+    날만 찾아 이동하고, 그 사이 날짜의 현금/보유 수량은 구간 단위로 채웁니다.
+    금액 계산은 일별 루프와 같은 순서의 스칼라 연산이라 결과가 동일합니다.
+
+    Returns:
+    - dict: 일별 현금/보유 수량 배열, 거래 목록, 최종 현금
+    """
+    n = len(inputs['close'])
+    prev_atr = inputs['prev_atr']
+    with np.errstate(invalid='ignore'):
+        breakout = inputs['open'] + (prev_atr * atr_entry_multiplier)
+        candidates = np.flatnonzero(~inputs['skip'] & (inputs['high'] > breakout))
+
+    cash_by_day = np.empty(n)
+    position_by_day = np.zeros(n, dtype=np.int64)
+    trades = []
+
+    cash = initial_capital
+    segment_start = 0
+    k = 0
+    while True:
+        # 다음 진입 (돌파했지만 수량이 0이면 다음 신호로)
+        entry = -1
+        while k < len(candidates):
+            i = candidates[k]
+            k += 1
+            high = inputs['high'][i]
+            atr = prev_atr[i]
+            breakout_price = inputs['open'][i] + (atr * atr_entry_multiplier)
+            buy_price = min(breakout_price * (1 + slippage_rate), high)
+            risk_amount = cash * position_sizing
+            stop_loss_distance = atr * stop_loss_atr
+            position_value = min(risk_amount / stop_loss_distance * buy_price, cash * capital_ratio)
+            shares = int(position_value / buy_price)
+            if shares > 0 and shares * buy_price <= cash:
+                entry = i
+                break
+
+        if entry < 0:
+            cash_by_day[segment_start:] = cash
+            break
+
+        cash_by_day[segment_start:entry] = cash
+        entry_price = buy_price
+        entry_atr = atr
+        cash -= shares * buy_price * (1 + commission_rate)
+        stop_loss = entry_price - (entry_atr * stop_loss_atr)
+        take_profit = entry_price + (entry_atr * take_profit_atr)
+        trade = {'entry_idx': entry, 'entry_price': entry_price, 'shares': shares,
+                 'entry_atr': entry_atr, 'stop_loss': stop_loss, 'take_profit': take_profit,
+                 'breakout_price': breakout_price}
+        trades.append(trade)
+
+        exit_idx = _first_exit(inputs, entry + 1, stop_loss, take_profit)
+        if exit_idx < 0:
+            cash_by_day[entry:] = cash
+            position_by_day[entry:] = shares
+            break
+
+        cash_by_day[entry:exit_idx] = cash
+        position_by_day[entry:exit_idx] = shares
+
+        # 손절을 먼저 확인하고, 체결 가능한 가격(당일 저가/고가)으로 조정
+        if inputs['low'][exit_idx] <= stop_loss:
+            exit_price = max(stop_loss * (1 - slippage_rate), inputs['low'][exit_idx])
+            reason = 1
+        else:
+            exit_price = min(take_profit * (1 - slippage_rate), inputs['high'][exit_idx])
+            reason = 2
+        cash += shares * exit_price * (1 - commission_rate)
+        trade.update({'exit_idx': exit_idx, 'exit_price': exit_price, 'exit_reason': reason})
+
+        # 청산한 날은 진입하지 않음
+        segment_start = exit_idx
+        k = np.searchsorted(candidates, exit_idx + 1)
+
+    # 마지막에 포지션이 남아있다면 종가로 청산
+    final_cash = cash
+    if trades and 'exit_idx' not in trades[-1]:
+        trade = trades[-1]
+        final_price = inputs['close'][-1] * (1 - slippage_rate)
+        final_cash = cash + trade['shares'] * final_price * (1 - commission_rate)
+        trade.update({'exit_idx': n - 1, 'exit_price': final_price, 'exit_reason': 3})
+
+    return {'cash': cash_by_day, 'position': position_by_day, 'trades': trades, 'final_cash': final_cash}
+
+
+def _portfolio_values(inputs, state, initial_capital):
+    """일별 포트폴리오 가치와 일별 수익률 (일별 루프와 같은 연산)"""
+    close = inputs['close']
+    position = state['position']
+    cash = state['cash']
+    values = np.where(position > 0, cash + position * close, cash)
+
+    # 거래가 한 번도 없으면 현금이 초기 자본 그대로이므로 정수 자본은 기존 루프와 같이 정수 컬럼
+    if not state['trades'] and isinstance(initial_capital, (int, np.integer)):
+        values = values.astype(np.int64)
+
+    daily_returns = np.zeros(len(close))
+    if len(close) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_returns[1:] = (values[1:] - values[:-1]) / values[:-1]
+        daily_returns[inputs['skip']] = 0
+
+    if len(close) > 0 and state['trades'] and state['trades'][-1]['exit_reason'] == 3:
+        values[-1] = state['final_cash']
+
+    # 모든 날이 스킵되면 기존 루프와 같이 정수 0 컬럼
+    if inputs['skip'].all():
+        daily_returns = daily_returns.astype(np.int64)
+    return values, daily_returns
+
+
+def _build_atr_frames(ticker, df, inputs, state, initial_capital):
+    """커널 결과를 backtest_atr_strategy와 같은 trades_df / portfolio_df로 변환"""
+    index = df.index
+    trades = []
+    for trade in state['trades']:
+        entry_price = trade['entry_price']
+        exit_price = trade['exit_price']
+        trades.append({
+            'ticker': ticker,
+            'entry_date': index[trade['entry_idx']],
+            'entry_price': entry_price,
+            'shares': trade['shares'],
+            'entry_atr': trade['entry_atr'],
+            'stop_loss': trade['stop_loss'],
+            'take_profit': trade['take_profit'],
+            'position_value': trade['shares'] * entry_price,
+            'breakout_price': trade['breakout_price'],
+            'exit_date': index[trade['exit_idx']],
+            'exit_price': exit_price,
+            'exit_reason': _EXIT_REASONS[trade['exit_reason']],
+            'return': (exit_price - entry_price) / entry_price,
+            'profit_loss': trade['shares'] * (exit_price - entry_price)
+        })
+    trades_df = pd.DataFrame(trades)
+
+    values, daily_returns = _portfolio_values(inputs, state, initial_capital)
+    portfolio_df = pd.DataFrame({
+        'date': index,
+        'portfolio_value': values,
+        'daily_returns': daily_returns,
+        'position': state['position'],
+        'close': df['close'].values,
+        'atr': df['atr'].values
+    })
+    portfolio_df.set_index('date', inplace=True)
+
+    # 누적 수익률 계산
+    portfolio_df['cumulative_returns'] = (1 + portfolio_df['daily_returns']).cumprod()
+
+    # Buy & Hold 수익률 계산
+    portfolio_df['buy_hold_returns'] = portfolio_df['close'] / portfolio_df['close'].iloc[0]
+
+    # 전략 vs Buy & Hold 비교
+    portfolio_df['strategy_vs_buyhold'] = portfolio_df['cumulative_returns'] / portfolio_df['buy_hold_returns']
+
+    return trades_df, portfolio_df
+
+
+def backtest_atr_strategy_batch(ticker, df, param_grid, initial_capital=100000, return_frames=False):
+    """
+    여러 파라미터 조합의 ATR 전략 백테스트를 한 번에 실행
+
+    ATR과 입력 배열은 atr_period별로 한 번만 계산하고 조합마다 배열 커널만 다시 실행합니다.
+
+    Parameters:
+    - ticker: 종목 코드
+    - df: 주가 DataFrame (open/high/low/close)
+    - param_grid: {파라미터명: 값 리스트} (모든 조합 실행) 또는 [{파라미터명: 값}, ...] (목록 그대로 실행)
+        사용 가능한 파라미터: atr_entry_multiplier, stop_loss_atr, take_profit_atr, commission_rate,
+        slippage_rate, atr_period, capital_ratio, position_sizing
+    - initial_capital: 초기 자본금
+    - return_frames: True면 조합별 (trades_df, portfolio_df)도 함께 반환
+
+    Returns:
+    - DataFrame: 조합별 파라미터와 total_return(%), trades, win_rate(%), mdd(%), final_value
+    - list: 조합별 (trades_df, portfolio_df) (return_frames=True일 때만)
+    """
+    if isinstance(param_grid, dict):
+        keys = list(param_grid.keys())
+        combos = [dict(zip(keys, values)) for values in itertools.product(*param_grid.values())]
+    else:
+        combos = [dict(params) for params in param_grid]
+
+    prepared = {}
+    rows = []
+    frames = []
+    for params in combos:
+        params = dict(params)
+        atr_period = params.pop('atr_period', 14)
+        params.pop('position_size_atr', None)  # 기존 시그니처 호환용 (계산에 사용하지 않음)
+        if atr_period not in prepared:
+            data = df.copy()
+            data['atr'] = calculate_atr(data, period=atr_period)
+            prepared[atr_period] = (data, _prepare_atr_inputs(data))
+        data, inputs = prepared[atr_period]
+
+        state = _run_atr_kernel(inputs, initial_capital=initial_capital, **params)
+        values, _ = _portfolio_values(inputs, state, initial_capital)
+        values = values.astype(float)
+
+        trade_returns = np.array([(t['exit_price'] - t['entry_price']) / t['entry_price'] for t in state['trades']])
+        running_max = np.maximum.accumulate(values) if len(values) else values
+        rows.append({
+            'ticker': ticker,
+            'atr_period': atr_period,
+            **params,
+            'total_return': (values[-1] / initial_capital - 1) * 100 if len(values) else 0.0,
+            'trades': len(state['trades']),
+            'win_rate': (trade_returns > 0).mean() * 100 if len(trade_returns) else 0.0,
+            'mdd': ((values - running_max) / running_max).min() * 100 if len(values) else 0.0,
+            'final_value': values[-1] if len(values) else initial_capital
+        })
+        if return_frames:
+            frames.append(_build_atr_frames(ticker, data, inputs, state, initial_capital))
+
+    summary = pd.DataFrame(rows)
+    if return_frames:
+        return summary, frames
+    return summary
+
+
+def analyze_backtest_results(trades_df, portfolio_df, initial_capital=100000):
+    """백테스트 결과 분석"""
+
+    results = {}
+
+    # 기본 통계
+    results['total_trades'] = len(trades_df)
+    results['initial_capital'] = initial_capital
+    results['final_portfolio_value'] = portfolio_df['portfolio_value'].iloc[-1]
+    results['total_return'] = (results['final_portfolio_value'] - initial_capital) / initial_capital
+
+    # CAGR 계산
+    start_date = portfolio_df.index[0]
+    end_date = portfolio_df.index[-1]
+    years = (end_date - start_date).days / 365.25
+    results['cagr'] = (results['final_portfolio_value'] / initial_capital) ** (1 / years) - 1
+
+    if len(trades_df) > 0:
+        completed_trades = trades_df[trades_df['exit_date'].notna()]
+
+        if len(completed_trades) > 0:
+            # 승률
+            winning_trades = completed_trades[completed_trades['profit_loss'] > 0]
+            results['win_rate'] = len(winning_trades) / len(completed_trades)
+
+            # 평균 수익률
+            results['avg_return'] = completed_trades['return'].mean()
+            results['avg_win'] = winning_trades['return'].mean() if len(winning_trades) > 0 else 0
+            results['avg_loss'] = completed_trades[completed_trades['profit_loss'] <= 0]['return'].mean()
+
+            # 손익비
+            if results['avg_loss'] != 0:
+                results['profit_factor'] = abs(results['avg_win'] / results['avg_loss'])
+            else:
+                results['profit_factor'] = float('inf') if results['avg_win'] > 0 else 0
+
+            # 청산 이유별 통계
+            results['exit_reasons'] = completed_trades['exit_reason'].value_counts().to_dict()
+
+    # 최대 낙폭 (MDD)
+    cummax = portfolio_df['portfolio_value'].cummax()
+    drawdown = (portfolio_df['portfolio_value'] - cummax) / cummax
+    results['max_drawdown'] = drawdown.min()
+
+    # 일별 수익률 사용 (portfolio_df에 이미 있음)
+    daily_returns = portfolio_df['daily_returns'].dropna()
+
+    if len(daily_returns) > 0:
+        # 샤프비율 (연환산, 무위험수익률 2%)
+        results['sharpe_ratio'] = (daily_returns.mean() * 252 - 0.02) / (daily_returns.std() * np.sqrt(252))
+
+        # 소르티노 비율 (하방 변동성만 고려, 무위험수익률 2%)
+        # 목표 수익률을 무위험 수익률로 설정
+        target_return = 0.02 / 252  # 일별 목표 수익률
+        downside_returns = daily_returns[daily_returns < target_return] - target_return
+
+        if len(downside_returns) > 0:
+            downside_std = np.sqrt((downside_returns ** 2).mean())
+            results['sortino_ratio'] = (daily_returns.mean() * 252 - 0.02) / (downside_std * np.sqrt(252))
+        else:
+            # 손실이 없는 경우
+            results['sortino_ratio'] = float('inf') if daily_returns.mean() > 0 else 0
+    else:
+        results['sharpe_ratio'] = 0
+        results['sortino_ratio'] = 0
+
+    return results
+
+
+# 워커 프로세스에서 공유 메모리로 붙은 가격/날짜 배열
+_WORKER_ARRAYS = {}
+
+
+def _init_backtest_worker(prices_name, prices_shape, dates_name, dates_shape):
+    """프로세스 풀 워커 초기화: 부모가 만든 공유 메모리 블록에 연결"""
+    from multiprocessing import shared_memory
+
+    prices_shm = shared_memory.SharedMemory(name=prices_name)
+    dates_shm = shared_memory.SharedMemory(name=dates_name)
+    _WORKER_ARRAYS['shm'] = (prices_shm, dates_shm)
+    _WORKER_ARRAYS['prices'] = np.ndarray(prices_shape, dtype=np.float64, buffer=prices_shm.buf)
+    _WORKER_ARRAYS['dates'] = np.ndarray(dates_shape, dtype='datetime64[ns]', buffer=dates_shm.buf)
+
+
+def _backtest_worker(task):
+    """공유 메모리의 [start, end) 구간으로 종목 하나를 백테스트"""
+    ticker, start, end, unit, capital, params = task
+    prices = _WORKER_ARRAYS['prices']
+    df = pd.DataFrame({
+        'open': prices[0, start:end],
+        'high': prices[1, start:end],
+        'low': prices[2, start:end],
+        'close': prices[3, start:end]
+    }, index=pd.DatetimeIndex(_WORKER_ARRAYS['dates'][start:end]).as_unit(unit))
+    return ticker, backtest_atr_strategy(ticker, df, capital, **params)
+
+
+def _parallel_backtests(stock_data_dict, ticker_capital, params, n_jobs):
+    """
+    종목별 백테스트를 프로세스 풀에서 실행
+
+    모든 종목의 OHLC를 하나의 공유 메모리 블록(4 × 전체 행)에 이어 붙이고,
+    워커에는 종목별 (시작, 끝) 위치만 전달하므로 DataFrame을 pickle하지 않습니다.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    tickers = list(stock_data_dict.keys())
+    lengths = [len(stock_data_dict[ticker]) for ticker in tickers]
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(int)
+    total = int(offsets[-1])
+
+    prices_shm = shared_memory.SharedMemory(create=True, size=max(4 * total * 8, 1))
+    dates_shm = shared_memory.SharedMemory(create=True, size=max(total * 8, 1))
+    try:
+        prices = np.ndarray((4, total), dtype=np.float64, buffer=prices_shm.buf)
+        dates = np.ndarray((total,), dtype='datetime64[ns]', buffer=dates_shm.buf)
+        for ticker, start, end in zip(tickers, offsets[:-1], offsets[1:]):
+            df = stock_data_dict[ticker]
+            for row, column in enumerate(('open', 'high', 'low', 'close')):
+                prices[row, start:end] = df[column].to_numpy(dtype=float, na_value=np.nan)
+            dates[start:end] = df.index.to_numpy(dtype='datetime64[ns]')
+
+        tasks = [(ticker, int(start), int(end), stock_data_dict[ticker].index.unit, ticker_capital[ticker], params)
+                 for ticker, start, end in zip(tickers, offsets[:-1], offsets[1:])]
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_backtest_worker,
+                                 initargs=(prices_shm.name, (4, total), dates_shm.name, (total,))) as executor:
+            chunksize = max(1, len(tasks) // (n_jobs * 4))
+            results = dict(executor.map(_backtest_worker, tasks, chunksize=chunksize))
+        del prices, dates
+    finally:
+        prices_shm.close()
+        prices_shm.unlink()
+        dates_shm.close()
+        dates_shm.unlink()
+
+    return {ticker: results[ticker] for ticker in tickers}
+
+
+def _can_share_index(stock_data_dict):
+    """공유 메모리로 보낼 수 있는 인덱스인지 (tz 없는 DatetimeIndex)"""
+    return all(isinstance(df.index, pd.DatetimeIndex) and df.index.tz is None
+               for df in stock_data_dict.values())
+
+
+def portfolio_integrated_backtest(stock_data_dict, initial_capital=100000,
+                                atr_entry_multiplier=0.5,
+                                stop_loss_atr=1.5,
+                                take_profit_atr=3.0,
+                                position_size_atr=2.0,
+                                commission_rate=0.001,
+                                slippage_rate=0.001,
+                                atr_period=14,
+                                allocation_method='equal',
+                                position_sizing=0.02,
+                                capital_ratio=0.5,
+                                n_jobs=1,
+                                engine='numpy'):
+    """
+    포트폴리오 통합 백테스트
+
+    여러 종목을 동시에 운용하는 포트폴리오의 통합 성과를 분석
+
+    Parameters:
+    - stock_data_dict: {ticker: df} 형태의 딕셔너리
+    - allocation_method: 'equal' (균등 배분) 또는 'volatility_weighted' (변동성 가중)
+    - n_jobs: 종목별 백테스트를 실행할 프로세스 수 (기본 1: 순차 실행, -1: 전체 CPU)
+    - engine: backtest_atr_strategy 계산 엔진 ('numpy' 또는 'python')
+
+    Returns:
+    - all_trades_df: 모든 종목의 거래 내역
+    - integrated_portfolio_df: 통합 포트폴리오 성과
+    - ticker_results: 종목별 거래 내역/포트폴리오/배분 비율
+    - integrated_results: 통합 성과 분석 결과
+    """
+
+    # 종목 수와 종목별 초기 자본 설정
+    n_tickers = len(stock_data_dict)
+
+    if allocation_method == 'equal':
+        # 균등 배분
+        ticker_capital = {ticker: initial_capital / n_tickers for ticker in stock_data_dict.keys()}
+    else:
+        # 변동성 가중 배분 (ATR 역수 비례)
+        avg_atrs = {ticker: calculate_atr(df, period=atr_period).mean()
+                    for ticker, df in stock_data_dict.items()}
+
+        # ATR 역수로 가중치 계산
+        weights = {ticker: 1/atr for ticker, atr in avg_atrs.items()}
+        total_weight = sum(weights.values())
+        ticker_capital = {ticker: (weight/total_weight) * initial_capital
+                         for ticker, weight in weights.items()}
+
+    params = dict(atr_entry_multiplier=atr_entry_multiplier, stop_loss_atr=stop_loss_atr,
+                  take_profit_atr=take_profit_atr, position_size_atr=position_size_atr,
+                  commission_rate=commission_rate, slippage_rate=slippage_rate,
+                  atr_period=atr_period, position_sizing=position_sizing,
+                  capital_ratio=capital_ratio,  # 종목별 최대 자본금 비율
+                  engine=engine)
+
+    # 종목별 백테스트 실행
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    parallel = bool(n_jobs) and n_jobs > 1 and n_tickers > 1
+    if parallel and not _can_share_index(stock_data_dict):
+        print("⚠️  날짜 인덱스가 tz 없는 DatetimeIndex가 아니어서 순차 실행합니다.")
+        parallel = False
+
+    if parallel:
+        backtests = _parallel_backtests(stock_data_dict, ticker_capital, params, n_jobs)
+    else:
+        backtests = {ticker: backtest_atr_strategy(ticker, df, ticker_capital[ticker], **params)
+                     for ticker, df in stock_data_dict.items()}
+
+    ticker_results = {}
+    all_trades = []
+
+    for ticker in stock_data_dict.keys():
+        trades_df, portfolio_df = backtests[ticker]
+
+        # 결과 저장
+        ticker_results[ticker] = {
+            'trades_df': trades_df,
+            'portfolio_df': portfolio_df,
+            'allocation': ticker_capital[ticker] / initial_capital
+        }
+
+        if len(trades_df) > 0:
+            trades_df['allocation'] = ticker_capital[ticker] / initial_capital
+            all_trades.append(trades_df)
+
+    # 통합 포트폴리오 생성
+    # 모든 날짜 범위 (종목별 날짜의 합집합)
+    all_dates = pd.Index([])
+    for results in ticker_results.values():
+        all_dates = all_dates.union(results['portfolio_df'].index)
+    all_dates = all_dates.sort_values()
+
+    # 종목별 가치를 전체 날짜에 맞춰 한 번에 정렬
+    # (데이터가 없는 날은 가장 가까운 이전 값, 첫 데이터 이전은 초기 자본)
+    ticker_values = {}
+    buy_hold_total = np.zeros(len(all_dates))
+    integrated_values = np.zeros(len(all_dates))
+    for ticker, results in ticker_results.items():
+        portfolio_df = results['portfolio_df']
+        values = portfolio_df['portfolio_value'].reindex(all_dates, method='ffill').to_numpy(dtype=float, copy=True)
+        if len(portfolio_df) > 0:
+            values[all_dates < portfolio_df.index[0]] = ticker_capital[ticker]
+        else:
+            values[:] = ticker_capital[ticker]
+        ticker_values[ticker] = values
+        # 기존 일별 루프와 같은 덧셈 순서(종목 순서)로 합산
+        integrated_values = integrated_values + values
+
+        # 해당 종목의 Buy & Hold 수익률에 배분 비율을 곱해서 더함 (데이터가 있는 날만)
+        buy_hold = portfolio_df['buy_hold_returns'].reindex(all_dates).to_numpy(dtype=float)
+        present = all_dates.isin(portfolio_df.index)
+        buy_hold_total = buy_hold_total + np.where(present, buy_hold * results['allocation'], 0.0)
+
+    # 일별 수익률 계산
+    integrated_returns = np.zeros(len(all_dates))
+    if len(all_dates) > 1:
+        integrated_returns[1:] = (integrated_values[1:] - integrated_values[:-1]) / integrated_values[:-1]
+    else:
+        integrated_returns = integrated_returns.astype(np.int64)
+
+    # 통합 포트폴리오 DataFrame 생성
+    integrated_portfolio_df = pd.DataFrame({
+        'date': all_dates,
+        'portfolio_value': integrated_values,
+        'daily_returns': integrated_returns
+    })
+    integrated_portfolio_df.set_index('date', inplace=True)
+
+    # 종목별 가치/비중, 누적 수익률, Buy & Hold 컬럼을 한 번에 추가 (기존 컬럼 순서 유지)
+    cumulative_returns = (1 + integrated_portfolio_df['daily_returns']).cumprod()
+    columns = {f'{ticker}_value': ticker_values[ticker] for ticker in stock_data_dict.keys()}
+    columns['cumulative_returns'] = cumulative_returns
+
+    # Buy & Hold 수익률 계산 (각 종목의 Buy & Hold 가중 평균)
+    columns['buy_hold_returns'] = buy_hold_total
+
+    # 전략 vs Buy & Hold
+    columns['strategy_vs_buyhold'] = cumulative_returns / buy_hold_total
+
+    # 종목별 비중 계산
+    for ticker in stock_data_dict.keys():
+        columns[f'{ticker}_weight'] = ticker_values[ticker] / integrated_values
+
+    integrated_portfolio_df = pd.concat(
+        [integrated_portfolio_df, pd.DataFrame(columns, index=integrated_portfolio_df.index)], axis=1
+    )
+
+    # 모든 거래 통합
+    if all_trades:
+        all_trades_df = pd.concat(all_trades, ignore_index=True)
+    else:
+        all_trades_df = pd.DataFrame()
+
+    # 통합 성과 분석
+    integrated_results = analyze_backtest_results(
+        all_trades_df, integrated_portfolio_df, initial_capital
+    )
+
+    return all_trades_df, integrated_portfolio_df, ticker_results, integrated_results
@@ -0,0 +1,123 @@
+import pandas as pd
+import numpy as np
+
+ATR_METHODS = ('sma', 'wilder', 'ema')
+
+
+def _shift(values, periods):
+    """날짜 축(0번 축) 기준 shift (앞쪽은 NaN)"""
+    shifted = np.full(values.shape, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def true_range(high, low, close, lagged=False):
+    """
+    True Range 계산 (pd.concat(...).max(axis=1)과 같이 NaN은 건너뜀)
+
+    Parameters:
+    - high, low, close: 1차원 (날짜) 또는 2차원 (날짜 × 종목) 배열
+    - lagged: False면 당일 TR = max(고가-저가, |고가-전일종가|, |저가-전일종가|) (노트북 06/07, v5)
+              True면 전일 TR = max(전일 고가-전일 저가, |전일 고가-전전일 종가|, |전일 저가-전전일 종가|) (노트북 08_01, atr_backtest)
+
+    Returns:
+    - ndarray: 입력과 같은 shape의 True Range
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    if lagged:
+        high, low, close_prev = _shift(high, 1), _shift(low, 1), _shift(close, 2)
+    else:
+        close_prev = _shift(close, 1)
+
+    with np.errstate(invalid='ignore'):
+        return np.fmax(np.fmax(high - low, np.abs(high - close_prev)), np.abs(low - close_prev))
+
+
+def _wilder(tr, period):
+    """
+    Wilder 평활: 첫 값은 처음 period개 TR의 단순평균, 이후 ATR = (이전 ATR × (period - 1) + TR) / period
+
+    종목 축은 배열 연산으로, 날짜 축만 순서대로 진행합니다. TR이 NaN인 날은 이전 ATR을 유지합니다.
+    """
+    seed = pd.DataFrame(tr).rolling(window=period).mean().to_numpy()
+    atr = np.full(tr.shape, np.nan)
+    previous = np.full(tr.shape[1], np.nan)
+    started = np.zeros(tr.shape[1], dtype=bool)
+    for t in range(len(tr)):
+        update = started & ~np.isnan(tr[t])
+        previous = np.where(update, (previous * (period - 1) + tr[t]) / period, previous)
+        start = ~started & ~np.isnan(seed[t])
+        previous = np.where(start, seed[t], previous)
+        started |= start
+        atr[t] = previous
+    return atr
+
+
+def smooth_true_range(tr, period=14, method='sma'):
+    """
+    True Range를 평활해 ATR 계산
+
+    Parameters:
+    - tr: 1차원 (날짜) 또는 2차원 (날짜 × 종목) True Range
+    - period: ATR 계산 기간 (기본 14)
+    - method: 'sma' (단순이동평균, 기존 calculate_atr와 동일), 'wilder', 'ema' (span=period)
+
+    Returns:
+    - ndarray: 입력과 같은 shape의 ATR
+    """
+    if method not in ATR_METHODS:
+        raise ValueError(f"지원하지 않는 method입니다: {method} (가능: {', '.join(ATR_METHODS)})")
+    tr = np.asarray(tr, dtype=float)
+    tr_2d = tr.reshape(len(tr), -1)
+
+    if method == 'sma':
+        # 기존 Series.rolling(window=period).mean()과 같은 계산을 모든 종목에 한 번에
+        atr = pd.DataFrame(tr_2d).rolling(window=period).mean().to_numpy()
+    elif method == 'ema':
+        atr = pd.DataFrame(tr_2d).ewm(span=period, adjust=False).mean().to_numpy()
+    else:
+        atr = _wilder(tr_2d, period)
+    return atr.reshape(tr.shape)
+
+
+def calculate_atr(df, period=14, method='sma', lagged=False):
+    """
+    ATR (Average True Range) 계산
+
+    Parameters:
+    - df: DataFrame with 'high', 'low', 'close' columns
+    - period: ATR 계산 기간 (기본 14)
+    - method: 평활 방식 'sma' (기본), 'wilder', 'ema'
+    - lagged: True면 전일 기준 TR (atr_backtest.calculate_atr), False면 당일 TR (v5 전략)
+
+    Returns:
+    - Series: ATR values
+    """
+    tr = true_range(df['high'].to_numpy(dtype=float, na_value=np.nan),
+                    df['low'].to_numpy(dtype=float, na_value=np.nan),
+                    df['close'].to_numpy(dtype=float, na_value=np.nan), lagged=lagged)
+    return pd.Series(smooth_true_range(tr, period, method), index=df.index)
+
+
+def calculate_atr_batch(high, low, close, periods=(14,), method='sma', lagged=False):
+    """
+    여러 종목 × 여러 기간의 ATR을 한 번에 계산 (True Range는 한 번만 계산)
+
+    Parameters:
+    - high, low, close: (날짜 × 종목) 배열 또는 DataFrame (같은 날짜 정렬)
+    - periods: ATR 계산 기간 목록
+    - method: 평활 방식 'sma' (기본), 'wilder', 'ema'
+    - lagged: True면 전일 기준 TR, False면 당일 TR
+
+    Returns:
+    - ndarray: (날짜 × 종목 × 기간) ATR
+    """
+    tr = true_range(high, low, close, lagged=lagged)
+    tr = tr.reshape(len(tr), -1)
+    atr = np.empty(tr.shape + (len(periods),))
+    for p, period in enumerate(periods):
+        atr[:, :, p] = smooth_true_range(tr, period, method)
+    return atr
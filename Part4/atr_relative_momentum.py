@@ -0,0 +1,306 @@
+import itertools
+
+import pandas as pd
+import numpy as np
+
+from momentum_portfolio_engine import select_top_n, _accumulate_selected_returns
+from performance_metrics import calculate_performance_metrics_2d
+from rebalance_calendar import build_rebalance_calendar
+
+REBALANCE_FREQS = ('monthly', 'weekly', 'daily')
+VALUATIONS = ('returns', 'level')
+
+
+def stack_portfolio_values(portfolio_results):
+    """
+    종목별 ATR 전략 portfolio_df의 portfolio_value를 (날짜 × 종목) 행렬로 쌓기
+
+    파라미터와 무관한 값(종목별 자기 거래일 위치, 전 거래일 대비 수익률)도 함께 계산해 두므로
+    lookback_period / top_n / rebalance_freq 조합을 바꿔 실행할 때 재사용합니다.
+
+    Parameters:
+    - portfolio_results: {ticker: portfolio_df} 딕셔너리 (portfolio_value 컬럼)
+
+    Returns:
+    - dict: dates, tickers, values (데이터 없는 날 NaN), own_rows (종목 자기 행 위치, 없으면 -1),
+            compact (종목별 자기 행 순서 값), daily_returns (전 거래일에도 값이 있을 때만, 없으면 0)
+    """
+    tickers = list(portfolio_results.keys())
+    dates = None
+    for portfolio_df in portfolio_results.values():
+        dates = portfolio_df.index.unique() if dates is None else dates.union(portfolio_df.index)
+    dates = pd.Index(list(dates.sort_values()) if dates is not None else [], name='date')
+
+    n_dates, n_tickers = len(dates), len(tickers)
+    max_rows = max((len(df) for df in portfolio_results.values()), default=0)
+    values = np.full((n_dates, n_tickers), np.nan)
+    own_rows = np.full((n_dates, n_tickers), -1, dtype=np.int64)
+    compact = np.full((max_rows, n_tickers), np.nan)
+    for j, ticker in enumerate(tickers):
+        portfolio_df = portfolio_results[ticker]
+        ticker_values = portfolio_df['portfolio_value'].to_numpy(dtype=float, na_value=np.nan)
+        rows = dates.get_indexer(portfolio_df.index)
+        values[rows, j] = ticker_values
+        own_rows[rows, j] = np.arange(len(rows))
+        compact[:len(rows), j] = ticker_values
+
+    # 종목 일별 수익률: 오늘과 전 거래일(전체 날짜 기준) 모두 값이 있는 종목만
+    present = own_rows >= 0
+    daily_returns = np.zeros((n_dates, n_tickers))
+    if n_dates > 1:
+        both = present[1:] & present[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_returns[1:] = np.where(both, (values[1:] - values[:-1]) / values[:-1], 0.0)
+
+    return {
+        'dates': dates,
+        'tickers': tickers,
+        'values': values,
+        'own_rows': own_rows,
+        'compact': compact,
+        'daily_returns': daily_returns
+    }
+
+
+def _rebalance_positions(dates, rebalance_freq):
+    """노트북과 같은 리밸런싱일: monthly - 월이 바뀌는 첫 거래일, weekly - 월요일, daily - 매일"""
+    if rebalance_freq not in REBALANCE_FREQS:
+        raise ValueError(f"지원하지 않는 rebalance_freq입니다: {rebalance_freq} (가능: {', '.join(REBALANCE_FREQS)})")
+    if rebalance_freq == 'weekly':
+        # 주의 첫 거래일이 아니라 월요일인 날만 (월요일이 휴장이면 그 주는 리밸런싱 없음)
+        schedule = pd.DatetimeIndex(dates).weekday == 0
+    else:
+        schedule = rebalance_freq
+    return build_rebalance_calendar(dates, schedule)['rebalance_positions']
+
+
+def lookback_momentum(stack, positions, lookback_period):
+    """
+    리밸런싱일마다 종목별 lookback_period 거래일(종목 자기 거래일 기준) ATR 전략 수익률
+
+    Returns:
+    - scores: (리밸런싱 × 종목) 수익률 (계산할 수 없는 칸은 NaN)
+    - valid: 해당 날짜에 종목 데이터가 있고 자기 거래일이 lookback_period 이상인지
+    """
+    own = stack['own_rows'][positions]
+    valid = own >= lookback_period
+    columns = np.arange(own.shape[1])[None, :]
+    past = stack['compact'][np.maximum(own - lookback_period, 0), columns]
+    current = stack['values'][positions]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(valid, (current - past) / past, np.nan)
+    return scores, valid
+
+
+def _run_selection(stack, lookback_period, top_n, rebalance_freq, positions=None):
+    """리밸런싱 후보일의 모멘텀과, 후보 종목이 top_n개 이상이라 실제로 종목을 바꾼 리밸런싱"""
+    if positions is None:
+        positions = _rebalance_positions(stack['dates'], rebalance_freq)
+    positions = positions[positions >= lookback_period]
+    scores, valid = lookback_momentum(stack, positions, lookback_period)
+
+    executed = valid.sum(axis=1) >= top_n
+    selected = select_top_n(np.where(valid, scores, -np.inf)[executed], top_n)
+    return {
+        'positions': positions,
+        'scores': scores,
+        'valid': valid,
+        'executed_positions': positions[executed],
+        'selected': selected
+    }
+
+
+def _momentum_values(stack, selection, top_n, initial_capital, valuation):
+    """
+    선택 결과로 일별 포트폴리오 가치와 수익률 계산
+
+    - returns: 선택 종목 일별 수익률의 가중합으로 복리 (08_01 노트북)
+    - level: 선택 종목 ATR 전략 가치(초기 자본 대비)의 가중합 (08_01 copy 노트북)
+    """
+    n_dates = len(stack['dates'])
+    rows = np.arange(n_dates)
+    held = np.searchsorted(selection['executed_positions'], rows, side='right') - 1
+    active = held >= 0
+    daily_selected = selection['selected'][held[active]]
+    weight = 1.0 / top_n
+
+    if valuation == 'returns':
+        daily_returns = np.zeros(n_dates)
+        daily_returns[active] = _accumulate_selected_returns(stack['daily_returns'], rows[active],
+                                                             daily_selected, weight)
+        if n_dates > 0:
+            daily_returns[0] = 0.0
+        # 노트북과 같이 전날 가치에 (1 + 수익률)을 순서대로 곱함
+        values = np.cumprod(np.concatenate(([initial_capital], 1 + daily_returns[1:]))) if n_dates > 0 \
+            else np.zeros(0)
+        return values, daily_returns
+
+    filled = np.where(stack['own_rows'] >= 0, stack['values'], 0.0)
+    level = np.ones(n_dates)
+    level[active] = 0.0
+    for rank in range(daily_selected.shape[1]):
+        level[active] += (weight * filled[rows[active], daily_selected[:, rank]]) / initial_capital
+    values = level * initial_capital
+    daily_returns = np.zeros(n_dates)
+    if n_dates > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_returns[1:] = (values[1:] - values[:-1]) / values[:-1]
+    return values, daily_returns
+
+
+def relative_momentum_portfolio_selection(all_results, portfolio_results,
+                                          lookback_period=20,  # 모멘텀 계산 기간 (일)
+                                          top_n=3,  # 선택할 상위 종목 수
+                                          rebalance_freq='monthly',  # 리밸런싱 주기
+                                          initial_capital=100000,
+                                          valuation='returns',
+                                          stack=None):
+    """
+    ATR 전략의 수익률을 기반으로 상대모멘텀 포트폴리오 구성 (08_01 노트북의 배열 연산 버전)
+
+    1. 각 종목의 ATR 전략 수익률을 기반으로 모멘텀 점수 계산
+    2. 상위 N개 종목을 선택하여 균등 배분
+    3. 정기적으로 리밸런싱
+
+    모든 종목의 portfolio_value를 (날짜 × 종목) 행렬로 쌓아 모든 리밸런싱일의 lookback 수익률을
+    한 번의 나눗셈으로 계산합니다. 반환 형식은 노트북 함수와 같습니다.
+
+    Parameters:
+    - all_results: 각 종목의 ATR 전략 백테스트 결과 (노트북 시그니처 호환용, 계산에 사용하지 않음)
+    - portfolio_results: 각 종목의 portfolio_df (딕셔너리)
+    - lookback_period: 모멘텀 계산 기간
+    - top_n: 선택할 종목 수
+    - rebalance_freq: 리밸런싱 주기 ('monthly', 'weekly' - 월요일, 'daily')
+    - valuation: 포트폴리오 가치 계산 방식
+        'returns' - 선택 종목 일별 수익률의 가중합으로 복리 (08_01 노트북, 기본)
+        'level' - 선택 종목 ATR 전략 가치의 가중합 (08_01 copy 노트북)
+    - stack: stack_portfolio_values(portfolio_results) 결과 (재사용 시)
+
+    Returns:
+    - momentum_portfolio_df: 상대모멘텀 포트폴리오 성과
+    - selected_tickers_df: 리밸런싱일별 선택된 종목 (rank_1, rank_2, ...)
+    - momentum_scores_df: 리밸런싱일별 종목 모멘텀 점수
+    - weights_df: 일별 종목 비중 (첫 선택일부터)
+    """
+    if valuation not in VALUATIONS:
+        raise ValueError(f"지원하지 않는 valuation입니다: {valuation} (가능: {', '.join(VALUATIONS)})")
+    if stack is None:
+        stack = stack_portfolio_values(portfolio_results)
+    dates, tickers = stack['dates'], stack['tickers']
+
+    selection = _run_selection(stack, lookback_period, top_n, rebalance_freq)
+    values, daily_returns = _momentum_values(stack, selection, top_n, initial_capital, valuation)
+
+    executed_positions = selection['executed_positions']
+    if valuation == 'returns' and len(executed_positions) == 0:
+        # 종목을 한 번도 고르지 않으면 노트북과 같이 초기 자본/수익률 0이 정수 그대로 남음
+        daily_returns = daily_returns.astype(np.int64)
+        if isinstance(initial_capital, (int, np.integer)):
+            values = values.astype(np.int64)
+
+    momentum_portfolio_df = pd.DataFrame({
+        'portfolio_value': values,
+        'daily_returns': daily_returns
+    }, index=dates)
+
+    # 누적 수익률과 Buy & Hold 벤치마크 (모든 종목 균등 투자 ATR 전략, 데이터가 있는 날만 합산)
+    present = stack['own_rows'] >= 0
+    n_tickers = len(tickers)
+    buy_hold = np.zeros(len(dates))
+    if valuation == 'returns':
+        momentum_portfolio_df['cumulative_returns'] = momentum_portfolio_df['portfolio_value'] / initial_capital
+        for j in range(n_tickers):
+            buy_hold = buy_hold + np.where(present[:, j], (1.0 / n_tickers) * (stack['values'][:, j] / initial_capital), 0.0)
+    else:
+        momentum_portfolio_df['cumulative_returns'] = (1 + momentum_portfolio_df['daily_returns']).cumprod()
+        for j in range(n_tickers):
+            buy_hold = buy_hold + np.where(present[:, j], (stack['values'][:, j] / stack['compact'][0, j]) / n_tickers, 0.0)
+    momentum_portfolio_df['buy_hold_returns'] = buy_hold
+
+    # 전략 vs Buy & Hold
+    momentum_portfolio_df['strategy_vs_buyhold'] = (
+        momentum_portfolio_df['cumulative_returns'] / momentum_portfolio_df['buy_hold_returns']
+    )
+
+    # 선택된 종목 기록 DataFrame
+    ticker_names = np.asarray(tickers, dtype=object)
+    selected_tickers_history = {dates[position]: list(ticker_names[selected])
+                                for position, selected in zip(executed_positions, selection['selected'])}
+    selected_tickers_df = pd.DataFrame.from_dict(selected_tickers_history, orient='index')
+    if not selected_tickers_df.empty:
+        selected_tickers_df.columns = [f'rank_{i+1}' for i in range(len(selected_tickers_df.columns))]
+
+    # 모멘텀 점수 DataFrame (점수가 하나도 없는 리밸런싱일은 노트북과 같이 행이 없음)
+    momentum_scores_history = {}
+    for position, scores, valid in zip(selection['positions'], selection['scores'], selection['valid']):
+        columns = np.flatnonzero(valid)
+        momentum_scores_history[dates[position]] = dict(zip(ticker_names[columns], scores[columns]))
+    momentum_scores_df = pd.DataFrame.from_dict(momentum_scores_history, orient='index')
+
+    weights_df = _weights_frame(dates, tickers, executed_positions, selection['selected'], top_n)
+
+    return momentum_portfolio_df, selected_tickers_df, momentum_scores_df, weights_df
+
+
+def _weights_frame(dates, tickers, executed_positions, selected, top_n):
+    """일별 종목 비중 (첫 선택일 이전은 비중 기록이 비어 있어 노트북과 같이 행 없음)"""
+    if len(executed_positions) == 0:
+        return pd.DataFrame()
+    first = executed_positions[0]
+    rows = np.arange(first, len(dates))
+    held = np.searchsorted(executed_positions, rows, side='right') - 1
+
+    weights = np.zeros((len(rows), len(tickers)))
+    weights[np.arange(len(rows))[:, None], selected[held]] = 1.0 / top_n
+    # 한 번도 선택되지 않은 종목은 정수 0만 기록되므로 int 컬럼
+    columns = {}
+    for j, ticker in enumerate(tickers):
+        column = weights[:, j]
+        columns[ticker] = column.astype(np.int64) if not column.any() else column
+    return pd.DataFrame(columns, index=pd.Index([dates[row] for row in rows]))
+
+
+def sweep_relative_momentum(portfolio_results, lookback_periods=(5, 10, 20, 60, 120), top_ns=(3, 5),
+                            rebalance_freqs=('monthly',), initial_capital=100000, valuation='returns',
+                            stack=None):
+    """
+    lookback_period × top_n × rebalance_freq 조합의 ATR 전략 상대모멘텀 포트폴리오 스윕
+
+    portfolio_value 행렬과 종목 일별 수익률은 한 번만 쌓고,
+    리밸런싱일은 주기별로, 모멘텀 점수는 (주기, 기간)별로 한 번만 계산합니다.
+
+    Parameters:
+    - portfolio_results: 각 종목의 portfolio_df (딕셔너리)
+    - lookback_periods: 모멘텀 계산 기간 목록
+    - top_ns: 선택할 종목 수 목록 (종목 수보다 크면 종목 수로 조정)
+    - rebalance_freqs: 리밸런싱 주기 목록
+    - initial_capital: 초기 자본금
+    - valuation: 'returns' (기본) 또는 'level' (relative_momentum_portfolio_selection 참고)
+    - stack: stack_portfolio_values(portfolio_results) 결과 (재사용 시)
+
+    Returns:
+    - returns_df: 날짜 × 조합 포트폴리오 일일 수익률 DataFrame
+    - summary_df: 조합별 파라미터와 calculate_performance_metrics_2d 지표
+    """
+    if valuation not in VALUATIONS:
+        raise ValueError(f"지원하지 않는 valuation입니다: {valuation} (가능: {', '.join(VALUATIONS)})")
+    if stack is None:
+        stack = stack_portfolio_values(portfolio_results)
+    n_tickers = len(stack['tickers'])
+
+    positions_by_freq = {freq: _rebalance_positions(stack['dates'], freq) for freq in rebalance_freqs}
+    combos = list(itertools.product(rebalance_freqs, lookback_periods, top_ns))
+    daily_returns = np.zeros((len(combos), len(stack['dates'])))
+    rows = []
+    for c, (freq, lookback_period, top_n) in enumerate(combos):
+        top_n = min(top_n, n_tickers)
+        selection = _run_selection(stack, lookback_period, top_n, freq, positions=positions_by_freq[freq])
+        _, daily_returns[c] = _momentum_values(stack, selection, top_n, initial_capital, valuation)
+        rows.append({'rebalance_freq': freq, 'lookback_period': lookback_period, 'top_n': top_n,
+                     'rebalances': len(selection['executed_positions'])})
+
+    returns_df = pd.DataFrame(daily_returns.T, index=stack['dates'])
+    summary_df = pd.concat([pd.DataFrame(rows), calculate_performance_metrics_2d(daily_returns)], axis=1)
+
+    print(f"✅ {len(combos)}개 상대모멘텀 조합 스윕 완료 ({n_tickers}개 종목 × {len(stack['dates'])}일)")
+    return returns_df, summary_df
@@ -0,0 +1,297 @@
+"""
+성능 벤치마크 모음
+합성 OHLCV + 지표 데이터로 주요 계산 경로의 실행 시간/처리량/최대 메모리를 측정하고
+결과를 JSON 파일에 실행 기록으로 누적합니다 (이전 실행 대비 변화 표시).
+
+사용 예시:
+    python benchmark_suite.py --scales 10x1000,100x2520 --output benchmark_results.json
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+import atr_kernel
+
+DEFAULT_SCALES = ((10, 1000), (100, 2520), (500, 2520))
+BENCHMARK_TARGETS = ('calculate_atr', 'calculate_atr_batch', 'volatility_breakout_with_all_filters_v5',
+                     'calculate_momentum_portfolio_returns', 'backtest_atr_strategy',
+                     'portfolio_integrated_backtest')
+
+
+def _ema(frame, span):
+    return frame.ewm(span=span, adjust=False).mean()
+
+
+def _wilder_mean(frame, period):
+    return frame.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def generate_synthetic_universe(n_tickers=10, n_days=1000, start='2015-01-01', seed=42):
+    """
+    N개 종목 × T거래일의 합성 OHLCV + 지표 데이터 생성 (모든 종목을 한 번에 배열 연산)
+
+    종목마다 추세/변동성이 다른 로그 정규 가격(두꺼운 꼬리의 t분포 수익률)에
+    갭이 있는 시가, 고가/저가, 변동성에 비례하는 거래량을 만들고
+    로더와 같은 이름의 지표 컬럼(adx_14, pdi_14, mdi_14, obv_values, obv_9_ma,
+    chaikin_oscillator, chaikin_signal, macd_line, macd_9_signal_line, macd_histogram, macd_signals)을 계산합니다.
+
+    Parameters:
+    - n_tickers: 종목 수
+    - n_days: 거래일 수 (영업일 기준 날짜)
+    - start: 시작 날짜
+    - seed: 난수 시드
+
+    Returns:
+    - dict: {ticker: DataFrame} (인덱스 이름 'date')
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days, name='date')
+    tickers = [f'SYN{j:04d}' for j in range(n_tickers)]
+
+    drift = rng.normal(0.0003, 0.0004, n_tickers)
+    volatility = rng.uniform(0.008, 0.03, n_tickers)
+    shocks = rng.standard_t(df=4, size=(n_days, n_tickers)) / np.sqrt(2)
+    log_returns = drift + volatility * shocks
+    close = 100 * rng.uniform(0.2, 5, n_tickers) * np.exp(np.cumsum(log_returns, axis=0))
+
+    prev_close = np.vstack([close[:1], close[:-1]])
+    open_ = prev_close * np.exp(rng.normal(0, 0.3, (n_days, n_tickers)) * volatility)
+    spread = np.abs(rng.normal(0, 0.5, (2, n_days, n_tickers))) * volatility
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    base_volume = rng.lognormal(14, 1, n_tickers)
+    volume = (base_volume * (1 + np.abs(log_returns) / volatility) *
+              rng.lognormal(0, 0.3, (n_days, n_tickers))).astype(np.int64)
+
+    high_df, low_df, close_df = pd.DataFrame(high), pd.DataFrame(low), pd.DataFrame(close)
+
+    # ADX / +DI / -DI (Wilder 평활)
+    up_move = high_df.diff()
+    down_move = -low_df.diff()
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
+    atr = _wilder_mean(pd.DataFrame(atr_kernel.true_range(high, low, close)), 14)
+    pdi = 100 * _wilder_mean(plus_dm, 14) / atr
+    mdi = 100 * _wilder_mean(minus_dm, 14) / atr
+    dx = 100 * (pdi - mdi).abs() / (pdi + mdi)
+    adx = _wilder_mean(dx, 14)
+
+    # OBV
+    direction = np.sign(np.diff(close, axis=0, prepend=close[:1]))
+    obv = np.cumsum(direction * volume, axis=0).astype(np.int64)
+    obv_9_ma = pd.DataFrame(obv).rolling(9).mean()
+
+    # Chaikin (A/D 라인의 3일 EMA - 10일 EMA)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        money_flow = np.where(high > low, ((close - low) - (high - close)) / (high - low), 0.0)
+    ad_line = pd.DataFrame(np.cumsum(money_flow * volume, axis=0))
+    chaikin = _ema(ad_line, 3) - _ema(ad_line, 10)
+    chaikin_signal = _ema(chaikin, 9)
+
+    # MACD (12, 26, 9)
+    macd_line = _ema(close_df, 12) - _ema(close_df, 26)
+    macd_signal_line = _ema(macd_line, 9)
+    macd_histogram = macd_line - macd_signal_line
+    macd_signals = np.where(macd_histogram.to_numpy() > 0, 'BUY', 'SELL').astype(object)
+    macd_signals[:33] = 'HOLD'
+
+    columns = {
+        'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+        'adx_14': adx.to_numpy(), 'pdi_14': pdi.to_numpy(), 'mdi_14': mdi.to_numpy(),
+        'obv_values': obv, 'obv_9_ma': obv_9_ma.to_numpy(),
+        'chaikin_oscillator': chaikin.to_numpy(), 'chaikin_signal': chaikin_signal.to_numpy(),
+        'macd_line': macd_line.to_numpy(), 'macd_9_signal_line': macd_signal_line.to_numpy(),
+        'macd_histogram': macd_histogram.to_numpy(), 'macd_signals': macd_signals
+    }
+    return {ticker: pd.DataFrame({name: values[:, j] for name, values in columns.items()}, index=dates)
+            for j, ticker in enumerate(tickers)}
+
+
+def _v5_strategy():
+    """volatility_breakout_with_all_filters_v5 (당일 TR calculate_atr는 atr_kernel에서 import)"""
+    from volatility_breakout_with_all_filters_v5 import volatility_breakout_with_all_filters_v5
+    return volatility_breakout_with_all_filters_v5
+
+
+def _benchmark_cases(stock_data):
+    """(이름, 실행 함수) 목록 - 각 함수는 합성 데이터 전체를 처리"""
+    from atr_backtest import backtest_atr_strategy, portfolio_integrated_backtest
+    from momentum_portfolio_with_csv import calculate_momentum_portfolio_returns
+
+    strategy = _v5_strategy()
+    frames = list(stock_data.values())
+    high = np.column_stack([df['high'].to_numpy() for df in frames])
+    low = np.column_stack([df['low'].to_numpy() for df in frames])
+    close = np.column_stack([df['close'].to_numpy() for df in frames])
+
+    return {
+        'calculate_atr': lambda: [atr_kernel.calculate_atr(df, 14) for df in frames],
+        'calculate_atr_batch': lambda: atr_kernel.calculate_atr_batch(high, low, close, periods=(14, 20)),
+        'volatility_breakout_with_all_filters_v5': lambda: [strategy(df, slippage=0.001, commission=0.0005)
+                                                            for df in frames],
+        'calculate_momentum_portfolio_returns': lambda: calculate_momentum_portfolio_returns(
+            stock_data, strategy, momentum_period=20, rebalance_period=20, top_n=3),
+        'backtest_atr_strategy': lambda: [backtest_atr_strategy(ticker, df) for ticker, df in stock_data.items()],
+        'portfolio_integrated_backtest': lambda: portfolio_integrated_backtest(stock_data)
+    }
+
+
+def _measure(func, repeat, measure_memory):
+    """최소 실행 시간(초)과 최대 Python 메모리 할당량(MB, tracemalloc)"""
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+
+    peak_mb = None
+    if measure_memory:
+        # tracemalloc은 실행을 느리게 하므로 시간 측정과 별도로 한 번 더 실행
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return min(timings), peak_mb
+
+
+def _environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def load_benchmark_history(path):
+    """JSON 벤치마크 기록 로드 (파일이 없으면 빈 목록)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_benchmark_runs(previous, current, threshold=0.2):
+    """
+    두 실행의 같은 (대상, 규모) 결과 비교
+
+    Returns:
+    - DataFrame: name, n_tickers, n_days, previous_seconds, seconds, change(비율), regression(threshold 이상 느려짐)
+    """
+    key = ['name', 'n_tickers', 'n_days']
+    before = pd.DataFrame(previous['results'])
+    after = pd.DataFrame(current['results'])
+    if before.empty or after.empty:
+        return pd.DataFrame(columns=key + ['previous_seconds', 'seconds', 'change', 'regression'])
+    merged = after[key + ['seconds']].merge(
+        before[key + ['seconds']].rename(columns={'seconds': 'previous_seconds'}), on=key)
+    merged = merged[key + ['previous_seconds', 'seconds']]
+    merged['change'] = merged['seconds'] / merged['previous_seconds'] - 1
+    merged['regression'] = merged['change'] > threshold
+    return merged
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, targets=None, output='benchmark_results.json', repeat=1,
+                   measure_memory=True, regression_threshold=0.2, seed=42):
+    """
+    합성 데이터 규모별로 주요 계산 경로의 실행 시간, 처리량, 최대 메모리 측정
+
+    Parameters:
+    - scales: (종목 수, 거래일 수) 목록
+    - targets: 측정할 대상 이름 목록 (기본 BENCHMARK_TARGETS 전체)
+    - output: 결과를 누적할 JSON 파일 경로 (None이면 저장하지 않음)
+    - repeat: 반복 횟수 (가장 빠른 실행 시간 사용)
+    - measure_memory: tracemalloc으로 최대 메모리 측정 여부 (별도 실행 1회 추가)
+    - regression_threshold: 이전 실행보다 이 비율 이상 느려지면 회귀로 표시 (기본 20%)
+    - seed: 합성 데이터 난수 시드
+
+    Returns:
+    - dict: 이번 실행 기록 (환경 정보 + results 목록)
+    """
+    targets = list(BENCHMARK_TARGETS if targets is None else targets)
+    unknown = set(targets) - set(BENCHMARK_TARGETS)
+    if unknown:
+        raise ValueError(f"알 수 없는 벤치마크 대상입니다: {sorted(unknown)} (가능: {', '.join(BENCHMARK_TARGETS)})")
+
+    run = _environment()
+    run['repeat'] = repeat
+    results = []
+    for n_tickers, n_days in scales:
+        started = time.perf_counter()
+        stock_data = generate_synthetic_universe(n_tickers, n_days, seed=seed)
+        generate_seconds = time.perf_counter() - started
+        print(f"\n📊 {n_tickers}개 종목 × {n_days}일 (데이터 생성 {generate_seconds:.2f}초)")
+        results.append({'name': 'generate_synthetic_universe', 'n_tickers': n_tickers, 'n_days': n_days,
+                        'seconds': generate_seconds, 'rows_per_sec': n_tickers * n_days / generate_seconds,
+                        'peak_mb': None})
+
+        cases = _benchmark_cases(stock_data)
+        for name in targets:
+            seconds, peak_mb = _measure(cases[name], repeat, measure_memory)
+            results.append({'name': name, 'n_tickers': n_tickers, 'n_days': n_days, 'seconds': seconds,
+                            'rows_per_sec': n_tickers * n_days / seconds if seconds > 0 else None,
+                            'peak_mb': peak_mb})
+            memory = f", 최대 메모리 {peak_mb:.1f}MB" if peak_mb is not None else ''
+            print(f"  - {name}: {seconds:.3f}초 ({n_tickers * n_days / seconds:,.0f} 행/초{memory})")
+    run['results'] = results
+
+    if output:
+        history = load_benchmark_history(output)
+        if history:
+            comparison = compare_benchmark_runs(history[-1], run, regression_threshold)
+            regressions = comparison[comparison['regression']]
+            print(f"\n📊 이전 실행({history[-1]['timestamp']}, {history[-1].get('git_commit')}) 대비:")
+            for _, row in comparison.iterrows():
+                mark = '⚠️ ' if row['regression'] else '  '
+                print(f"{mark}{row['name']} ({row['n_tickers']}×{row['n_days']}): "
+                      f"{row['previous_seconds']:.3f}초 → {row['seconds']:.3f}초 ({row['change']:+.1%})")
+            if len(regressions) > 0:
+                print(f"⚠️  {len(regressions)}개 항목이 {regression_threshold:.0%} 이상 느려졌습니다.")
+        history.append(run)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 벤치마크 결과를 '{output}'에 저장했습니다 (누적 {len(history)}회).")
+    return run
+
+
+def _parse_scales(text):
+    return [tuple(int(value) for value in scale.lower().split('x')) for scale in text.split(',') if scale]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='주요 계산 경로 성능 벤치마크')
+    parser.add_argument('--scales', default=','.join(f'{n}x{t}' for n, t in DEFAULT_SCALES),
+                        help='종목수x거래일수 목록 (예: 10x1000,100x2520)')
+    parser.add_argument('--targets', default=None, help=f"측정 대상 (쉼표 구분, 기본 전체: {','.join(BENCHMARK_TARGETS)})")
+    parser.add_argument('--output', default='benchmark_results.json', help='결과 JSON 파일')
+    parser.add_argument('--repeat', type=int, default=1, help='반복 횟수 (최소 시간 사용)')
+    parser.add_argument('--no-memory', action='store_true', help='tracemalloc 메모리 측정 생략')
+    args = parser.parse_args()
+
+    run_benchmarks(scales=_parse_scales(args.scales),
+                   targets=args.targets.split(',') if args.targets else None,
+                   output=args.output, repeat=args.repeat, measure_memory=not args.no_memory)
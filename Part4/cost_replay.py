@@ -0,0 +1,158 @@
+import pandas as pd
+import numpy as np
+
+from parameter_sweep import _normalize_cost_scenarios
+from performance_metrics import calculate_performance_metrics_2d
+
+# 장부에 필요한 전략 결과 컬럼 (entry_type은 있으면 함께 저장)
+LEDGER_COLUMNS = ['buy_signal', 'target_price', 'open']
+
+
+def extract_trade_ledger(result):
+    """
+    전략 결과에서 비용과 무관한 총(gross) 매매 장부 추출
+
+    변동성 돌파 전략들은 신호가 거래 비용과 무관하고, 비용은 거래별 수익률
+    (시가 + 전일 Range × K에 매수 → 다음날 시가에 매도)에만 적용됩니다.
+    매수일 위치와 비용 적용 전 매수/매도 가격만 남겨 두면 비용 시나리오마다
+    전략을 다시 실행할 필요가 없습니다.
+
+    Parameters:
+    - result: 전략 함수 결과 DataFrame (buy_signal, target_price, open 컬럼 필요, slippage/commission 값은 무관)
+
+    Returns:
+    - dict: index (전체 날짜), positions (매수일 위치), entry_date, target_price (비용 전 매수가),
+            exit_price (다음날 시가, 마지막 날은 NaN), entry_type (진입 필터, 없으면 None)
+    """
+    missing = [column for column in LEDGER_COLUMNS if column not in result.columns]
+    if missing:
+        raise ValueError(f"장부 생성에 필요한 컬럼이 없습니다: {missing}")
+
+    # v5와 같이 buy_signal == True인 날만 거래 (NA는 거래 없음)
+    buy = (result['buy_signal'] == True).fillna(False).to_numpy(dtype=bool)
+    positions = np.flatnonzero(buy)
+    next_open = result['open'].shift(-1).to_numpy(dtype=float, na_value=np.nan)
+
+    entry_type = None
+    if 'entry_type' in result.columns:
+        entry_type = np.asarray(result['entry_type'].to_numpy()[positions], dtype=object)
+
+    return {
+        'index': result.index,
+        'positions': positions,
+        'entry_date': result.index[positions],
+        'target_price': result['target_price'].to_numpy(dtype=float, na_value=np.nan)[positions],
+        'exit_price': next_open[positions],
+        'entry_type': entry_type
+    }
+
+
+def make_ledger(func):
+    """전략 함수의 결과를 extract_trade_ledger 장부로 바꾸는 데코레이터 (노트북 전략용)"""
+    def wrapper(*args, **kwargs):
+        return extract_trade_ledger(func(*args, **kwargs))
+    return wrapper
+
+# 사용 예시 (노트북의 volatility_breakout_with_adx_chaikin 등 .py 파일이 없는 전략):
+# ledger = make_ledger(volatility_breakout_with_adx_chaikin)(df, k=0.3, adx_threshold=15)
+
+
+def ledger_trade_returns(ledger, slippages, commissions):
+    """
+    (시나리오, 거래) 비용 적용 후 거래별 수익률
+
+    v5/노트북 전략과 같은 식: 매수가 = target × (1 + s), 매도가 = 다음날 시가 × (1 - s),
+    수익률 = (매도가 - 매수가) / 매수가 - 2 × c
+    """
+    slippages = np.asarray(slippages, dtype=float)[:, None]
+    commissions = np.asarray(commissions, dtype=float)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        buy_price = ledger['target_price'][None, :] * (1 + slippages)
+        sell_price = ledger['exit_price'][None, :] * (1 - slippages)
+        return (sell_price - buy_price) / buy_price - (2 * commissions)
+
+
+def replay_cost_scenarios(ledger, cost_scenarios, periods_per_year=252):
+    """
+    하나의 장부에 여러 (slippage, commission) 시나리오를 한 번에 적용
+
+    거래별 수익률을 (시나리오 × 거래) broadcast로 계산한 뒤 매수일 위치에 배치하므로
+    시나리오 수가 늘어도 전략 재실행이나 DataFrame 복사가 없습니다.
+    일별 수익률/누적 수익률은 같은 비용으로 실행한 전략 결과의 'returns'/'cumulative_returns'와 같습니다.
+
+    Parameters:
+    - ledger: extract_trade_ledger 결과 (또는 전략 함수의 ledger=True 결과)
+    - cost_scenarios: 거래 비용 시나리오 목록 ({'name', 'slippage', 'commission'} 또는 (slippage, commission))
+    - periods_per_year: 연환산 기간 수 (기본 252 거래일)
+
+    Returns:
+    - returns_df: 시나리오별 일별 수익률 (날짜 × 시나리오)
+    - cumulative_df: 시나리오별 누적 수익률 (날짜 × 시나리오)
+    - summary_df: 시나리오별 total_return(%), trades, avg_return(%), win_rate(%), cost_per_trade(%),
+                  mdd(%), annual_return(%), sharpe_ratio
+    """
+    scenarios = _normalize_cost_scenarios(cost_scenarios)
+    names = [name for name, _, _ in scenarios]
+    slippages = np.array([s for _, s, _ in scenarios], dtype=float)
+    commissions = np.array([c for _, _, c in scenarios], dtype=float)
+    n_days = len(ledger['index'])
+    n_trades = len(ledger['positions'])
+
+    trade_returns = ledger_trade_returns(ledger, slippages, commissions)
+    returns = np.zeros((len(scenarios), n_days))
+    returns[:, ledger['positions']] = trade_returns
+
+    # pandas cumprod와 같이 NaN은 건너뛰고 해당 날짜만 NaN으로 표시
+    nan_days = np.isnan(returns)
+    growth = np.cumprod(np.where(nan_days, 1.0, 1 + returns), axis=1)
+    cumulative = np.where(nan_days, np.nan, growth)
+    running_max = np.maximum.accumulate(growth, axis=1) if n_days else growth
+
+    with np.errstate(invalid='ignore'):
+        wins = (trade_returns > 0).sum(axis=1)
+        avg_return = np.nanmean(trade_returns, axis=1) if n_trades else np.zeros(len(scenarios))
+        mdd = ((growth - running_max) / running_max).min(axis=1) if n_days else np.zeros(len(scenarios))
+    final_value = cumulative[:, -1] if n_days else np.ones(len(scenarios))
+
+    returns_df = pd.DataFrame(returns.T, index=ledger['index'], columns=names)
+    cumulative_df = pd.DataFrame(cumulative.T, index=ledger['index'], columns=names)
+    metrics = calculate_performance_metrics_2d(returns_df, periods_per_year)
+
+    summary_df = pd.DataFrame({
+        'cost_scenario': names,
+        'slippage': slippages,
+        'commission': commissions,
+        'total_return': (final_value - 1) * 100,
+        'trades': n_trades,
+        'avg_return': (avg_return * 100) if n_trades else 0.0,
+        'win_rate': (wins / n_trades * 100) if n_trades else 0.0,
+        'cost_per_trade': (slippages * 2 + commissions * 2) * 100 if n_trades else 0.0,
+        'mdd': mdd * 100,
+        'annual_return': metrics['annual_return'].to_numpy() * 100,
+        'sharpe_ratio': metrics['sharpe_ratio'].to_numpy()
+    })
+    return returns_df, cumulative_df, summary_df
+
+
+def replay_universe_costs(ledgers, cost_scenarios, periods_per_year=252):
+    """
+    여러 종목 장부에 비용 시나리오를 적용하고 요약을 하나의 테이블로 합침
+
+    Parameters:
+    - ledgers: {ticker: 장부} 딕셔너리
+    - cost_scenarios: 거래 비용 시나리오 목록
+    - periods_per_year: 연환산 기간 수 (기본 252 거래일)
+
+    Returns:
+    - DataFrame: ticker 컬럼이 추가된 종목 × 시나리오 요약 테이블
+    """
+    tables = []
+    for ticker, ledger in ledgers.items():
+        _, _, summary = replay_cost_scenarios(ledger, cost_scenarios, periods_per_year)
+        summary.insert(0, 'ticker', ticker)
+        tables.append(summary)
+
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
@@ -0,0 +1,169 @@
+import pandas as pd
+import numpy as np
+
+from lean_results import ENTRY_TYPES
+from momentum_export import weights_to_long
+
+# 진입 유형 통계에서 사용하는 결과 컬럼
+SIGNAL_PANEL_COLUMNS = ['buy_signal', 'entry_type', 'returns']
+
+ATTRIBUTION_COLUMNS = ['trades', 'trade_share', 'hits', 'hit_rate', 'avg_return', 'contribution']
+
+
+def stack_signal_panel(all_results, trades_only=True):
+    """
+    종목별 전략 결과를 (date, ticker) long 형식 buy_signal / entry_type / returns 패널로 쌓기
+
+    Parameters:
+    - all_results: {ticker: 전략 결과 DataFrame} 딕셔너리 (buy_signal, entry_type, returns 컬럼 필요)
+    - trades_only: True면 buy_signal == True인 날만 남김 (기본 True, 진입 유형 통계에는 매수일만 필요)
+
+    Returns:
+    - DataFrame: date, ticker, buy_signal, entry_type (Categorical), returns 컬럼
+    """
+    dates, tickers, signals, entry_types, returns = [], [], [], [], []
+    for ticker, result in all_results.items():
+        missing = [column for column in SIGNAL_PANEL_COLUMNS if column not in result.columns]
+        if missing:
+            raise ValueError(f"{ticker}: 진입 유형 패널에 필요한 컬럼이 없습니다: {missing}")
+
+        signal = result['buy_signal']
+        buy = signal.to_numpy() if signal.dtype == bool else (signal == True).fillna(False).to_numpy(dtype=bool)
+        rows = np.flatnonzero(buy) if trades_only else np.arange(len(result))
+        dates.append(result.index[rows])
+        tickers.append(np.full(len(rows), ticker, dtype=object))
+        signals.append(buy[rows])
+        entry_types.append(np.asarray(result['entry_type'].array.take(rows), dtype=object))
+        returns.append(result['returns'].array.take(rows).to_numpy(dtype=float, na_value=np.nan))
+
+    if not dates:
+        return pd.DataFrame(columns=['date', 'ticker'] + SIGNAL_PANEL_COLUMNS)
+
+    entry_type = np.concatenate(entry_types)
+    categories = ENTRY_TYPES + sorted(set(pd.unique(entry_type[pd.notna(entry_type)])) - set(ENTRY_TYPES))
+    return pd.DataFrame({
+        'date': dates[0].append(dates[1:]),
+        'ticker': np.concatenate(tickers),
+        'buy_signal': np.concatenate(signals),
+        'entry_type': pd.Categorical(entry_type, categories=categories),
+        'returns': np.concatenate(returns)
+    })
+
+
+def rebalance_holdings(weights_history, momentum_calculation_df):
+    """
+    리밸런싱 구간별 실제 보유 종목을 (date, ticker, weight) long 형식으로 변환
+
+    weights_history는 리밸런싱일에 이전 구간 종목과 새로 선택한 종목의 가중치를 모두 기록하지만,
+    그날 포트폴리오 수익률은 새 종목으로만 계산됩니다. 각 날짜를 그날이 속한 리밸런싱 구간
+    (리밸런싱일 포함)에 배정하고 그 구간의 선택 종목만 남겨 포트폴리오 수익률과 같은 보유 내역을 만듭니다.
+
+    Parameters:
+    - weights_history: 일별 종목 가중치 DataFrame (calculate_momentum_portfolio_returns 결과)
+    - momentum_calculation_df: 리밸런싱별 모멘텀 계산과정 DataFrame (rebalance_date, ticker, selected 컬럼)
+
+    Returns:
+    - DataFrame: date, ticker, weight 컬럼 (첫 리밸런싱일 이전 날짜는 보유 종목 없음)
+    """
+    held = weights_to_long(weights_history)
+    held = held[held['weight'] > 0]
+    if momentum_calculation_df is None or momentum_calculation_df.empty or held.empty:
+        return held.iloc[:0].reset_index(drop=True)
+
+    dates = pd.DatetimeIndex(weights_history.index)
+    selected = momentum_calculation_df[momentum_calculation_df['selected'].astype(bool)]
+    # 리밸런싱일을 날짜 위치로 바꿔 구간 번호(= 그날 이전 마지막 리밸런싱일 위치)로 맞춤
+    selected_positions = dates.get_indexer(pd.DatetimeIndex(selected['rebalance_date']))
+    if (selected_positions < 0).any():
+        raise ValueError("weights_history에 없는 리밸런싱 날짜가 있습니다.")
+    rebalance_positions = np.unique(selected_positions)
+
+    held_positions = dates.get_indexer(pd.DatetimeIndex(held['date']))
+    period = np.searchsorted(rebalance_positions, held_positions, side='right') - 1
+    in_period = period >= 0
+    held = held[in_period].assign(period_start=rebalance_positions[period[in_period]])
+
+    selection = pd.DataFrame({'period_start': selected_positions,
+                              'ticker': selected['ticker'].to_numpy(dtype=object)}).drop_duplicates()
+    holdings = held.merge(selection, on=['period_start', 'ticker'], how='inner')
+    return holdings.drop(columns='period_start')
+
+
+def entry_type_attribution(weights_history, momentum_calculation_df, all_results, by_year=True,
+                           panel=None, portfolio_returns=None):
+    """
+    모멘텀 포트폴리오 편입 종목의 진입 유형별 거래 수 / 적중률 / 수익 기여도
+
+    리밸런싱 구간별 보유 종목(rebalance_holdings)과 매수일 패널을 (date, ticker)로 한 번 merge해서
+    날짜 × 종목 셀을 하나씩 조회하지 않고 진입 유형(ADX, Chaikin, OBV, GREEN2, MACD, Multiple 등)별로 집계합니다.
+
+    - trades: 편입 중 매수 신호가 발생한 거래 수
+    - trade_share: 해당 기간 전체 거래 중 비율 (%)
+    - hit_rate: 수익률 > 0 거래 비율 (%)
+    - avg_return: 거래당 평균 수익률 (%)
+    - contribution: 가중치 × 수익률 합계 = 포트폴리오 일별 수익률에 더해진 몫 (%, NaN/inf는 0으로 처리)
+
+    Parameters:
+    - weights_history: 일별 종목 가중치 DataFrame (calculate_momentum_portfolio_returns 결과)
+    - momentum_calculation_df: 리밸런싱별 모멘텀 계산과정 DataFrame (calculate_momentum_portfolio_returns 결과)
+    - all_results: {ticker: 전략 결과 DataFrame} 딕셔너리
+    - by_year: True면 연도 × 진입 유형, False면 진입 유형별 전체 집계 (기본 True)
+    - panel: stack_signal_panel 결과 (여러 포트폴리오를 분석할 때 재사용)
+    - portfolio_returns: 포트폴리오 일별 수익률 Series (주면 contribution 합계와 수익률 합계가 맞는지 확인,
+                         매수일 외 수익률이 0인 v5 계열 결과 기준)
+
+    Returns:
+    - DataFrame: (year, entry_type) 또는 entry_type 인덱스, trades/trade_share/hits/hit_rate/avg_return/contribution 컬럼
+    """
+    if panel is None:
+        panel = stack_signal_panel(all_results)
+    held = rebalance_holdings(weights_history, momentum_calculation_df)
+
+    trades = held.merge(panel[panel['buy_signal']], on=['date', 'ticker'], how='inner')
+    returns = trades['returns'].to_numpy(dtype=float)
+    clean_returns = np.where(np.isfinite(returns), returns, 0.0)
+    trades = trades.assign(
+        hit=returns > 0,
+        contribution=trades['weight'].to_numpy(dtype=float) * clean_returns
+    )
+
+    if portfolio_returns is not None:
+        portfolio = portfolio_returns.to_numpy(dtype=float, na_value=np.nan)
+        expected = np.where(np.isfinite(portfolio), portfolio, 0.0).sum()
+        if not np.isclose(trades['contribution'].sum(), expected, rtol=1e-9, atol=1e-12):
+            print(f"⚠️  진입 유형 기여도 합계({trades['contribution'].sum() * 100:.4f}%)가 "
+                  f"포트폴리오 수익률 합계({expected * 100:.4f}%)와 다릅니다.")
+
+    keys = ['entry_type']
+    if by_year:
+        trades['year'] = pd.DatetimeIndex(trades['date']).year
+        keys = ['year', 'entry_type']
+    grouped = trades.groupby(keys, observed=True, sort=True)
+
+    table = pd.DataFrame({
+        'trades': grouped.size(),
+        'hits': grouped['hit'].sum(),
+        'avg_return': grouped['returns'].mean() * 100,
+        'contribution': grouped['contribution'].sum() * 100
+    })
+    totals = table['trades'].groupby(level='year').transform('sum') if by_year else table['trades'].sum()
+    table['trade_share'] = table['trades'] / totals * 100
+    table['hit_rate'] = table['hits'] / table['trades'] * 100
+    return table[ATTRIBUTION_COLUMNS]
+
+
+def print_entry_type_attribution(table):
+    """entry_type_attribution 결과를 노트북 형식으로 출력"""
+    print("\n📊 모멘텀 포트폴리오 편입 종목의 진입 유형 분석:")
+    print("=" * 80)
+    if table.empty:
+        print("⚠️ 편입 종목의 매수 신호가 없습니다.")
+        return
+
+    print(f"{'기간':^8} | {'진입 유형':^10} | {'거래수':^8} | {'비율':^8} | {'적중률':^8} | {'평균수익':^9} | {'기여도':^9}")
+    print("-" * 80)
+    for key, row in table.iterrows():
+        period, entry_type = key if isinstance(key, tuple) else ('전체', key)
+        print(f"{str(period):^8} | {str(entry_type):^10} | {int(row['trades']):^8} | {row['trade_share']:^7.1f}% | "
+              f"{row['hit_rate']:^7.1f}% | {row['avg_return']:^8.2f}% | {row['contribution']:^8.2f}%")
+    print("=" * 80)
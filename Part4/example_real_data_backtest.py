@@ -5,17 +5,22 @@ BigQuery에서 데이터를 로드하여 테스트
 
 import pandas as pd
 import numpy as np
-from google.cloud import bigquery
-from google.oauth2 import service_account
-import matplotlib.pyplot as plt
-from backtest_strategy import *
 
-# matplotlib 한글 설정
-plt.rcParams['font.family'] = 'AppleGothic'
-plt.rcParams['axes.unicode_minus'] = False
 
-# BigQuery 클라이언트 초기화
+def _korean_pyplot():
+    """한글 폰트를 설정한 matplotlib.pyplot (그래프를 그릴 때만 import)"""
+    import matplotlib.pyplot as plt
+
+    # matplotlib 한글 설정
+    plt.rcParams['font.family'] = 'AppleGothic'
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+# BigQuery 클라이언트 초기화 (google-cloud 패키지는 데이터를 로드할 때만 import)
 def get_bigquery_client():
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
     service_account_path = "/Users/cg01-piwoo/my_quant/access_info/data/quantsungyong-663604552de9.json"
     credentials = service_account.Credentials.from_service_account_file(
         service_account_path,
@@ -25,8 +30,6 @@ def get_bigquery_client():
 
 # 간단한 데이터 로드 함수
 def load_stock_data(ticker, start_date='2020-01-01', end_date='2023-12-31'):
-    client = get_bigquery_client()
-    
     query = f"""
     WITH raw_data AS (
         SELECT 
@@ -64,6 +67,7 @@ def load_stock_data(ticker, start_date='2020-01-01', end_date='2023-12-31'):
     """
     
     try:
+        client = get_bigquery_client()
         df = client.query(query).to_dataframe()
         df['date'] = pd.to_datetime(df['date'])
         df.set_index('date', inplace=True)
@@ -72,8 +76,40 @@ def load_stock_data(ticker, start_date='2020-01-01', end_date='2023-12-31'):
         print(f"❌ 데이터 로드 실패: {e}")
         return None
 
+# 기본 변동성 돌파 백테스트 (OHLCV만 사용, 노트북 전략과 같은 목표가/익일 시가 매도 수익률)
+def volatility_breakout_backtest(df, k=0.5, slippage=0.0, commission=0.0):
+    """
+    시가 + 전일 Range × K 돌파 시 매수, 다음날 시가에 매도
+
+    Parameters:
+    - df: 주가 데이터프레임 (open/high/low/close)
+    - k: K값 (기본 0.5)
+    - slippage: 슬리피지 비율
+    - commission: 수수료 비율
+
+    Returns:
+    - DataFrame: target_price, buy_signal, returns, cumulative_returns, buy_hold_returns 컬럼
+    """
+    result = df.copy()
+    result['prev_range'] = (result['high'] - result['low']).shift(1)
+    result['target_price'] = result['open'] + result['prev_range'] * k
+    result['buy_signal'] = result['high'] > result['target_price']
+
+    buy_price = result['target_price'] * (1 + slippage)
+    sell_price = result['open'].shift(-1) * (1 - slippage)
+    result['returns'] = 0.0
+    buy = result['buy_signal'] & sell_price.notna()
+    result.loc[buy, 'returns'] = (sell_price[buy] - buy_price[buy]) / buy_price[buy] - 2 * commission
+
+    result['cumulative_returns'] = (1 + result['returns']).cumprod()
+    result['buy_hold_returns'] = result['close'] / result['close'].iloc[0]
+    return result
+
 # 메인 실행 코드
 if __name__ == "__main__":
+    from atr_backtest import backtest_atr_strategy, backtest_atr_strategy_batch, analyze_backtest_results
+    from performance_metrics import calculate_performance_metrics
+
     # 1. 데이터 로드
     print("📊 데이터 로드 중...")
     ticker = 'AAPL'  # 애플 주식
@@ -117,10 +153,11 @@ if __name__ == "__main__":
     results = {}
     
     for k in k_values:
-        result = simple_volatility_breakout_backtest(df, k=k, slippage=0.001, commission=0.0005)
+        result = volatility_breakout_backtest(df, k=k, slippage=0.001, commission=0.0005)
         total_return = (result['cumulative_returns'].iloc[-1] - 1) * 100
-        num_trades = result['num_trades'].iloc[0]
-        win_rate = result['win_rate'].iloc[0] * 100
+        trades = result.loc[result['buy_signal'], 'returns']
+        num_trades = len(trades)
+        win_rate = (trades > 0).mean() * 100 if num_trades else 0.0
         
         results[f'K={k}'] = result
         
@@ -130,73 +167,65 @@ if __name__ == "__main__":
     print(f"\nBuy & Hold: {buy_hold_return:.2f}%")
     print()
     
-    # 3. 진입/청산 전략 조합 테스트
-    print("🎯 진입/청산 전략 조합 테스트")
+    # 3. ATR 진입/청산 조합 테스트 (atr_backtest)
+    print("🎯 ATR 진입/청산 조합 테스트")
     print("-" * 60)
     
-    # 최적 K값 선택 (가장 높은 수익률)
-    best_k = 0.5
-    
-    # 다양한 조합 테스트
     test_cases = [
-        ("기본 진입 + 익일 매도", volatility_breakout_entry, next_day_exit, {'k': best_k}, {}),
-        ("기본 진입 + ATR 청산", volatility_breakout_entry, atr_based_exit, 
-         {'k': best_k}, {'take_profit_atr': 2.0, 'stop_loss_atr': 1.0, 'max_holding_days': 10}),
-        ("적응형 K + 이동평균선 청산", adaptive_k_entry, ma_based_exit,
-         {'k_min': 0.3, 'k_max': 0.7}, {'short_ma': 5, 'long_ma': 20}),
-        ("거래량 확인 + ATR 청산", volume_confirmed_entry, atr_based_exit,
-         {'k': best_k, 'volume_multiplier': 1.5}, {'take_profit_atr': 2.5, 'stop_loss_atr': 1.0}),
+        {'atr_entry_multiplier': 0.5, 'stop_loss_atr': 1.5, 'take_profit_atr': 3.0},
+        {'atr_entry_multiplier': 0.5, 'stop_loss_atr': 1.0, 'take_profit_atr': 2.0},
+        {'atr_entry_multiplier': 0.3, 'stop_loss_atr': 1.0, 'take_profit_atr': 2.5},
+        {'atr_entry_multiplier': 0.7, 'stop_loss_atr': 2.0, 'take_profit_atr': 4.0},
     ]
-    
-    for name, entry_func, exit_func, entry_params, exit_params in test_cases:
-        # 진입 전략
-        entry_result = entry_func(df, **entry_params)
-        entry_signals = entry_result['entry_signal'].sum()
-        
-        # 청산 전략
-        exit_result = exit_func(df, entry_result, **exit_params)
-        exit_signals = exit_result['exit_signal'].sum()
-        
-        # 백테스트
-        final_result = simple_backtest_entry_exit(df, entry_result, exit_result, 
-                                                 slippage=0.001, commission=0.0005)
-        
-        total_return = (final_result['cumulative_returns'].iloc[-1] - 1) * 100
-        num_trades = final_result['total_trades'].iloc[0]
-        
-        print(f"{name}:")
-        print(f"  진입신호: {entry_signals}, 청산신호: {exit_signals}, 거래횟수: {num_trades}")
-        print(f"  총 수익률: {total_return:.2f}%")
+    atr_summary = backtest_atr_strategy_batch(
+        ticker, df, [dict(case, slippage_rate=0.001, commission_rate=0.0005) for case in test_cases]
+    )
+    for _, row in atr_summary.iterrows():
+        print(f"진입 ATR×{row['atr_entry_multiplier']}, 손절 ATR×{row['stop_loss_atr']}, 익절 ATR×{row['take_profit_atr']}:")
+        print(f"  거래횟수: {row['trades']}, 승률: {row['win_rate']:.1f}%, MDD: {row['mdd']:.2f}%")
+        print(f"  총 수익률: {row['total_return']:.2f}%")
         print()
     
     # 4. 수익률 곡선 시각화
     print("📊 수익률 곡선 시각화")
     
-    plt.figure(figsize=(12, 6))
-    
     # 가장 좋은 전략 선택
-    best_result = simple_volatility_breakout_backtest(df, k=0.5, slippage=0.001, commission=0.0005)
-    
-    plt.plot(best_result.index, best_result['cumulative_returns'], 
-             label='변동성 돌파 (K=0.5)', linewidth=2)
-    plt.plot(best_result.index, best_result['buy_hold_returns'], 
-             label='Buy & Hold', linewidth=2, alpha=0.7)
-    
-    plt.title(f'{ticker} 변동성 돌파 전략 vs Buy & Hold')
-    plt.xlabel('날짜')
-    plt.ylabel('누적 수익률')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('backtest_result.png', dpi=300, bbox_inches='tight')
-    print("✅ 그래프 저장 완료: backtest_result.png")
+    best_result = volatility_breakout_backtest(df, k=0.5, slippage=0.001, commission=0.0005)
+    
+    try:
+        plt = _korean_pyplot()
+    except ImportError:
+        print("⚠️  matplotlib이 설치되어 있지 않아 그래프를 건너뜁니다.")
+    else:
+        plt.figure(figsize=(12, 6))
+        plt.plot(best_result.index, best_result['cumulative_returns'], 
+                 label='변동성 돌파 (K=0.5)', linewidth=2)
+        plt.plot(best_result.index, best_result['buy_hold_returns'], 
+                 label='Buy & Hold', linewidth=2, alpha=0.7)
+        
+        plt.title(f'{ticker} 변동성 돌파 전략 vs Buy & Hold')
+        plt.xlabel('날짜')
+        plt.ylabel('누적 수익률')
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        plt.savefig('backtest_result.png', dpi=300, bbox_inches='tight')
+        print("✅ 그래프 저장 완료: backtest_result.png")
     
     # 5. 상세 성과 분석
-    print("\n📊 상세 성과 분석")
+    print("\n📊 상세 성과 분석 (변동성 돌파 K=0.5)")
     print("-" * 60)
     
-    metrics = calculate_performance_metrics(best_result['returns'])
+    metrics = calculate_performance_metrics(best_result['returns'], best_result['cumulative_returns'] - 1)
     for key, value in metrics.items():
         print(f"{key}: {value}")
     
-    print("\n✅ 백테스트 완료!")
\ No newline at end of file
+    best_case = test_cases[int(atr_summary['total_return'].to_numpy().argmax())]
+    trades_df, portfolio_df = backtest_atr_strategy(ticker, df, slippage_rate=0.001, commission_rate=0.0005,
+                                                    **best_case)
+    print(f"\n📊 상세 성과 분석 (ATR 최고 조합: {best_case})")
+    print("-" * 60)
+    for key, value in analyze_backtest_results(trades_df, portfolio_df).items():
+        print(f"{key}: {value}")
+    
+    print("\n✅ 백테스트 완료!")
@@ -0,0 +1,242 @@
+import pandas as pd
+import numpy as np
+
+from cost_replay import ledger_trade_returns
+
+# 비트 순서 (bit i = 1 << i), v5 계열 전략 결과의 전일 기준 필터 컬럼
+FILTER_BITS = ('UPTREND', 'GREEN2', 'GREEN4', 'obv_filter', 'macd_filter', 'momentum_filter', 'atr_filter')
+
+# v5의 매수 필터 (변동성 돌파 & (OBV | GREEN2 | GREEN4)), v5_na_safe는 macd_filter 추가
+V5_ENTRY_FILTERS = ('obv_filter', 'GREEN2', 'GREEN4')
+
+COMBINATION_MODES = ('or', 'and')
+
+
+def _popcount_table(n_bits):
+    """0 ~ 2^n_bits - 1 정수의 켜진 비트 수 조회 테이블"""
+    counts = np.zeros(1 << n_bits, dtype=np.int64)
+    for bit in range(n_bits):
+        counts[1 << bit:1 << (bit + 1)] = counts[:1 << bit] + 1
+    return counts
+
+
+def filter_mask(names, filters=FILTER_BITS):
+    """필터 이름 목록 → 비트마스크 정수 (예: filter_mask(V5_ENTRY_FILTERS))"""
+    mask = 0
+    for name in names:
+        if name not in filters:
+            raise ValueError(f"필터 목록에 없는 필터입니다: {name} (가능: {', '.join(filters)})")
+        mask |= 1 << filters.index(name)
+    return mask
+
+
+def mask_names(mask, filters=FILTER_BITS):
+    """비트마스크 정수 → 켜진 필터 이름 튜플"""
+    return tuple(name for bit, name in enumerate(filters) if mask & (1 << bit))
+
+
+def build_filter_index(result, filters=FILTER_BITS, slippage=0.0, commission=0.0):
+    """
+    전략 결과의 날짜별 필터 bool 컬럼들을 하나의 작은 정수 비트마스크로 묶은 인덱스
+
+    필터 조합을 바꿔도 변하지 않는 것은 변동성 돌파일과 그날의 매매 수익률이므로,
+    돌파일(후보 거래)만 남겨 필터 비트마스크와 수익률을 함께 저장합니다.
+    결과에 없는 필터 컬럼(예: v5의 macd_filter)은 항상 0 비트입니다.
+
+    Parameters:
+    - result: v5 계열 전략 결과 DataFrame (lean 결과가 아닌 전체 결과,
+              volatility_signal/target_price/open과 필터 컬럼 필요)
+    - filters: 비트로 묶을 필터 컬럼 이름 (최대 16개, 기본 FILTER_BITS)
+    - slippage: 슬리피지 (전략 함수와 같은 식으로 적용)
+    - commission: 수수료
+
+    Returns:
+    - dict: index (전체 날짜), filters, positions (돌파일 위치), codes (돌파일별 비트마스크),
+            trade_returns (돌파일별 매매 수익률), available (결과에 있는 필터의 비트마스크)
+    """
+    filters = tuple(filters)
+    if len(filters) > 16:
+        raise ValueError(f"필터는 최대 16개까지 묶을 수 있습니다: {len(filters)}개")
+    for column in ('volatility_signal', 'target_price', 'open'):
+        if column not in result.columns:
+            raise ValueError(f"필터 인덱스 생성에 필요한 컬럼이 없습니다: {column}")
+
+    signal = (result['volatility_signal'] == True).fillna(False).to_numpy(dtype=bool)
+    positions = np.flatnonzero(signal)
+
+    dtype = np.uint8 if len(filters) <= 8 else np.uint16
+    codes = np.zeros(len(positions), dtype=dtype)
+    available = 0
+    for bit, name in enumerate(filters):
+        if name not in result.columns:
+            continue
+        available |= 1 << bit
+        on = (result[name] == True).fillna(False).to_numpy(dtype=bool)[positions]
+        codes |= (on.astype(dtype) << bit).astype(dtype)
+
+    ledger = {
+        'target_price': result['target_price'].to_numpy(dtype=float, na_value=np.nan)[positions],
+        'exit_price': result['open'].shift(-1).to_numpy(dtype=float, na_value=np.nan)[positions]
+    }
+    trade_returns = ledger_trade_returns(ledger, [slippage], [commission])[0]
+
+    return {
+        'index': result.index,
+        'filters': filters,
+        'positions': positions,
+        'codes': codes,
+        'trade_returns': trade_returns,
+        'available': available
+    }
+
+
+def combination_signals(index, masks, mode='or', required=0):
+    """
+    (조합, 돌파일) 매수 여부
+
+    - 'or': 마스크의 필터 중 하나라도 켜진 날 (빈 마스크는 거래 없음, v5와 같은 OR 조건)
+    - 'and': 마스크의 필터가 모두 켜진 날 (빈 마스크는 변동성 돌파만 적용)
+    - required: 추가로 모두 켜져 있어야 하는 필터 비트마스크 (스칼라 또는 masks와 같은 길이)
+      예: 'or' + masks=filter_mask(V5_ENTRY_FILTERS), required=filter_mask(('momentum_filter', 'atr_filter'))
+      → (obv_filter | GREEN2 | GREEN4) & momentum_filter & atr_filter
+    """
+    if mode not in COMBINATION_MODES:
+        raise ValueError(f"지원하지 않는 조합 방식입니다: {mode} (가능: {', '.join(COMBINATION_MODES)})")
+    masks = np.asarray(masks, dtype=np.int64)
+    required = np.broadcast_to(np.asarray(required, dtype=np.int64), masks.shape)
+    codes = index['codes'].astype(np.int64)[None, :]
+    matched = codes & masks[:, None]
+    if mode == 'or':
+        selected = matched != 0
+    else:
+        popcount = _popcount_table(len(index['filters']))
+        selected = popcount[matched] == popcount[masks][:, None]
+    if required.any():
+        selected &= (codes & required[:, None]) == required[:, None]
+    return selected
+
+
+def _combination_label(mask, required, mode, filters):
+    """'a|b', 'a&b', '(a|b)&c&d' 형식의 조합 이름"""
+    names = mask_names(mask, filters)
+    label = '|'.join(names) if mode == 'or' else '&'.join(names)
+    gates = mask_names(required, filters)
+    if not gates:
+        return label
+    if mode == 'or' and len(names) > 1:
+        label = f'({label})'
+    return '&'.join(([label] if label else []) + list(gates))
+
+
+def evaluate_filter_combinations(index, masks=None, modes=COMBINATION_MODES, required_masks=None):
+    """
+    필터 비트마스크 조합을 한 번에 평가
+
+    조합마다 전략 함수를 새로 쓰거나 다시 실행하지 않고, 돌파일 비트마스크에
+    마스크 연산만 적용해 (조합 × 돌파일) 매수 여부를 만든 뒤 성과를 계산합니다.
+    total_return/trades/win_rate는 같은 필터 조합으로 buy_signal을 만든 전략 결과와 같습니다.
+
+    required_masks를 주면 (mask, required) 쌍마다 'mask 조건 & required 필터 모두 충족'을 평가해
+    (obv_filter | GREEN2 | GREEN4) & momentum_filter & atr_filter 같은 진입 필터 OR 그룹 + 게이트 필터 형태도
+    비교할 수 있습니다. mask와 겹치는 required는 건너뛰고, 'and' 방식에서는 required가 mask에 합쳐진 것과
+    같으므로 required가 0인 조합만 평가합니다.
+
+    Parameters:
+    - index: build_filter_index 결과
+    - masks: 평가할 비트마스크 목록 (기본: 결과에 있는 필터로 만들 수 있는 모든 조합)
+    - modes: 조합 방식 목록 ('or', 'and')
+    - required_masks: 함께 모두 충족해야 하는 필터 비트마스크 목록 (기본 None: 0만 사용,
+                      'all'이면 결과에 있는 필터로 만들 수 있는 모든 조합)
+
+    Returns:
+    - DataFrame: 조합별 mode, mask, required, filters, n_filters, trades, total_return(%), avg_return(%),
+                 win_rate(%), mdd(%)
+    """
+    available = index['available']
+    all_masks = [mask for mask in range(1 << len(index['filters'])) if mask & ~available == 0]
+    if masks is None:
+        masks = all_masks
+    if required_masks is None:
+        required_masks = [0]
+    elif isinstance(required_masks, str) and required_masks == 'all':
+        required_masks = all_masks
+    popcount = _popcount_table(len(index['filters']))
+    returns = index['trade_returns']
+    n_days = len(index['index'])
+    # 마지막 날 거래는 다음날 시가가 없어 수익률이 NaN (전략 결과의 최종 누적 수익률도 NaN)
+    last_day_nan = (len(returns) > 0 and index['positions'][-1] == n_days - 1 and np.isnan(returns[-1]))
+
+    tables = []
+    for mode in modes:
+        pairs = [(int(mask), int(required)) for required in required_masks for mask in masks
+                 if int(mask) & int(required) == 0 and (mode == 'or' or int(required) == 0)]
+        if not pairs:
+            continue
+        mode_masks = np.array([mask for mask, _ in pairs], dtype=np.int64)
+        mode_required = np.array([required for _, required in pairs], dtype=np.int64)
+        selected = combination_signals(index, mode_masks, mode, mode_required)
+        trade_returns = np.where(selected, returns[None, :], 0.0)
+
+        with np.errstate(invalid='ignore'):
+            # pandas cumprod와 같이 NaN은 건너뜀, 돌파일 외에는 자산이 변하지 않으므로 시작 1.0만 추가
+            growth = np.cumprod(np.where(np.isnan(trade_returns), 1.0, 1 + trade_returns), axis=1)
+            growth = np.concatenate([np.ones((len(pairs), 1)), growth], axis=1)
+            running_max = np.maximum.accumulate(growth, axis=1)
+            mdd = ((growth - running_max) / running_max).min(axis=1)
+
+            trades = selected.sum(axis=1)
+            wins = (selected & (returns[None, :] > 0)).sum(axis=1)
+            valid = selected & ~np.isnan(returns)[None, :]
+            avg_return = np.where(valid.any(axis=1),
+                                  np.where(valid, returns[None, :], 0.0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1),
+                                  np.nan)
+
+        final_value = growth[:, -1]
+        if last_day_nan:
+            final_value = np.where(selected[:, -1], np.nan, final_value)
+
+        tables.append(pd.DataFrame({
+            'mode': mode,
+            'mask': mode_masks,
+            'required': mode_required,
+            'filters': [_combination_label(mask, required, mode, index['filters']) for mask, required in pairs],
+            'n_filters': popcount[mode_masks | mode_required],
+            'trades': trades,
+            'total_return': (final_value - 1) * 100,
+            'avg_return': np.where(trades > 0, avg_return * 100, 0.0),
+            'win_rate': np.where(trades > 0, wins / np.maximum(trades, 1) * 100, 0.0),
+            'mdd': mdd * 100
+        }))
+
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
+
+def evaluate_universe_combinations(results, filters=FILTER_BITS, masks=None, modes=COMBINATION_MODES,
+                                   slippage=0.0, commission=0.0, required_masks=None):
+    """
+    여러 종목의 전략 결과에 대해 필터 조합을 평가하고 하나의 테이블로 합침
+
+    Parameters:
+    - results: {ticker: 전략 결과 DataFrame} 딕셔너리 (예: v5를 종목별로 한 번 실행한 결과)
+    - filters: 비트로 묶을 필터 컬럼 이름
+    - masks: 평가할 비트마스크 목록 (기본: 모든 조합)
+    - modes: 조합 방식 목록
+    - slippage: 슬리피지
+    - commission: 수수료
+    - required_masks: 함께 모두 충족해야 하는 필터 비트마스크 목록 (evaluate_filter_combinations 참고)
+
+    Returns:
+    - DataFrame: ticker 컬럼이 추가된 종목 × 조합 결과 테이블
+    """
+    tables = []
+    for ticker, result in results.items():
+        index = build_filter_index(result, filters, slippage, commission)
+        table = evaluate_filter_combinations(index, masks, modes, required_masks)
+        table.insert(0, 'ticker', ticker)
+        tables.append(table)
+
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,189 @@
+import pandas as pd
+
+from momentum_portfolio_with_csv import build_today_signals, build_intraday_signals
+
+
+def default_lookback(momentum_period=20, atr_period=20):
+    """
+    전략을 다시 계산할 최근 구간 길이 (기본값)
+
+    ATR(rolling) → 전일 ATR → ATR 이동평균(rolling)과 모멘텀 lookback,
+    OBV/Chaikin 전전일 shift가 모두 채워지도록 여유를 둡니다.
+    """
+    return 2 * atr_period + momentum_period + 10
+
+
+def _required_rows(state, n_rows):
+    """오늘/장중 신호 계산에 필요한 최근 행 수 (오늘 모멘텀 시작 위치까지 포함)"""
+    momentum_period = state['momentum_period']
+    momentum_start_idx = max(0, state['n_common_dates'] - momentum_period - 1)
+    return max(state['lookback'], n_rows - momentum_start_idx, momentum_period + 2)
+
+
+def _refresh_tickers(state, tickers):
+    """최근 구간만 남기고 전략을 다시 계산"""
+    entries = [state['tickers'][ticker] for ticker in tickers]
+    for entry in entries:
+        entry['bars'] = entry['bars'].iloc[-_required_rows(state, entry['n_rows']):]
+
+    # 이어 붙여 계산하려면 구간이 lookback 이상이어야 함 (짧은 종목은 단독 계산)
+    stackable = [entry for entry in entries if state['stack'] and len(entry['bars']) >= state['lookback']]
+    if len(stackable) <= 1:
+        stackable = []
+    stacked_ids = {id(entry) for entry in stackable}
+    for entry in entries:
+        if id(entry) not in stacked_ids:
+            entry['result'] = state['strategy_func'](entry['bars'], **state['strategy_kwargs'])
+    if not stackable:
+        return
+
+    # 종목별 최근 구간을 이어 붙여 전략을 한 번만 호출 (호출당 pandas 오버헤드가 종목 수만큼 반복되지 않도록)
+    # 앞 종목의 값이 섞이는 행은 각 구간의 앞쪽 lookback 이내이므로 신호에 쓰는 마지막 행들은 단독 계산과 같음
+    entries = stackable
+    stacked = pd.concat([entry['bars'] for entry in entries], ignore_index=True)
+    result = state['strategy_func'](stacked, **state['strategy_kwargs'])
+    start = 0
+    for entry in entries:
+        end = start + len(entry['bars'])
+        block = result.iloc[start:end]
+        block.index = entry['bars'].index
+        entry['result'] = block
+        start = end
+
+
+def init_incremental_signal_state(stock_data, strategy_func, momentum_period=20, rebalance_period=30,
+                                  top_n=3, lookback=None, stack=True, **kwargs):
+    """
+    오늘/장중 신호를 증분 계산하기 위한 종목별 상태 생성
+
+    전체 기간 데이터는 공통 날짜 수와 종목별 행 수를 세는 데만 사용하고,
+    종목별로 최근 lookback 구간의 원본 데이터와 전략 결과만 보관합니다.
+    전략 함수는 입력 DataFrame의 인덱스를 그대로 유지해야 합니다.
+
+    Parameters:
+    - stock_data: 종목 데이터 딕셔너리 (전체 기간)
+    - strategy_func: 전략 함수
+    - momentum_period: 모멘텀 계산 기간 (기본 20일)
+    - rebalance_period: 리밸런싱 주기 (기본 30일)
+    - top_n: 상위 n개 종목 선택 (기본 3개)
+    - lookback: 전략을 다시 계산할 최근 행 수 (기본 default_lookback, 전략의 가장 긴 rolling/shift 구간보다 길어야 함)
+    - stack: 종목별 최근 구간을 이어 붙여 전략을 한 번에 계산할지 여부 (기본 True)
+        전략이 위치 기반 shift/rolling/불리언 마스크만 사용할 때 사용 (v5, v5_safe, v6 등)
+        False면 종목마다 전략을 따로 호출
+    - **kwargs: 전략 함수에 전달할 추가 인자
+
+    Returns:
+    - dict: append_bars_to_signal_state / calculate_incremental_signals에 전달할 상태
+    """
+    if lookback is None:
+        lookback = default_lookback(momentum_period, kwargs.get('atr_period', 20))
+
+    # 공통 날짜 (calculate_momentum_portfolio_returns와 같은 교집합)
+    all_dates = None
+    for df in stock_data.values():
+        all_dates = df.index.unique() if all_dates is None else all_dates.intersection(df.index)
+    common_dates = all_dates.sort_values() if all_dates is not None else pd.Index([])
+
+    state = {
+        'strategy_func': strategy_func,
+        'strategy_kwargs': kwargs,
+        'momentum_period': momentum_period,
+        'rebalance_period': rebalance_period,
+        'top_n': top_n,
+        'lookback': lookback,
+        'stack': stack,
+        'n_common_dates': len(common_dates),
+        'today_date': common_dates[-1] if len(common_dates) > 0 else None,
+        # 마지막 공통 날짜 이후의 날짜별 보유 종목 수 (모든 종목에 생기면 공통 날짜로 편입)
+        'pending_dates': {},
+        'tickers': {}
+    }
+
+    for ticker, df in stock_data.items():
+        df = df.sort_index()
+        state['tickers'][ticker] = {'bars': df, 'n_rows': len(df), 'result': None}
+        newer = df.index if state['today_date'] is None else df.index[df.index > state['today_date']]
+        for date in newer:
+            state['pending_dates'][date] = state['pending_dates'].get(date, 0) + 1
+    _refresh_tickers(state, list(state['tickers']))
+
+    print(f"✅ 증분 신호 상태 생성: {len(stock_data)}개 종목, 공통 날짜 {state['n_common_dates']}일, 최근 {lookback}일 보관")
+    return state
+
+
+def append_bars_to_signal_state(state, new_bars):
+    """
+    새 일봉을 상태에 추가하고 해당 종목의 최근 구간만 다시 계산
+
+    Parameters:
+    - state: init_incremental_signal_state 결과
+    - new_bars: {ticker: 새 행 DataFrame} (기존 마지막 날짜 이후의 행만, 한 행 이상)
+
+    Returns:
+    - dict: 갱신된 상태 (같은 객체)
+    """
+    for ticker, rows in new_bars.items():
+        if ticker not in state['tickers']:
+            raise KeyError(f"상태에 없는 종목입니다: {ticker}")
+        entry = state['tickers'][ticker]
+        rows = rows.sort_index()
+        if len(rows) == 0:
+            continue
+        if len(entry['bars']) > 0 and rows.index[0] <= entry['bars'].index[-1]:
+            raise ValueError(f"{ticker}: 마지막 날짜({entry['bars'].index[-1]}) 이후의 데이터만 추가할 수 있습니다.")
+
+        entry['bars'] = pd.concat([entry['bars'], rows])
+        entry['n_rows'] += len(rows)
+        for date in rows.index:
+            state['pending_dates'][date] = state['pending_dates'].get(date, 0) + 1
+
+    # 모든 종목에 생긴 날짜를 공통 날짜로 편입
+    n_tickers = len(state['tickers'])
+    completed = sorted(date for date, count in state['pending_dates'].items() if count == n_tickers)
+    if completed:
+        state['n_common_dates'] += len(completed)
+        state['today_date'] = completed[-1]
+        # 추가는 날짜 순서로만 가능하므로 마지막 공통 날짜 이전 날짜는 더 이상 공통이 될 수 없음
+        state['pending_dates'] = {date: count for date, count in state['pending_dates'].items()
+                                  if date > state['today_date']}
+
+    _refresh_tickers(state, [ticker for ticker, rows in new_bars.items() if len(rows) > 0])
+
+    return state
+
+
+def calculate_incremental_signals(state, calculate_today_signals=True, calculate_intraday_signals=True):
+    """
+    상태에 보관된 최근 구간으로 오늘/장중 신호 계산
+
+    calculate_momentum_portfolio_returns(..., calculate_today_signals=True,
+    calculate_intraday_signals=True)의 today_signals_df / intraday_signals_df와
+    같은 결과를 전체 기간 재계산 없이 만듭니다.
+
+    Parameters:
+    - state: init_incremental_signal_state 결과
+    - calculate_today_signals: 오늘 날짜 기준 필터 계산 여부 (기본 True)
+    - calculate_intraday_signals: 장중 필터 계산 여부 (기본 True)
+
+    Returns:
+    - today_signals_df: 오늘의 신호 DataFrame (계산하지 않으면 None)
+    - intraday_signals_df: 장중 신호 DataFrame (계산하지 않으면 None)
+    """
+    all_results = {ticker: entry['result'] for ticker, entry in state['tickers'].items()}
+    row_offsets = {ticker: entry['n_rows'] - len(entry['result']) for ticker, entry in state['tickers'].items()}
+    n_common_dates = state['n_common_dates']
+
+    today_signals_df = None
+    if calculate_today_signals and n_common_dates > 0:
+        today_signals_df = build_today_signals(
+            all_results, state['today_date'], n_common_dates, state['momentum_period'],
+            state['rebalance_period'], state['top_n'], row_offsets=row_offsets
+        )
+
+    intraday_signals_df = None
+    if calculate_intraday_signals and n_common_dates > 0:
+        intraday_signals_df = build_intraday_signals(
+            all_results, n_common_dates, state['momentum_period'], state['top_n'], row_offsets=row_offsets
+        )
+
+    return today_signals_df, intraday_signals_df
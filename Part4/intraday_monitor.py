@@ -0,0 +1,207 @@
+import asyncio
+import inspect
+
+import pandas as pd
+import numpy as np
+
+
+def init_breakout_state(intraday_signals_df, k_value=0.5, top_n=3, require_filter=True):
+    """
+    장중 변동성 돌파 감시용 목표가 테이블 생성
+
+    build_intraday_signals(또는 calculate_incremental_signals)의 전일 종가 기준
+    필터 상태와 모멘텀 순위를 읽어, 감시 대상 종목만 {ticker: 항목} 테이블로 만듭니다.
+    목표가(시가 + 어제 Range × K)는 시가가 들어오는 순간 한 번만 확정됩니다.
+
+    Parameters:
+    - intraday_signals_df: 장중 신호 DataFrame (ticker, momentum_rank, yesterday_range,
+        UPTREND_active / GREEN4_active / obv_filter_active / GREEN2_active 컬럼 필요)
+    - k_value: 변동성 돌파 K값 (기본 0.5)
+    - top_n: 모멘텀 상위 n개 종목만 감시 (기본 3개)
+    - require_filter: True면 필터가 하나 이상 켜진 종목만 감시 (기본 True)
+
+    Returns:
+    - dict: process_tick / run_breakout_monitor에 전달할 상태
+    """
+    candidates = intraday_signals_df[intraday_signals_df['momentum_rank'] <= top_n]
+
+    targets = {}
+    for _, row in candidates.iterrows():
+        filters = []
+        if row['UPTREND_active']: filters.append('ADX')
+        if row['GREEN4_active']: filters.append('Chaikin')
+        if row['obv_filter_active']: filters.append('OBV')
+        if row['GREEN2_active']: filters.append('GREEN2')
+        if require_filter and not filters:
+            continue
+        if pd.isna(row['yesterday_range']):
+            continue
+
+        targets[row['ticker']] = {
+            'ticker': row['ticker'],
+            'momentum_rank': int(row['momentum_rank']),
+            'momentum_score': row['momentum_score'],
+            'filters': filters,
+            'range_addon': float(row['yesterday_range']) * k_value,
+            'open': None,
+            'target_price': None,
+            'high': -np.inf,
+            'fired': False
+        }
+
+    state = {
+        'k_value': k_value,
+        'top_n': top_n,
+        'targets': targets,
+        'events': [],
+        'tick_count': 0
+    }
+
+    print(f"✅ 돌파 감시 대상: {len(targets)}개 종목 (K={k_value}, 상위 {top_n}개"
+          f"{', 필터 활성 종목만' if require_filter else ''})")
+    return state
+
+
+def set_open_prices(state, open_prices):
+    """
+    별도 시세(장 시작 체결가 등)로 시가를 받아 목표가 확정
+
+    시가를 지정하지 않은 종목은 process_tick에서 첫 체결가를 시가로 사용합니다.
+
+    Parameters:
+    - state: init_breakout_state 결과
+    - open_prices: {ticker: 시가} 딕셔너리
+    """
+    for ticker, open_price in open_prices.items():
+        entry = state['targets'].get(ticker)
+        if entry is None or entry['open'] is not None:
+            continue
+        entry['open'] = float(open_price)
+        entry['target_price'] = entry['open'] + entry['range_addon']
+        entry['high'] = max(entry['high'], entry['open'])
+
+
+def process_tick(state, ticker, price, timestamp=None):
+    """
+    체결 틱 하나를 처리하고 돌파가 일어나면 이벤트 반환 (종목당 1회)
+
+    감시 대상이 아니거나 이미 돌파한 종목은 딕셔너리 조회 한 번으로 건너뜁니다.
+
+    Parameters:
+    - state: init_breakout_state 결과
+    - ticker: 종목 코드
+    - price: 체결가
+    - timestamp: 체결 시각
+
+    Returns:
+    - dict 또는 None: 돌파 이벤트 (ticker, timestamp, price, open, target_price, momentum_rank, filters)
+    """
+    state['tick_count'] += 1
+    entry = state['targets'].get(ticker)
+    if entry is None or entry['fired']:
+        return None
+
+    if entry['open'] is None:
+        # 첫 체결가를 시가로 보고 목표가 확정
+        entry['open'] = price
+        entry['target_price'] = price + entry['range_addon']
+    if price <= entry['high']:
+        return None
+    entry['high'] = price
+    if price <= entry['target_price']:
+        return None
+
+    # v5와 같은 조건: 당일 고가 > 목표가
+    entry['fired'] = True
+    event = {
+        'ticker': ticker,
+        'timestamp': timestamp,
+        'price': price,
+        'open': entry['open'],
+        'target_price': entry['target_price'],
+        'momentum_rank': entry['momentum_rank'],
+        'filters': entry['filters']
+    }
+    state['events'].append(event)
+    return event
+
+
+async def replay_ticks_from_file(path, speed=None, chunksize=100000):
+    """
+    체결 기록 파일을 틱 스트림으로 재생 (실시간 시세 대신 사용하는 틱 소스)
+
+    Parameters:
+    - path: CSV 또는 Parquet 파일 (timestamp, ticker, price 컬럼, 시간순 정렬)
+    - speed: 재생 배속 (None이면 대기 없이 최대 속도, 1이면 실제 시간 간격)
+    - chunksize: CSV를 나눠 읽을 행 수
+
+    Yields:
+    - (timestamp, ticker, price) 튜플
+    """
+    if str(path).endswith('.parquet'):
+        chunks = [pd.read_parquet(path, columns=['timestamp', 'ticker', 'price'])]
+    else:
+        # 숫자로만 된 종목 코드('069500' 등)가 정수로 읽혀 앞자리 0이 사라지지 않도록 문자열로 읽음
+        chunks = pd.read_csv(path, usecols=['timestamp', 'ticker', 'price'], dtype={'ticker': str},
+                             chunksize=chunksize)
+
+    previous = None
+    for chunk in chunks:
+        timestamps = pd.to_datetime(chunk['timestamp'])
+        tickers = chunk['ticker'].astype(str).tolist()
+        prices = chunk['price'].to_numpy(dtype=float).tolist()
+        for i, timestamp in enumerate(timestamps):
+            if speed:
+                if previous is not None and timestamp > previous:
+                    await asyncio.sleep((timestamp - previous).total_seconds() / speed)
+                previous = timestamp
+            yield timestamp, tickers[i], prices[i]
+        # 최대 속도 재생에서도 청크마다 이벤트 루프에 제어권 반환
+        await asyncio.sleep(0)
+
+
+async def run_breakout_monitor(state, tick_source, on_breakout=None, stop_when_all_fired=True):
+    """
+    틱 스트림을 소비하며 돌파 이벤트 발생
+
+    노트북에서는 이미 이벤트 루프가 돌고 있으므로 await로 실행합니다.
+        state = init_breakout_state(intraday_signals, k_value=0.5)
+        events = await run_breakout_monitor(state, replay_ticks_from_file('ticks.csv'))
+
+    Parameters:
+    - state: init_breakout_state 결과
+    - tick_source: (timestamp, ticker, price)를 내보내는 async iterator (replay_ticks_from_file, 실시간 피드 등)
+    - on_breakout: 이벤트를 받을 함수 또는 코루틴 함수 (기본: 출력)
+    - stop_when_all_fired: 모든 감시 종목이 돌파하면 종료 (기본 True)
+
+    Returns:
+    - list: 이번 실행에서 발생한 돌파 이벤트 목록
+    """
+    if on_breakout is None:
+        on_breakout = _print_breakout
+
+    events = []
+    remaining = sum(1 for entry in state['targets'].values() if not entry['fired'])
+    if stop_when_all_fired and remaining == 0:
+        return events
+
+    async for timestamp, ticker, price in tick_source:
+        event = process_tick(state, ticker, price, timestamp)
+        if event is None:
+            continue
+        events.append(event)
+        result = on_breakout(event)
+        if inspect.isawaitable(result):
+            await result
+        remaining -= 1
+        if stop_when_all_fired and remaining == 0:
+            break
+
+    print(f"📊 처리한 틱: {state['tick_count']}개, 돌파 이벤트: {len(events)}개")
+    return events
+
+
+def _print_breakout(event):
+    print(f"🚀 {event['timestamp']} {event['ticker']} 돌파! 체결가 ${event['price']:.2f} > "
+          f"목표가 ${event['target_price']:.2f} (시가 ${event['open']:.2f}, "
+          f"모멘텀 {event['momentum_rank']}위, 필터: {', '.join(event['filters'])})")
@@ -0,0 +1,62 @@
+import pandas as pd
+import numpy as np
+
+# 포트폴리오 계산(calculate_momentum_portfolio_returns, 오늘/장중 신호)에서 읽는 컬럼
+LEAN_PRICE_COLUMNS = ['close', 'high', 'low', 'returns']
+LEAN_FILTER_COLUMNS = ['buy_signal', 'volatility_signal', 'UPTREND', 'GREEN4', 'obv_filter', 'GREEN2',
+                       'macd_filter', 'adx_filter', 'chaikin_filter', 'momentum_filter', 'atr_filter']
+LEAN_INDICATOR_COLUMNS = ['adx_14', 'pdi_14', 'mdi_14', 'obv_values', 'obv_9_ma']
+
+# OBV는 값이 커서 float32로 줄이면 obv_diff 부호가 바뀔 수 있으므로 원래 dtype 유지
+_KEEP_DTYPE_COLUMNS = {'obv_values', 'obv_9_ma'}
+
+# 전략 함수들이 사용하는 진입 유형 (종목 간 concat 시에도 category 유지되도록 고정)
+ENTRY_TYPES = ['none', 'ADX', 'Chaikin', 'OBV', 'GREEN2', 'MACD', 'Both', 'Multiple']
+
+
+def compact_strategy_result(result, extra_columns=None):
+    """
+    전략 결과 DataFrame을 포트폴리오 계산에 필요한 컬럼만 남긴 가벼운 형태로 변환
+
+    - 가격/수익률/지표: float32 (OBV 컬럼은 원래 dtype 유지)
+    - 필터/신호: bool (NA는 False)
+    - entry_type: Categorical
+    - 중간 계산용 shift 컬럼(adx_14_prev, obv_yesterday, close_20days_ago 등)은 제거
+
+    Parameters:
+    - result: 전략 함수 결과 DataFrame
+    - extra_columns: 추가로 남길 컬럼 리스트
+
+    Returns:
+    - DataFrame: 축소된 결과 (인덱스 동일)
+    """
+    keep = LEAN_PRICE_COLUMNS + LEAN_FILTER_COLUMNS + LEAN_INDICATOR_COLUMNS + list(extra_columns or [])
+    columns = {}
+    for column in dict.fromkeys(keep):
+        if column not in result.columns:
+            continue
+        series = result[column]
+        if column in LEAN_FILTER_COLUMNS:
+            columns[column] = series.fillna(False).astype(bool)
+        elif column in _KEEP_DTYPE_COLUMNS or not pd.api.types.is_numeric_dtype(series):
+            columns[column] = series
+        else:
+            columns[column] = series.to_numpy(dtype=np.float32, na_value=np.nan)
+
+    if 'entry_type' in result.columns:
+        entry_type = result['entry_type']
+        categories = ENTRY_TYPES + sorted(set(entry_type.dropna().unique()) - set(ENTRY_TYPES))
+        columns['entry_type'] = pd.Categorical(entry_type, categories=categories)
+
+    return pd.DataFrame(columns, index=result.index)
+
+
+def make_lean(func):
+    """전략 함수의 결과를 compact_strategy_result로 축소하는 데코레이터"""
+    def wrapper(*args, **kwargs):
+        return compact_strategy_result(func(*args, **kwargs))
+    return wrapper
+
+# 사용 예시 (노트북의 volatility_breakout_with_adx_chaikin 등 .py 파일이 없는 전략,
+# v4/v5/v6 모듈은 lean=True 사용):
+# volatility_breakout_with_adx_chaikin_lean = make_lean(volatility_breakout_with_adx_chaikin)
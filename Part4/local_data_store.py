@@ -0,0 +1,255 @@
+import os
+
+import pandas as pd
+import numpy as np
+
+# 로컬 저장소 기본 경로 (ticker=XXX/data.parquet 형태로 종목별 파티션)
+DEFAULT_STORE_DIR = os.environ.get('ETF_DATA_STORE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_store'))
+
+# (JSON 필드명, 컬럼명, BigQuery 타입) - 노트북 get_stock_data_with_indicators 쿼리와 동일한 컬럼
+INDICATOR_FIELDS = [
+    ('open', 'open', 'FLOAT64'),
+    ('high', 'high', 'FLOAT64'),
+    ('low', 'low', 'FLOAT64'),
+    ('close', 'close', 'FLOAT64'),
+    ('volume', 'volume', 'INT64'),
+    ('rsi_14_values', 'rsi_14', 'FLOAT64'),
+    ('rsi_9_signal_line', 'rsi_9_signal_line', 'FLOAT64'),
+    ('rsi_histogram', 'rsi_histogram', 'FLOAT64'),
+    ('rsi_signals', 'rsi_signals', 'STRING'),
+    ('macd_line', 'macd_line', 'FLOAT64'),
+    ('macd_9_signal_line', 'macd_9_signal_line', 'FLOAT64'),
+    ('macd_histogram', 'macd_histogram', 'FLOAT64'),
+    ('macd_signals', 'macd_signals', 'STRING'),
+    ('atr', 'atr', 'FLOAT64'),
+    ('adx_14_values', 'adx_14', 'FLOAT64'),
+    ('pdi_14_values', 'pdi_14', 'FLOAT64'),
+    ('mdi_14_values', 'mdi_14', 'FLOAT64'),
+    ('chaikin_oscillator', 'chaikin_oscillator', 'FLOAT64'),
+    ('chaikin_9_signal_line', 'chaikin_signal', 'FLOAT64'),
+    ('stochastic_k_line', 'stochastic_k_line', 'FLOAT64'),
+    ('stochastic_d_line', 'stochastic_d_line', 'FLOAT64'),
+    ('obv_values', 'obv_values', 'INT64'),
+    ('obv_9_ma', 'obv_9_ma', 'FLOAT64'),
+    ('obv_signals', 'obv_signals', 'STRING'),
+]
+
+INDICATOR_COLUMNS = [column for _, column, _ in INDICATOR_FIELDS]
+
+
+def _ticker_path(ticker, store_dir):
+    return os.path.join(store_dir, f'ticker={ticker}', 'data.parquet')
+
+
+def build_indicator_query(tickers, table='quantsungyong.finviz_data.stock_data_with_indicators'):
+    """
+    여러 종목의 전체 기간 가격/지표를 한 번에 가져오는 BigQuery 쿼리 생성
+
+    Parameters:
+    - tickers: 종목 리스트
+    - table: 원본 테이블명
+
+    Returns:
+    - str: SQL 쿼리
+    """
+    arrays = ',\n        '.join(
+        f"JSON_EXTRACT_ARRAY(data, '$.{field}') AS {column}_array" for field, column, _ in INDICATOR_FIELDS
+    )
+    values = []
+    for _, column, bq_type in INDICATOR_FIELDS:
+        value = f"JSON_EXTRACT_SCALAR(r.{column}_array[OFFSET(i.pos)], '$')"
+        if bq_type != 'STRING':
+            value = f"CAST({value} AS {bq_type})"
+        values.append(
+            f"CASE WHEN ARRAY_LENGTH(r.{column}_array) > i.pos THEN {value} ELSE NULL END AS {column}"
+        )
+    selects = ',\n      '.join(values)
+    ticker_list = ', '.join(f"'{ticker}'" for ticker in tickers)
+
+    return f"""
+    WITH raw_data AS (
+      SELECT
+        ticker,
+        JSON_EXTRACT_ARRAY(data, '$.dates') AS dates_array,
+        {arrays},
+        ARRAY_LENGTH(JSON_EXTRACT_ARRAY(data, '$.close')) AS array_length
+      FROM
+        `{table}`
+      WHERE
+        ticker IN ({ticker_list})
+    ),
+    indices AS (
+      SELECT r.ticker, pos
+      FROM raw_data r,
+      UNNEST(GENERATE_ARRAY(0, r.array_length - 1)) AS pos
+    )
+    SELECT
+      r.ticker,
+      JSON_EXTRACT_SCALAR(r.dates_array[OFFSET(i.pos)], '$') AS date,
+      {selects}
+    FROM raw_data r
+    CROSS JOIN indices i
+    WHERE i.ticker = r.ticker
+    ORDER BY r.ticker, date
+    """
+
+
+def save_stock_data(stock_data, store_dir=DEFAULT_STORE_DIR, row_group_size=None):
+    """
+    종목별 DataFrame을 로컬 Parquet 저장소에 저장 (종목당 1개 파티션)
+
+    Parameters:
+    - stock_data: {ticker: DataFrame(index=date)} 딕셔너리
+    - store_dir: 저장소 경로
+    - row_group_size: Parquet row group 크기 (기본 None: 종목당 1개, 일봉 데이터에서는 스캔이 가장 빠름)
+    """
+    for ticker, df in stock_data.items():
+        # 로더에서 다시 계산하는 파생 컬럼은 저장하지 않음
+        columns = [column for column in INDICATOR_COLUMNS if column in df.columns]
+        frame = df[columns].sort_index()
+        frame.index = pd.to_datetime(frame.index)
+        frame.index.name = 'date'
+
+        path = _ticker_path(ticker, store_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame.reset_index().to_parquet(path, index=False, row_group_size=row_group_size)
+
+    print(f"✅ {len(stock_data)}개 종목을 '{store_dir}'에 저장했습니다.")
+
+
+def sync_from_bigquery(tickers, client=None, store_dir=DEFAULT_STORE_DIR):
+    """
+    BigQuery에서 여러 종목을 한 번의 쿼리로 가져와 로컬 저장소에 저장
+
+    Parameters:
+    - tickers: 종목 리스트
+    - client: bigquery.Client (없으면 기본 인증으로 생성)
+    - store_dir: 저장소 경로
+
+    Returns:
+    - list: 저장된 종목 리스트
+    """
+    if client is None:
+        from google.cloud import bigquery
+        client = bigquery.Client()
+
+    df = client.query(build_indicator_query(tickers)).to_dataframe()
+    df['date'] = pd.to_datetime(df['date'])
+
+    stock_data = {ticker: group.drop(columns='ticker').set_index('date')
+                  for ticker, group in df.groupby('ticker', sort=False)}
+    save_stock_data(stock_data, store_dir)
+
+    missing = set(tickers) - set(stock_data)
+    if missing:
+        print(f"⚠️  BigQuery에 데이터가 없는 종목: {', '.join(sorted(missing))}")
+    return list(stock_data.keys())
+
+
+def _date_filters(start_date, end_date):
+    filters = []
+    if start_date:
+        filters.append(('date', '>=', pd.Timestamp(start_date)))
+    if end_date:
+        filters.append(('date', '<=', pd.Timestamp(end_date)))
+    return filters
+
+
+def _finalize(df):
+    """노트북 로더와 같은 후처리 (날짜 인덱스, 정렬, Chaikin 전일 값)"""
+    df = df.set_index('date')
+    df.sort_index(inplace=True)
+    # Chaikin의 전일 값 계산
+    df['chaikin_yesterday'] = df['chaikin_oscillator'].shift(1)
+    return df
+
+
+def get_stock_data_with_indicators(ticker, start_date=None, end_date=None, store_dir=DEFAULT_STORE_DIR):
+    """
+    로컬 저장소에서 가격/지표 데이터 로드 (BigQuery 로더와 같은 시그니처/컬럼)
+
+    Parameters:
+    - ticker: 종목 코드
+    - start_date: 시작일 (포함, 'YYYY-MM-DD')
+    - end_date: 종료일 (포함, 'YYYY-MM-DD')
+    - store_dir: 저장소 경로
+
+    Returns:
+    - DataFrame 또는 None (로드 실패 시)
+    """
+    try:
+        filters = _date_filters(start_date, end_date)
+        df = pd.read_parquet(_ticker_path(ticker, store_dir), filters=filters or None)
+        df = _finalize(df)
+
+        print(f"✅ {ticker} 데이터 로드 완료: {len(df)}개 레코드")
+        return df
+    except Exception as e:
+        print(f"❌ 데이터 로드 실패: {e}")
+        return None
+
+
+def load_stock_data(tickers, start_date=None, end_date=None, store_dir=DEFAULT_STORE_DIR, verbose=False):
+    """
+    여러 종목을 한 번의 스캔으로 로드 (날짜 조건은 Parquet reader로 전달)
+
+    Parameters:
+    - tickers: 종목 리스트
+    - start_date: 시작일 (포함)
+    - end_date: 종료일 (포함)
+    - store_dir: 저장소 경로
+    - verbose: 종목별 로드 메시지 출력 여부
+
+    Returns:
+    - dict: {ticker: DataFrame} (저장소에 없는 종목은 제외)
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    available = [ticker for ticker in tickers if os.path.exists(_ticker_path(ticker, store_dir))]
+    missing = [ticker for ticker in tickers if ticker not in available]
+    if missing:
+        print(f"⚠️  저장소에 없는 종목: {', '.join(missing)}")
+    if not available:
+        return {}
+
+    # ticker 파티션은 문자열로 고정 (자동 추론하면 '069500' 같은 숫자 코드가 정수 69500이 됨)
+    partitioning = ds.partitioning(pa.schema([('ticker', pa.string())]), flavor='hive')
+    dataset = ds.dataset([_ticker_path(ticker, store_dir) for ticker in available],
+                         format='parquet', partitioning=partitioning, partition_base_dir=store_dir)
+
+    expression = None
+    for column, op, value in _date_filters(start_date, end_date):
+        condition = ds.field(column) >= value if op == '>=' else ds.field(column) <= value
+        expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(filter=expression)
+    frame = table.to_pandas()
+
+    # 파티션 컬럼(ticker) 기준으로 분리
+    tickers_col = frame.pop('ticker').astype(str).to_numpy()
+    order = np.argsort(tickers_col, kind='stable')
+    frame = frame.iloc[order].reset_index(drop=True)
+    tickers_col = tickers_col[order]
+    boundaries = np.flatnonzero(tickers_col[1:] != tickers_col[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(tickers_col)]))
+
+    loaded = {}
+    for start, end in zip(starts, ends):
+        if start == end:
+            continue
+        loaded[tickers_col[start]] = _finalize(frame.iloc[start:end])
+
+    stock_data = {}
+    empty = []
+    for ticker in available:
+        if ticker in loaded:
+            stock_data[ticker] = loaded[ticker]
+            if verbose:
+                print(f"✅ {ticker} 데이터 로드 완료: {len(loaded[ticker])}개 레코드")
+        else:
+            empty.append(ticker)
+    if empty:
+        print(f"⚠️  조회 기간에 데이터가 없는 종목: {', '.join(empty)}")
+    return stock_data
@@ -0,0 +1,242 @@
+import json
+import os
+
+import pandas as pd
+import numpy as np
+
+# 파일 접미사 (calculate_momentum_portfolio_returns의 CSV 저장과 같은 이름 규칙)
+EXPORT_SUFFIXES = {
+    'momentum_calculation': '',
+    'weights': '_weights',
+    'today_signals': '_today_signals',
+    'intraday_signals': '_intraday_signals'
+}
+
+# 가중치 long 파일에 남지 않는 날짜/종목 목록 (모든 가중치가 0인 날짜/종목 포함) 저장 파일 접미사
+WEIGHTS_AXES_SUFFIX = '_weights_axes.json'
+
+_DATE_COLUMNS = ['rebalance_date', 'momentum_period_start', 'momentum_period_end',
+                 'rebalance_period_start', 'rebalance_period_end', 'date', 'signal_date']
+
+
+def weights_to_long(weights_history):
+    """
+    (날짜 × 종목) 가중치를 0이 아닌 값만 남긴 long 형식으로 변환
+
+    Parameters:
+    - weights_history: 일별 종목 가중치 DataFrame
+
+    Returns:
+    - DataFrame: date, ticker, weight 컬럼
+    """
+    values = weights_history.to_numpy(dtype=float, na_value=0.0)
+    rows, columns = np.nonzero(values)
+    return pd.DataFrame({
+        'date': weights_history.index[rows],
+        'ticker': np.asarray(weights_history.columns, dtype=object)[columns],
+        'weight': values[rows, columns]
+    })
+
+
+def long_to_weights(weights_long, dates=None, tickers=None):
+    """
+    long 형식 가중치를 (날짜 × 종목) DataFrame으로 복원 (없는 칸은 0)
+
+    Parameters:
+    - weights_long: date, ticker, weight 컬럼 DataFrame
+    - dates: 복원할 날짜 목록 (기본: 파일에 있는 날짜)
+    - tickers: 복원할 종목 목록 (기본: 파일에 있는 종목)
+
+    Returns:
+    - DataFrame: 일별 종목 가중치
+    """
+    dates = pd.Index(weights_long['date'].unique()).sort_values() if dates is None else pd.Index(dates)
+    tickers = pd.Index(weights_long['ticker'].unique()) if tickers is None else pd.Index(tickers)
+
+    values = np.zeros((len(dates), len(tickers)))
+    rows = dates.get_indexer(weights_long['date'])
+    columns = tickers.get_indexer(weights_long['ticker'])
+    keep = (rows >= 0) & (columns >= 0)
+    values[rows[keep], columns[keep]] = weights_long['weight'].to_numpy(dtype=float)[keep]
+    return pd.DataFrame(values, index=dates, columns=tickers)
+
+
+def _typed_frame(df):
+    """Parquet에 타입이 있는 컬럼으로 저장되도록 정리 (날짜 컬럼, 장중 목표가 dict 펼치기)"""
+    df = df.copy()
+    for column in _DATE_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = pd.to_datetime(df[column])
+    if 'target_multipliers' in df.columns:
+        # 펼친 target_k_* 컬럼은 target_multipliers가 있던 위치에 둠 (_restore_frame에서 같은 위치로 복원)
+        position = df.columns.get_loc('target_multipliers')
+        targets = pd.DataFrame(df.pop('target_multipliers').tolist(), index=df.index)
+        for offset, column in enumerate(targets.columns):
+            df.insert(position + offset, f'target_{column}', targets[column].astype(float))
+    for column in df.columns:
+        if df[column].dtype == object:
+            converted = df[column].infer_objects()
+            # None이 섞인 숫자 컬럼(obv_diff 등)은 float으로
+            if converted.dtype == object and converted.map(lambda v: v is None or isinstance(v, (int, float))).all():
+                converted = converted.astype(float)
+            df[column] = converted
+    return df
+
+
+def _restore_frame(df):
+    """_typed_frame으로 펼친 장중 목표가를 target_multipliers dict 컬럼으로 복원"""
+    target_columns = [column for column in df.columns if column.startswith('target_k_')]
+    if target_columns:
+        # 원래 컬럼 순서대로 첫 번째 target_k_* 위치에 복원
+        position = df.columns.get_loc(target_columns[0])
+        targets = df[target_columns].rename(columns=lambda column: column[len('target_'):])
+        df = df.drop(columns=target_columns)
+        df.insert(position, 'target_multipliers', targets.to_dict('records'))
+    return df
+
+
+def _write_table(df, path, export_format, chunksize):
+    if export_format == 'parquet':
+        df.to_parquet(path, index=False, row_group_size=chunksize)
+    else:
+        df.to_csv(path, index=False, encoding='utf-8-sig', chunksize=chunksize)
+
+
+def _write_weights(weights_history, path, export_format, chunksize):
+    """가중치를 날짜 블록 단위로 long 형식으로 변환하며 바로 기록 (전체 long 테이블을 만들지 않음)"""
+    n_dates = len(weights_history)
+    block = max(1, chunksize // max(1, weights_history.shape[1]))
+    n_rows = 0
+
+    writer = None
+    try:
+        for start in range(0, max(n_dates, 1), block):
+            chunk = weights_to_long(weights_history.iloc[start:start + block])
+            n_rows += len(chunk)
+            if export_format == 'parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            elif start == 0:
+                chunk.to_csv(path, index=False, encoding='utf-8-sig')
+            else:
+                chunk.to_csv(path, index=False, header=False, mode='a', encoding='utf-8')
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def _write_weights_axes(weights_history, path):
+    """가중치 DataFrame의 전체 날짜 인덱스와 종목 목록을 JSON으로 저장 (long 파일에는 0인 칸이 없으므로)"""
+    axes = {
+        'dates': [pd.Timestamp(date).isoformat() for date in weights_history.index],
+        'tickers': [str(ticker) for ticker in weights_history.columns]
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(axes, f, ensure_ascii=False)
+
+
+def _read_weights_axes(path):
+    """_write_weights_axes로 저장한 (날짜 인덱스, 종목 목록), 파일이 없으면 (None, None)"""
+    if not os.path.exists(path):
+        return None, None
+    with open(path, encoding='utf-8') as f:
+        axes = json.load(f)
+    return pd.DatetimeIndex(pd.to_datetime(axes['dates'])), pd.Index(axes['tickers'], dtype=object)
+
+
+def export_momentum_results(path_prefix, momentum_calculation_df=None, weights_history=None,
+                            today_signals_df=None, intraday_signals_df=None,
+                            export_format='parquet', chunksize=100000):
+    """
+    상대모멘텀 계산 결과를 타입이 있는 Parquet(또는 청크 CSV)으로 저장
+
+    가중치는 0이 아닌 값만 (date, ticker, weight) long 형식으로 저장하고,
+    전체 날짜/종목 목록은 '..._weights_axes.json'에 따로 저장해 로드 시 같은 모양으로 복원합니다.
+
+    Parameters:
+    - path_prefix: 파일 경로 접두사 (예: 'momentum_calculation_20250101' → '..._weights.parquet' 등)
+    - momentum_calculation_df: 리밸런싱별 모멘텀 계산과정 DataFrame
+    - weights_history: 일별 종목 가중치 DataFrame
+    - today_signals_df: 오늘의 신호 DataFrame
+    - intraday_signals_df: 장중 신호 DataFrame
+    - export_format: 'parquet' (기본) 또는 'csv'
+    - chunksize: 한 번에 기록할 행 수 (Parquet row group / CSV 청크)
+
+    Returns:
+    - dict: {항목: 저장한 파일 경로}
+    """
+    if export_format not in ('parquet', 'csv'):
+        raise ValueError(f"지원하지 않는 export_format입니다: {export_format} (가능: parquet, csv)")
+    extension = '.parquet' if export_format == 'parquet' else '.csv'
+    directory = os.path.dirname(path_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    frames = {
+        'momentum_calculation': momentum_calculation_df,
+        'today_signals': today_signals_df,
+        'intraday_signals': intraday_signals_df
+    }
+    paths = {}
+    for name, df in frames.items():
+        if df is None:
+            continue
+        path = f'{path_prefix}{EXPORT_SUFFIXES[name]}{extension}'
+        _write_table(_typed_frame(df), path, export_format, chunksize)
+        paths[name] = path
+
+    if weights_history is not None:
+        path = f'{path_prefix}{EXPORT_SUFFIXES["weights"]}{extension}'
+        n_rows = _write_weights(weights_history, path, export_format, chunksize)
+        _write_weights_axes(weights_history, f'{path_prefix}{WEIGHTS_AXES_SUFFIX}')
+        paths['weights'] = path
+        print(f"📊 일별 포트폴리오 가중치 {n_rows}건(0이 아닌 값)을 '{path}'에 저장했습니다.")
+
+    for name, path in paths.items():
+        if name != 'weights':
+            print(f"📊 {name}을(를) '{path}'에 저장했습니다.")
+    return paths
+
+
+def load_momentum_results(path_prefix, dense_weights=True):
+    """
+    export_momentum_results로 저장한 파일 로드 (Parquet 우선, 없으면 CSV)
+
+    Parameters:
+    - path_prefix: 저장 시 사용한 경로 접두사
+    - dense_weights: True면 가중치를 (날짜 × 종목) DataFrame으로 복원, False면 long 형식 그대로
+        (날짜/종목 목록 파일이 있으면 가중치가 모두 0인 날짜/종목도 저장 전과 같이 복원)
+
+    Returns:
+    - dict: {항목: DataFrame} (파일이 없는 항목은 제외)
+    """
+    results = {}
+    for name, suffix in EXPORT_SUFFIXES.items():
+        parquet_path = f'{path_prefix}{suffix}.parquet'
+        csv_path = f'{path_prefix}{suffix}.csv'
+        if os.path.exists(parquet_path):
+            df = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            # 숫자로만 된 종목 코드('069500' 등)가 정수로 바뀌지 않도록 문자열로 읽음
+            df = pd.read_csv(csv_path, encoding='utf-8-sig', float_precision='round_trip',
+                             dtype={'ticker': str})
+            for column in _DATE_COLUMNS:
+                if column in df.columns:
+                    df[column] = pd.to_datetime(df[column])
+        else:
+            continue
+
+        if name == 'weights':
+            if dense_weights:
+                dates, tickers = _read_weights_axes(f'{path_prefix}{WEIGHTS_AXES_SUFFIX}')
+                df = long_to_weights(df, dates, tickers)
+        else:
+            df = _restore_frame(df)
+        results[name] = df
+    return results
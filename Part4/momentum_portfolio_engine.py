@@ -0,0 +1,357 @@
+import pandas as pd
+import numpy as np
+
+from rebalance_calendar import build_rebalance_calendar, rebalance_dates as calendar_rebalance_dates
+
+
+def build_aligned_arrays(all_results, common_dates, columns=('close', 'returns')):
+    """
+    종목별 결과 DataFrame을 (날짜 × 종목) 2차원 NumPy 배열로 정렬
+
+    Parameters:
+    - all_results: {ticker: 전략 결과 DataFrame} 딕셔너리
+    - common_dates: 공통 날짜 리스트 (정렬된 상태)
+    - columns: 배열로 만들 컬럼 목록 (기본 'close', 'returns')
+
+    Returns:
+    - dict: {컬럼명: (len(common_dates), len(all_results)) float 배열}
+    """
+    common_index = pd.Index(common_dates)
+    arrays = {col: np.empty((len(common_index), len(all_results)), dtype=float) for col in columns}
+
+    for j, result in enumerate(all_results.values()):
+        # 공통 날짜의 위치만 한 번 찾아서 모든 컬럼에 재사용
+        positions = result.index.get_indexer(common_index)
+        for col in columns:
+            arrays[col][:, j] = result[col].to_numpy(dtype=float)[positions]
+
+    return arrays
+
+
+def rank_momentum(close, rebalance_positions, momentum_period):
+    """
+    모든 리밸런싱 시점의 모멘텀 스코어와 순위를 한 번에 계산
+
+    Parameters:
+    - close: (날짜 × 종목) 종가 배열
+    - rebalance_positions: 리밸런싱 날짜의 행 위치 배열
+    - momentum_period: 모멘텀 계산 기간
+
+    Returns:
+    - scores: (리밸런싱 × 종목) 모멘텀 수익률 (NaN/inf는 0)
+    - order: (리밸런싱 × 종목) 모멘텀 내림차순 종목 인덱스 (동점은 원래 순서 유지)
+    - start_positions: 리밸런싱별 모멘텀 시작 행 위치
+    - valid: 모멘텀 구간에 2개 이상의 가격이 있는지 여부
+    """
+    rebalance_positions = np.asarray(rebalance_positions)
+    start_positions = np.maximum(rebalance_positions - momentum_period, 0)
+    valid = rebalance_positions > start_positions
+
+    start_price = close[start_positions]
+    end_price = close[rebalance_positions]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(start_price > 0, end_price / start_price - 1, 0.0)
+    scores[~np.isfinite(scores)] = 0.0
+    scores[~valid] = 0.0
+
+    # 동점일 때는 기존 sorted(reverse=True)와 같이 입력 순서를 유지
+    order = np.argsort(-scores, axis=1, kind='stable')
+
+    return scores, order, start_positions, valid
+
+
+def run_vectorized_rebalance(all_results, common_dates, momentum_period=20,
+                             rebalance_period=30, top_n=3, calendar=None):
+    """
+    배열 연산 기반 상대모멘텀 리밸런싱 엔진
+
+    calculate_momentum_portfolio_returns의 리밸런싱 루프와 같은 결과를
+    (날짜 × 종목) 배열 연산으로 계산합니다.
+
+    Parameters:
+    - all_results: {ticker: 전략 결과 DataFrame} 딕셔너리 ('close', 'returns' 컬럼 필요)
+    - common_dates: 공통 날짜 리스트 (정렬된 상태)
+    - momentum_period: 모멘텀 계산 기간
+    - rebalance_period: 리밸런싱 주기 (정수 N일 또는 'daily'/'weekly'/'monthly')
+    - top_n: 상위 n개 종목 선택
+    - calendar: build_rebalance_calendar(common_dates, rebalance_period) 결과 (재사용 시)
+
+    Returns:
+    - portfolio_returns: 포트폴리오 일일 수익률 Series
+    - weights_history: 일별 종목 가중치 DataFrame
+    - momentum_calculation_df: 리밸런싱별 모멘텀 계산과정 DataFrame
+    - rebalance_dates: 리밸런싱 날짜 리스트
+    """
+    tickers = list(all_results.keys())
+    n_dates = len(common_dates)
+    n_tickers = len(tickers)
+
+    arrays = build_aligned_arrays(all_results, common_dates)
+    close = arrays['close']
+    returns = arrays['returns']
+    returns[~np.isfinite(returns)] = 0.0
+
+    # 리밸런싱 날짜와 각 날짜가 속한 리밸런싱 구간
+    if calendar is None:
+        calendar = build_rebalance_calendar(common_dates, rebalance_period)
+    rebalance_positions = calendar['rebalance_positions']
+    rebalance_dates = calendar_rebalance_dates(calendar)
+    period_ids = calendar['period_ids']
+
+    scores, order, start_positions, valid = rank_momentum(close, rebalance_positions, momentum_period)
+
+    n_selected = min(top_n, n_tickers)
+    weight = 1.0 / n_selected if n_selected > 0 else 0
+    selected = order[:, :n_selected]
+
+    # 포트폴리오 수익률: 기존 루프와 같은 순서(모멘텀 순위 순)로 누적
+    # (직접 지정한 캘린더의 첫 리밸런싱일 이전은 보유 종목 없음)
+    rows = np.flatnonzero(period_ids >= 0)
+    daily_selected = selected[period_ids[rows]]
+    daily_return = np.zeros(n_dates)
+    daily_return[rows] = _accumulate_selected_returns(returns, rows, daily_selected, weight)
+    portfolio_returns = pd.Series(daily_return, index=common_dates, dtype=float)
+
+    # 가중치 기록
+    weights = np.zeros((n_dates, n_tickers))
+    if n_selected > 0:
+        weights[rows[:, None], daily_selected] = weight
+        # 기존 루프는 구간 종료일(다음 리밸런싱일)에도 이전 종목 가중치를 기록하므로 동일하게 유지
+        if len(rebalance_positions) > 1:
+            weights[rebalance_positions[1:, None], selected[:-1]] = weight
+    weights_history = pd.DataFrame(weights, index=common_dates, columns=tickers)
+
+    momentum_calculation_df = _build_momentum_records(
+        common_dates, tickers, rebalance_positions, scores, order, start_positions,
+        valid, close, n_selected, weight
+    )
+
+    return portfolio_returns, weights_history, momentum_calculation_df, rebalance_dates
+
+
+def _accumulate_selected_returns(returns, rows, daily_selected, weight):
+    """
+    날짜별 선택 종목 수익률 × 가중치를 모멘텀 순위 순서로 합산
+
+    returns는 (..., 날짜, 종목) 형태로 앞쪽에 파라미터 축이 있어도 됩니다.
+    """
+    daily_return = np.zeros(returns.shape[:-2] + (len(rows),))
+    for rank in range(daily_selected.shape[1]):
+        daily_return += returns[..., rows, daily_selected[:, rank]] * weight
+    return daily_return
+
+
+def rebalance_returns_from_arrays(close, returns, momentum_period=20, rebalance_period=30,
+                                  top_n=3, start=0, end=None, calendar=None):
+    """
+    정렬된 (날짜 × 종목) 배열에서 [start, end) 구간의 상대모멘텀 포트폴리오 일별 수익률 계산
+
+    run_vectorized_rebalance와 같은 선택/가중 규칙이며, 리밸런싱은 start부터
+    rebalance_period마다 하고 모멘텀 lookback은 start 이전 데이터도 사용합니다
+    (start=0이면 run_vectorized_rebalance의 수익률과 동일).
+
+    Parameters:
+    - close: (날짜 × 종목) 종가 배열
+    - returns: (날짜 × 종목) 일별 수익률 배열 (NaN/inf는 0으로 정리된 상태)
+        앞쪽에 파라미터 축을 둔 (..., 날짜, 종목) 배열이면 조합별로 한 번에 계산
+    - momentum_period: 모멘텀 계산 기간
+    - rebalance_period: 리밸런싱 주기
+    - top_n: 상위 n개 종목 선택
+    - start: 구간 시작 행 위치
+    - end: 구간 끝 행 위치 (미포함, 기본 전체)
+    - calendar: 리밸런싱 캘린더 (기본: start부터 rebalance_period일마다,
+        'weekly'/'monthly' 등은 build_rebalance_calendar(dates, schedule, start, end)로 만들어 전달)
+
+    Returns:
+    - ndarray: 구간 일별 포트폴리오 수익률 (returns의 앞쪽 축 유지)
+    """
+    end = len(close) if end is None else end
+    rows = np.arange(start, end)
+    n_selected = min(top_n, close.shape[1])
+    if len(rows) == 0 or n_selected == 0:
+        return np.zeros(returns.shape[:-2] + (len(rows),))
+
+    if calendar is None:
+        calendar = build_rebalance_calendar(len(close), rebalance_period, start, end)
+    if len(calendar['rebalance_positions']) == 0:
+        return np.zeros(returns.shape[:-2] + (len(rows),))
+    _, order, _, _ = rank_momentum(close, calendar['rebalance_positions'], momentum_period)
+    period_ids = calendar['period_ids'][rows]
+    daily_selected = order[:, :n_selected][np.maximum(period_ids, 0)]
+    daily_return = _accumulate_selected_returns(returns, rows, daily_selected, 1.0 / n_selected)
+    # 첫 리밸런싱일 이전 날짜는 보유 종목 없음
+    daily_return[..., period_ids < 0] = 0.0
+    return daily_return
+
+
+def _build_momentum_records(common_dates, tickers, rebalance_positions, scores, order,
+                            start_positions, valid, close, n_selected, weight):
+    """리밸런싱 시점별 모멘텀 계산과정을 기존 레코드 형식의 DataFrame으로 변환"""
+    n_rebalances = len(rebalance_positions)
+    n_tickers = len(tickers)
+    if n_rebalances == 0 or n_tickers == 0:
+        return pd.DataFrame()
+
+    dates = np.empty(len(common_dates), dtype=object)
+    dates[:] = common_dates
+
+    rebalance_rows = np.repeat(np.arange(n_rebalances), n_tickers)
+    ticker_idx = order.ravel()
+    ranks = np.tile(np.arange(1, n_tickers + 1), n_rebalances)
+    is_valid = valid[rebalance_rows]
+    is_selected = ranks <= n_selected
+
+    start_dates = dates[rebalance_positions]
+    end_positions = np.append(rebalance_positions[1:], len(common_dates) - 1)
+
+    raw_start = close[start_positions[rebalance_rows], ticker_idx]
+    raw_end = close[rebalance_positions[rebalance_rows], ticker_idx]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_score = raw_end / raw_start - 1
+
+    period_start = np.where(is_valid, dates[start_positions[rebalance_rows]], None)
+    period_end = np.where(is_valid, start_dates[rebalance_rows], None)
+    start_price = _legacy_numeric(np.where(is_valid, raw_start, 0), ~is_valid)
+    end_price = _legacy_numeric(np.where(is_valid, raw_end, 0), ~is_valid)
+
+    # 기존 루프는 계산 불가 시 정수 0을 기록하므로 모든 값이 정수 0이면 int 컬럼이 됨
+    score_is_int_zero = ~is_valid | ~(raw_start > 0) | ~np.isfinite(raw_score)
+    momentum_score = _legacy_numeric(scores[rebalance_rows, ticker_idx] * 100, score_is_int_zero)
+
+    records = {
+        'rebalance_date': start_dates[rebalance_rows],
+        'ticker': np.asarray(tickers, dtype=object)[ticker_idx],
+        'rank': ranks,
+        'momentum_score': momentum_score,  # 퍼센트로 변환
+        'momentum_period_start': period_start,
+        'momentum_period_end': period_end,
+        'start_price': start_price,
+        'end_price': end_price,
+        'selected': is_selected,
+        'weight': _legacy_numeric(np.where(is_selected, weight, 0), ~is_selected | (n_selected == 0)),
+        'rebalance_period_start': start_dates[rebalance_rows],
+        'rebalance_period_end': dates[end_positions][rebalance_rows]
+    }
+
+    # 레코드 리스트로 만들던 기존 방식과 같은 dtype 추론
+    return pd.DataFrame({col: pd.Series(values).infer_objects() for col, values in records.items()})
+
+
+def _legacy_numeric(values, is_int_zero):
+    """모든 값이 정수 0으로 기록된 경우 기존 레코드 방식과 같이 int 배열로 반환"""
+    if np.all(is_int_zero):
+        return np.zeros(len(values), dtype=int)
+    return values
+
+
+def rolling_return_tensor(close, periods):
+    """
+    모든 날짜 × 종목 × 기간의 모멘텀 수익률 텐서를 한 번에 계산
+
+    날짜 d의 기간 p 수익률은 close[d] / close[max(d - p, 0)] - 1이며,
+    종가가 빠짐없는 구간에서 노트북의 (1 + pct_change()).prod() - 1과 같은 값입니다.
+
+    Parameters:
+    - close: (날짜 × 종목) 종가 배열
+    - periods: 모멘텀 기간 목록
+
+    Returns:
+    - ndarray: (날짜 × 종목 × 기간) 수익률 (NaN/inf는 0)
+    """
+    positions = np.arange(len(close))
+    tensor = np.empty(close.shape + (len(periods),))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, period in enumerate(periods):
+            tensor[:, :, p] = close / close[np.maximum(positions - period, 0)] - 1
+    tensor[~np.isfinite(tensor)] = 0.0
+    return tensor
+
+
+def select_top_n(scores, top_n):
+    """
+    행별 상위 n개 종목 인덱스를 점수 내림차순으로 반환
+
+    argpartition으로 n번째 점수만 찾고 후보 n개만 정렬하며,
+    동점은 sorted(..., reverse=True)와 같이 원래 종목 순서를 따릅니다.
+
+    Parameters:
+    - scores: (행 × 종목) 점수 배열 (NaN 없음)
+    - top_n: 선택할 종목 수
+
+    Returns:
+    - ndarray: (행 × min(top_n, 종목 수)) 종목 인덱스
+    """
+    n_rows, n_tickers = scores.shape
+    n_selected = min(top_n, n_tickers)
+    if n_selected == 0 or n_rows == 0:
+        return np.empty((n_rows, n_selected), dtype=np.intp)
+
+    rows = np.arange(n_rows)[:, None]
+    kth_idx = np.argpartition(-scores, n_selected - 1, axis=1)[:, n_selected - 1]
+    kth = scores[rows[:, 0], kth_idx][:, None]
+
+    # n번째 점수보다 큰 종목은 모두, 같은 종목은 앞에서부터 남은 자리만큼 선택
+    above = scores > kth
+    tied = scores == kth
+    remaining = n_selected - above.sum(axis=1, keepdims=True)
+    chosen = above | (tied & (np.cumsum(tied, axis=1) <= remaining))
+    candidates = np.nonzero(chosen)[1].reshape(n_rows, n_selected)
+
+    order = np.argsort(-scores[rows, candidates], axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def run_multi_period_rebalance(close, returns, periods, weight_sets, rebalance_period=20, top_n=3,
+                               momentum_tensor=None, calendar=None):
+    """
+    다중 기간 가중 모멘텀 리밸런싱을 여러 가중치 조합에 대해 한 번에 계산
+
+    리밸런싱 날짜의 기간별 수익률 텐서에 가중치를 곱해 조합별 점수를 만들고
+    (기간 축 tensordot과 같은 계산, 노트북과 같은 기간 순서로 합산),
+    조합별 상위 n개 종목의 수익률을 동일 가중으로 합산합니다.
+
+    Parameters:
+    - close: (날짜 × 종목) 종가 배열
+    - returns: (날짜 × 종목) 일별 수익률 배열 (NaN/inf는 0으로 정리된 상태)
+    - periods: 모멘텀 기간 목록
+    - weight_sets: (조합 × 기간) 가중치 배열
+    - rebalance_period: 리밸런싱 주기
+    - top_n: 상위 n개 종목 선택
+    - momentum_tensor: rolling_return_tensor(close, periods) 결과 (재사용 시)
+    - calendar: 리밸런싱 캘린더 (기본: rebalance_period일마다)
+
+    Returns:
+    - daily_returns: (조합 × 날짜) 포트폴리오 일별 수익률
+    - selected: (리밸런싱 × 조합 × 선택 종목) 모멘텀 순위 순 종목 인덱스
+    - rebalance_positions: 리밸런싱 날짜의 행 위치
+    """
+    weight_sets = np.atleast_2d(np.asarray(weight_sets, dtype=float))
+    n_dates, n_tickers = close.shape
+    n_sets = len(weight_sets)
+
+    if calendar is None:
+        calendar = build_rebalance_calendar(n_dates, rebalance_period)
+    rebalance_positions = calendar['rebalance_positions']
+    if momentum_tensor is None:
+        momentum_tensor = rolling_return_tensor(close, periods)
+    momentum = momentum_tensor[rebalance_positions]
+
+    # (리밸런싱 × 조합 × 종목) 점수
+    scores = np.zeros((len(rebalance_positions), n_sets, n_tickers))
+    for p in range(len(periods)):
+        scores += momentum[:, None, :, p] * weight_sets[None, :, p, None]
+
+    n_selected = min(top_n, n_tickers)
+    selected = select_top_n(scores.reshape(-1, n_tickers), top_n).reshape(len(rebalance_positions), n_sets, n_selected)
+
+    rows = np.arange(n_dates)
+    period_ids = calendar['period_ids']
+    daily_returns = np.zeros((n_sets, n_dates))
+    if n_selected > 0 and len(rebalance_positions) > 0:
+        weight = 1.0 / n_selected
+        for w in range(n_sets):
+            daily_returns[w] = _accumulate_selected_returns(returns, rows, selected[np.maximum(period_ids, 0), w], weight)
+        daily_returns[:, period_ids < 0] = 0.0
+
+    return daily_returns, selected, rebalance_positions
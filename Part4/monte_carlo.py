@@ -0,0 +1,200 @@
+import os
+
+import pandas as pd
+import numpy as np
+
+from performance_metrics import _max_drawdown
+
+BOOTSTRAP_METHODS = ('stationary', 'shuffle')
+
+DISTRIBUTION_COLUMNS = ['cagr', 'mdd', 'sharpe_ratio', 'total_return']
+
+SUMMARY_PERCENTILES = (5, 25, 50, 75, 95)
+
+# 경로 하나의 원소당 동시에 잡히는 배열 수 (인덱스, 수익률, 자산 곡선, 최고점 등) - 청크 크기 추정용
+_ARRAYS_PER_ELEMENT = 6
+
+
+def strategy_return_series(source):
+    """
+    전략 결과에서 부트스트랩할 수익률 배열과 기간(년) 추출
+
+    - 거래 내역 (backtest_atr_strategy trades_df: 'return' 컬럼) → 진입일 순 거래별 수익률
+    - 포트폴리오 DataFrame ('daily_returns' 또는 'portfolio_return' 컬럼) → 일별 수익률
+    - 전략 결과 DataFrame (v5 등 'returns' 컬럼) → 일별 수익률
+    - Series / 1차원 배열 (모멘텀 포트폴리오 수익률 등) → 일별 수익률
+    NaN/inf는 0으로 처리합니다.
+
+    Parameters:
+    - source: 전략 결과 (위 형식 중 하나)
+
+    Returns:
+    - returns: 1차원 float 배열
+    - kind: 'trade' 또는 'daily'
+    - years: 거래 내역이면 첫 진입일 ~ 마지막 청산일 기간(년), 일별이면 None (길이 / 252로 계산)
+    """
+    kind, years = 'daily', None
+    if isinstance(source, pd.DataFrame):
+        if 'return' in source.columns:
+            trades = source.sort_values('entry_date') if 'entry_date' in source.columns else source
+            values = trades['return']
+            kind = 'trade'
+            if {'entry_date', 'exit_date'} <= set(trades.columns) and len(trades) > 0:
+                span = pd.Timestamp(trades['exit_date'].max()) - pd.Timestamp(trades['entry_date'].min())
+                years = span.days / 365.25 if span.days > 0 else None
+        else:
+            column = next((c for c in ('daily_returns', 'portfolio_return', 'returns') if c in source.columns), None)
+            if column is None:
+                raise ValueError("수익률 컬럼(return / daily_returns / portfolio_return / returns)이 없습니다.")
+            values = source[column]
+    else:
+        values = source
+
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+    values = np.asarray(values, dtype=float).ravel()
+    return np.where(np.isfinite(values), values, 0.0), kind, years
+
+
+def stationary_bootstrap_indices(rng, n_paths, n, mean_block=20):
+    """
+    (경로 × 기간) stationary block bootstrap 인덱스 (Politis & Romano)
+
+    각 시점에서 1 / mean_block 확률로 임의 위치에서 새 블록을 시작하고, 아니면 직전 위치 + 1
+    (끝에서는 처음으로 순환)을 이어 씁니다. 블록 시작 위치를 누적 최댓값으로 전파해
+    파이썬 루프 없이 한 번에 만듭니다.
+    """
+    positions = np.arange(n)
+    new_block = rng.random((n_paths, n)) < (1.0 / mean_block)
+    new_block[:, 0] = True
+    block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    starts = rng.integers(0, n, size=(n_paths, n))
+    origin = np.take_along_axis(starts, block_start, axis=1)
+    return (origin + (positions - block_start)) % n
+
+
+def shuffle_indices(rng, n_paths, n):
+    """(경로 × 기간) 순서 섞기 인덱스 (각 경로는 0 ~ n-1의 순열)"""
+    return rng.permuted(np.broadcast_to(np.arange(n), (n_paths, n)), axis=1)
+
+
+def _path_metrics(paths, years, periods_per_year):
+    """(경로 × 기간) 수익률의 CAGR, MDD, 샤프 (calculate_performance_metrics_2d와 같은 정의)"""
+    wealth = np.cumprod(1 + paths, axis=1)
+    total_return = wealth[:, -1] - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(wealth[:, -1] > 0, (1 + total_return) ** (1 / years) - 1, -1.0)
+        volatility = paths.std(axis=1, ddof=1) * np.sqrt(periods_per_year) if paths.shape[1] > 1 \
+            else np.full(len(paths), np.nan)
+        sharpe_ratio = np.where(volatility > 0, cagr / volatility, 0.0)
+    return np.stack([cagr, _max_drawdown(wealth), sharpe_ratio, total_return], axis=1)
+
+
+def _simulate_chunk(returns, n_paths, seed, method, mean_block, years, periods_per_year):
+    rng = np.random.default_rng(seed)
+    if method == 'stationary':
+        indices = stationary_bootstrap_indices(rng, n_paths, len(returns), mean_block)
+    else:
+        indices = shuffle_indices(rng, n_paths, len(returns))
+    return _path_metrics(returns[indices], years, periods_per_year)
+
+
+# 워커 프로세스에 한 번만 전달되는 수익률 배열과 설정
+_WORKER_SERIES = {}
+
+
+def _init_bootstrap_worker(returns, method, mean_block, years, periods_per_year):
+    """프로세스 풀 워커 초기화: 수익률 배열과 시뮬레이션 설정 저장"""
+    _WORKER_SERIES.update({'returns': returns, 'method': method, 'mean_block': mean_block,
+                           'years': years, 'periods_per_year': periods_per_year})
+
+
+def _bootstrap_worker(task):
+    n_paths, seed = task
+    s = _WORKER_SERIES
+    return _simulate_chunk(s['returns'], n_paths, seed, s['method'], s['mean_block'],
+                           s['years'], s['periods_per_year'])
+
+
+def bootstrap_chunk_size(n, memory_budget=256 * 1024 ** 2):
+    """memory_budget(바이트) 안에서 한 번에 만들 경로 수 (경로 × 기간 배열 여러 개를 동시에 잡는 것 기준)"""
+    return max(1, int(memory_budget // (max(n, 1) * 8 * _ARRAYS_PER_ELEMENT)))
+
+
+def bootstrap_strategy_returns(source, n_paths=10000, method='stationary', mean_block=20,
+                               periods_per_year=252, memory_budget=256 * 1024 ** 2,
+                               n_jobs=1, seed=42):
+    """
+    전략 수익률의 부트스트랩 / 몬테카를로 성과 분포 (CAGR, MDD, 샤프)
+
+    과거 한 경로의 성과(cumulative_returns.iloc[-1] 등) 대신, 수익률을 재표본한 n_paths개 경로의
+    성과 분포를 계산합니다. 경로는 (경로 × 기간) 2차원 배열로 청크 단위 생성하고,
+    청크 크기는 memory_budget에 맞추며, 청크는 프로세스 풀에 나눠 실행할 수 있습니다.
+    청크별 난수 시드는 seed에서 파생하므로 n_jobs와 무관하게 같은 결과가 나옵니다.
+
+    - 'stationary': 평균 길이 mean_block의 stationary block bootstrap (자기상관/변동성 군집 유지)
+    - 'shuffle': 순서 섞기 (같은 수익률 집합의 순서만 바꿈 → 총수익/CAGR은 그대로, MDD 분포 확인용)
+
+    Parameters:
+    - source: v5 등 전략 결과 DataFrame, backtest_atr_strategy trades_df / portfolio_df,
+              모멘텀 포트폴리오 수익률 Series 또는 1차원 배열 (strategy_return_series 참고)
+    - n_paths: 시뮬레이션 경로 수 (기본 10000)
+    - method: 'stationary' 또는 'shuffle'
+    - mean_block: stationary bootstrap 평균 블록 길이 (기본 20)
+    - periods_per_year: 일별 수익률의 연환산 기간 수 (기본 252, 거래별 수익률은 거래 수 / 기간(년) 사용)
+    - memory_budget: 청크 하나가 사용할 메모리 한도 (바이트, 기본 256MB)
+    - n_jobs: 프로세스 수 (기본 1: 순차 실행, -1: 전체 CPU)
+    - seed: 난수 시드 (기본 42)
+
+    Returns:
+    - distribution_df: 경로별 cagr, mdd, sharpe_ratio, total_return
+    - summary_df: 지표별 historical (실제 경로), mean, std, p5/p25/p50/p75/p95,
+                  historical_percentile (실제 값 이하인 경로 비율, %)
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"지원하지 않는 방식입니다: {method} (가능: {', '.join(BOOTSTRAP_METHODS)})")
+    if mean_block < 1:
+        raise ValueError(f"평균 블록 길이는 1 이상이어야 합니다: {mean_block}")
+    if n_paths < 1:
+        raise ValueError(f"경로 수는 1 이상이어야 합니다: {n_paths}")
+
+    returns, kind, years = strategy_return_series(source)
+    n = len(returns)
+    if n < 2:
+        raise ValueError(f"부트스트랩하려면 수익률이 2개 이상 필요합니다: {n}개")
+    if years is None:
+        years = n / periods_per_year
+    if kind == 'trade':
+        periods_per_year = n / years
+
+    chunk = bootstrap_chunk_size(n, memory_budget)
+    sizes = [min(chunk, n_paths - start) for start in range(0, n_paths, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, seeds))
+
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if bool(n_jobs) and n_jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_bootstrap_worker,
+                                 initargs=(returns, method, mean_block, years, periods_per_year)) as executor:
+            chunks = list(executor.map(_bootstrap_worker, tasks))
+    else:
+        chunks = [_simulate_chunk(returns, size, chunk_seed, method, mean_block, years, periods_per_year)
+                  for size, chunk_seed in tasks]
+
+    distribution_df = pd.DataFrame(np.concatenate(chunks), columns=DISTRIBUTION_COLUMNS)
+    historical = _path_metrics(returns[None, :], years, periods_per_year)[0]
+
+    values = distribution_df.to_numpy()
+    summary_df = pd.DataFrame({
+        'historical': historical,
+        'mean': values.mean(axis=0),
+        'std': values.std(axis=0, ddof=1) if len(values) > 1 else np.zeros(len(DISTRIBUTION_COLUMNS)),
+        **{f'p{q}': np.percentile(values, q, axis=0) for q in SUMMARY_PERCENTILES},
+        'historical_percentile': (values <= historical).mean(axis=0) * 100
+    }, index=pd.Index(DISTRIBUTION_COLUMNS, name='metric'))
+
+    print(f"✅ 부트스트랩 완료 ({method}): {kind} 수익률 {n}개 × {n_paths:,}경로, 청크 {len(tasks)}개")
+    return distribution_df, summary_df
@@ -0,0 +1,142 @@
+import itertools
+
+import pandas as pd
+import numpy as np
+
+from momentum_portfolio_engine import build_aligned_arrays, rolling_return_tensor, run_multi_period_rebalance
+from rebalance_calendar import build_rebalance_calendar
+
+
+def _normalize_weights(weights):
+    """가중치 합이 1이 아니면 정규화 (노트북과 같은 0.001 허용 오차)"""
+    total_weight = sum(weights)
+    if abs(total_weight - 1.0) > 0.001:
+        print(f"Warning: 가중치 합이 {total_weight}입니다. 정규화합니다.")
+        weights = [weight / total_weight for weight in weights]
+    return list(weights)
+
+
+def _run_strategy(stock_data, strategy_func, **kwargs):
+    """종목별 전략 실행 후 공통 날짜와 (날짜 × 종목) 종가/수익률 배열 반환"""
+    all_results = {}
+    all_dates = None
+    for ticker, df in stock_data.items():
+        result = strategy_func(df, **kwargs)
+        all_results[ticker] = result
+        all_dates = result.index.unique() if all_dates is None else all_dates.intersection(result.index)
+
+    common_dates = sorted(list(all_dates))
+    arrays = build_aligned_arrays(all_results, common_dates)
+    arrays['returns'][~np.isfinite(arrays['returns'])] = 0.0
+    return common_dates, arrays['close'], arrays['returns']
+
+
+def calculate_multi_period_momentum_portfolio_returns(stock_data, strategy_func, momentum_configs,
+                                                     rebalance_period=20, top_n=3, **kwargs):
+    """
+    다중 기간 가중치 상대모멘텀을 적용한 포트폴리오 수익률 계산
+
+    노트북 05의 같은 이름 함수와 같은 결과를 기간별 수익률 텐서로 계산합니다.
+
+    Parameters:
+    - stock_data: 종목 데이터 딕셔너리
+    - strategy_func: 전략 함수
+    - momentum_configs: 모멘텀 설정 리스트 [{period: 20, weight: 0.5}, {period: 60, weight: 0.3}, ...]
+    - rebalance_period: 리밸런싱 주기 (기본 20일, 'daily'/'weekly'/'monthly'도 가능)
+    - top_n: 상위 n개 종목 선택 (기본 3개)
+    - **kwargs: 전략 함수에 전달할 추가 인자
+
+    Returns:
+    - portfolio_returns: 포트폴리오 일일 수익률 Series
+    - portfolio_cumulative: 누적 수익률 Series ((1 + r).cumprod())
+    - weights_history: 일별 종목 가중치 DataFrame
+    """
+    periods = [config['period'] for config in momentum_configs]
+    weights = _normalize_weights([config['weight'] for config in momentum_configs])
+
+    common_dates, close, returns = _run_strategy(stock_data, strategy_func, **kwargs)
+    calendar = build_rebalance_calendar(common_dates, rebalance_period)
+    daily_returns, selected, rebalance_positions = run_multi_period_rebalance(
+        close, returns, periods, [weights], rebalance_period, top_n, calendar=calendar
+    )
+    portfolio_returns = pd.Series(daily_returns[0], index=common_dates, dtype=float)
+
+    # 가중치 기록 (구간 종료일인 다음 리밸런싱일에도 이전 종목 가중치가 남는 기존 방식 유지)
+    selected = selected[:, 0]
+    n_selected = selected.shape[1]
+    weights_array = np.zeros((len(common_dates), len(stock_data)))
+    if n_selected > 0:
+        rows = np.arange(len(common_dates))
+        weights_array[rows[:, None], selected[calendar['period_ids']]] = 1.0 / n_selected
+        if len(rebalance_positions) > 1:
+            weights_array[rebalance_positions[1:, None], selected[:-1]] = 1.0 / n_selected
+    weights_history = pd.DataFrame(weights_array, index=common_dates, columns=list(stock_data.keys()))
+
+    # 누적 수익률 계산 (NaN 처리)
+    clean_returns = portfolio_returns.replace([np.inf, -np.inf], 0).fillna(0)
+    portfolio_cumulative = (1 + clean_returns).cumprod()
+
+    return portfolio_returns, portfolio_cumulative, weights_history
+
+
+def momentum_weight_grid(n_periods, step=0.1):
+    """
+    합이 1인 기간별 가중치 조합 목록 생성
+
+    Parameters:
+    - n_periods: 모멘텀 기간 수
+    - step: 가중치 간격 (기본 0.1)
+
+    Returns:
+    - ndarray: (조합 × 기간) 가중치 배열
+    """
+    n_steps = int(round(1 / step))
+    grid = [combo + (n_steps - sum(combo),)
+            for combo in itertools.product(range(n_steps + 1), repeat=n_periods - 1)
+            if sum(combo) <= n_steps]
+    return np.array(grid, dtype=float) / n_steps
+
+
+def sweep_multi_period_momentum(stock_data, strategy_func, periods=(20, 60, 120), weight_sets=None,
+                                rebalance_period=20, top_n=3, **kwargs):
+    """
+    다중 기간 모멘텀 가중치 조합 스윕
+
+    전략 함수와 기간별 수익률 텐서는 한 번만 계산하고,
+    모든 가중치 조합의 점수/선택/수익률을 배열 연산으로 계산합니다.
+
+    Parameters:
+    - stock_data: 종목 데이터 딕셔너리
+    - strategy_func: 전략 함수
+    - periods: 모멘텀 기간 목록 (기본 20/60/120일)
+    - weight_sets: (조합 × 기간) 가중치 (기본 momentum_weight_grid(len(periods), 0.1))
+    - rebalance_period: 리밸런싱 주기 (기본 20일, 'daily'/'weekly'/'monthly'도 가능)
+    - top_n: 상위 n개 종목 선택 (기본 3개)
+    - **kwargs: 전략 함수에 전달할 추가 인자
+
+    Returns:
+    - returns_df: 날짜 × 조합 포트폴리오 일일 수익률 DataFrame
+    - summary_df: 조합별 가중치, 총 수익률(%), CAGR(%) (CAGR 내림차순)
+    """
+    periods = list(periods)
+    if weight_sets is None:
+        weight_sets = momentum_weight_grid(len(periods), 0.1)
+    weight_sets = np.array([_normalize_weights(list(weights)) for weights in np.atleast_2d(weight_sets)])
+
+    common_dates, close, returns = _run_strategy(stock_data, strategy_func, **kwargs)
+    momentum_tensor = rolling_return_tensor(close, periods)
+    daily_returns, _, _ = run_multi_period_rebalance(
+        close, returns, periods, weight_sets, rebalance_period, top_n, momentum_tensor=momentum_tensor,
+        calendar=build_rebalance_calendar(common_dates, rebalance_period)
+    )
+
+    returns_df = pd.DataFrame(daily_returns.T, index=common_dates)
+    final_value = (1 + returns_df).prod()
+    years = len(common_dates) / 252  # 거래일 기준
+    summary_df = pd.DataFrame(weight_sets, columns=[f'weight_{period}' for period in periods])
+    summary_df['total_return'] = (final_value.to_numpy() - 1) * 100
+    summary_df['cagr'] = (final_value.to_numpy() ** (1 / years) - 1) * 100 if years > 0 else 0
+    summary_df = summary_df.sort_values('cagr', ascending=False)
+
+    print(f"✅ {len(weight_sets)}개 가중치 조합 스윕 완료 (기간: {periods}, 공통 날짜 {len(common_dates)}일)")
+    return returns_df, summary_df
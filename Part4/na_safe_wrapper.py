@@ -8,11 +8,8 @@ def make_na_safe(func):
             if "cannot convert NA to integer" in str(e):
                 # v4 함수를 대신 사용 (v4는 작동하는 것으로 확인됨)
                 print(f"⚠️  NA 에러 발생, v4 함수로 대체 실행")
-                # v4 함수가 전역에 있다고 가정
-                if 'volatility_breakout_with_all_filters_v4' in globals():
-                    return globals()['volatility_breakout_with_all_filters_v4'](*args, **kwargs)
-                else:
-                    raise e
+                from volatility_breakout_with_all_filters_v4 import volatility_breakout_with_all_filters_v4
+                return volatility_breakout_with_all_filters_v4(*args, **kwargs)
             else:
                 raise e
     return wrapper
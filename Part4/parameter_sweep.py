@@ -0,0 +1,291 @@
+import itertools
+
+import pandas as pd
+import numpy as np
+
+
+def _shift(values, periods):
+    """pandas shift와 같은 동작의 1차원 배열 shift (빈 칸은 NaN)"""
+    shifted = np.full(len(values), np.nan)
+    if periods > 0:
+        shifted[periods:] = values[:-periods]
+    elif periods < 0:
+        shifted[:periods] = values[-periods:]
+    else:
+        shifted[:] = values
+    return shifted
+
+
+def _column(df, name):
+    """Int64 등 nullable 컬럼도 NA → NaN float 배열로 변환"""
+    return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+
+def prepare_sweep_inputs(df, momentum_period=20):
+    """
+    파라미터와 무관한 전일 기준 지표들을 한 번만 계산
+
+    Parameters:
+    - df: 주가 + 지표 DataFrame (open/high/low/close, adx_14/pdi_14/mdi_14,
+          obv_values/obv_9_ma, chaikin_oscillator 컬럼 필요)
+    - momentum_period: 절대모멘텀 계산 기간 (기본 20일)
+
+    Returns:
+    - dict: 스윕에 사용하는 1차원 배열 모음
+    """
+    open_ = _column(df, 'open')
+    high = _column(df, 'high')
+    low = _column(df, 'low')
+    close = _column(df, 'close')
+    adx = _column(df, 'adx_14')
+    pdi = _column(df, 'pdi_14')
+    mdi = _column(df, 'mdi_14')
+    obv = _column(df, 'obv_values')
+    obv_ma = _column(df, 'obv_9_ma')
+    chaikin = _column(df, 'chaikin_oscillator')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        close_prev = _shift(close, 1)
+        close_ago = _shift(close, momentum_period + 1)
+        pdi_prev = _shift(pdi, 1)
+        mdi_prev = _shift(mdi, 1)
+
+        # True Range (pd.concat(...).max(axis=1)와 같이 NaN은 건너뜀)
+        tr = np.fmax(np.fmax(high - low, np.abs(high - close_prev)), np.abs(low - close_prev))
+
+        inputs = {
+            'index': df.index,
+            'open': open_,
+            'high': high,
+            'close': close,
+            'prev_range': _shift(high - low, 1),
+            'next_open': _shift(open_, -1),
+            'adx_prev': _shift(adx, 1),
+            'di_up': pdi_prev > mdi_prev,
+            'obv_up': _shift(obv, 1) > _shift(obv, 2),
+            'obv_above_ma': (_shift(obv, 1) - _shift(obv_ma, 1)) > 0,
+            'chaikin_up': _shift(chaikin, 1) > _shift(chaikin, 2),
+            'momentum': (close_prev - close_ago) / close_ago,
+            'true_range': tr
+        }
+    return inputs
+
+
+def _atr_filter(true_range, atr_period):
+    """전일 ATR > 전일 기준 ATR 이동평균 (v5와 같은 SMA ATR)"""
+    atr = pd.Series(true_range).rolling(window=atr_period).mean()
+    atr_prev = atr.shift(1)
+    atr_ma_prev = atr_prev.rolling(window=atr_period).mean()
+    return (atr_prev > atr_ma_prev).to_numpy()
+
+
+def _filter_any(inputs, adx_thresholds):
+    """(ADX 임계값, 날짜) OBV | GREEN2 | GREEN4 필터 (v5와 같은 전일 기준 조건)"""
+    adx_prev = inputs['adx_prev'][None, :]
+    thresholds = np.asarray(adx_thresholds, dtype=float)[:, None]
+    above = adx_prev > thresholds
+    below = adx_prev < thresholds
+    return (
+        (below & inputs['obv_up']) |
+        (above & inputs['di_up'] & inputs['obv_above_ma']) |
+        (above & inputs['chaikin_up'])
+    )
+
+
+def _breakout_returns(inputs, k_values, slippages, commissions):
+    """(K, 날짜) 변동성 돌파 신호와 (K, 비용, 날짜) 매매 수익률 (v5와 같은 연산 순서)"""
+    k_values = np.asarray(k_values, dtype=float)
+    slippages = np.asarray(slippages, dtype=float)
+    commissions = np.asarray(commissions, dtype=float)
+
+    target = inputs['open'][None, :] + inputs['prev_range'][None, :] * k_values[:, None]
+    volatility_signal = inputs['high'][None, :] > target
+
+    buy_price = target[:, None, :] * (1 + slippages[None, :, None])
+    sell_price = np.where(slippages[:, None] > 0,
+                          inputs['next_open'][None, :] * (1 - slippages[:, None]),
+                          inputs['next_open'][None, :])[None, :, :]
+    trade_return = (sell_price - buy_price) / buy_price
+    trade_return = np.where(commissions[None, :, None] > 0,
+                            trade_return - (2 * commissions[None, :, None]),
+                            trade_return)
+    return volatility_signal, trade_return
+
+
+def daily_strategy_returns(inputs, k_values, adx_thresholds, slippage=0.0, commission=0.0):
+    """
+    prepare_sweep_inputs 결과로 (K, ADX) 조합별 v5 일별 수익률을 한 번에 계산
+
+    Parameters:
+    - inputs: prepare_sweep_inputs 결과
+    - k_values: K값 목록
+    - adx_thresholds: ADX 임계값 목록
+    - slippage: 슬리피지
+    - commission: 수수료
+
+    Returns:
+    - ndarray: (K, ADX, 날짜) 일별 수익률 (v5 결과의 'returns' 컬럼과 동일)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        filter_any = _filter_any(inputs, adx_thresholds)
+        volatility_signal, trade_return = _breakout_returns(inputs, k_values, [slippage], [commission])
+        buy_signal = volatility_signal[:, None, :] & filter_any[None, :, :]
+        return np.where(buy_signal, trade_return[:, 0, None, :], 0.0)
+
+
+def _normalize_cost_scenarios(cost_scenarios):
+    """[{'slippage':, 'commission':}, ...] 또는 [(slippage, commission), ...]를 (이름, s, c) 리스트로 변환"""
+    scenarios = []
+    for scenario in cost_scenarios:
+        if isinstance(scenario, dict):
+            slippage = scenario.get('slippage', 0.0)
+            commission = scenario.get('commission', 0.0)
+            name = scenario.get('name', f's{slippage}_c{commission}')
+        else:
+            slippage, commission = scenario
+            name = f's{slippage}_c{commission}'
+        scenarios.append((name, slippage, commission))
+    return scenarios
+
+
+def sweep_volatility_breakout_v5(df, k_values=(0.3, 0.5, 0.7), adx_thresholds=(15, 20, 25),
+                                 momentum_thresholds=(0.0,), atr_periods=(20,),
+                                 cost_scenarios=({'slippage': 0.0, 'commission': 0.0},),
+                                 momentum_period=20, apply_momentum_filter=False,
+                                 apply_atr_filter=False, inputs=None):
+    """
+    volatility_breakout_with_all_filters_v5 파라미터 그리드를 한 번에 평가
+
+    전일 기준 지표(shift)는 한 번만 계산하고, 파라미터 조합은 broadcast 배열로
+    계산하므로 조합마다 DataFrame을 복사하지 않습니다.
+
+    v5의 buy_signal은 변동성 돌파 & (OBV | GREEN2 | GREEN4)이며 momentum_filter,
+    atr_filter는 계산만 하고 매수 조건에는 사용하지 않습니다. 기본값
+    (apply_momentum_filter=False, apply_atr_filter=False)은 v5와 같은 결과를 내고,
+    True로 지정하면 해당 필터를 매수 조건에 AND로 추가합니다.
+
+    Parameters:
+    - df: 주가 + 지표 DataFrame
+    - k_values: K값 목록
+    - adx_thresholds: ADX 임계값 목록
+    - momentum_thresholds: 절대 모멘텀 임계값 목록
+    - atr_periods: ATR 계산 기간 목록
+    - cost_scenarios: 거래 비용 시나리오 목록 ({'name', 'slippage', 'commission'} 또는 (slippage, commission))
+    - momentum_period: 절대모멘텀 계산 기간 (기본 20일)
+    - apply_momentum_filter: 절대모멘텀 필터를 매수 조건에 추가할지 여부 (기본 False)
+    - apply_atr_filter: ATR 필터를 매수 조건에 추가할지 여부 (기본 False)
+    - inputs: prepare_sweep_inputs 결과 (여러 번 스윕할 때 재사용)
+
+    Returns:
+    - DataFrame: 조합별 total_return(%), trades, win_rate(%), mdd(%) 결과 테이블
+    """
+    if inputs is None:
+        inputs = prepare_sweep_inputs(df, momentum_period)
+
+    k_values = np.asarray(k_values, dtype=float)
+    adx_thresholds = np.asarray(adx_thresholds, dtype=float)
+    momentum_thresholds = np.asarray(momentum_thresholds, dtype=float)
+    atr_periods = list(atr_periods)
+    scenarios = _normalize_cost_scenarios(cost_scenarios)
+    slippages = np.array([s for _, s, _ in scenarios], dtype=float)
+    commissions = np.array([c for _, _, c in scenarios], dtype=float)
+    n_days = len(inputs['close'])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # (ADX, 날짜): OBV | GREEN2 | GREEN4 필터
+        filter_any = _filter_any(inputs, adx_thresholds)
+
+        # (모멘텀, 날짜) / (ATR 기간, 날짜)
+        if apply_momentum_filter:
+            momentum_ok = inputs['momentum'][None, :] > momentum_thresholds[:, None]
+        else:
+            momentum_ok = np.ones((len(momentum_thresholds), n_days), dtype=bool)
+        if apply_atr_filter:
+            atr_ok = np.array([_atr_filter(inputs['true_range'], p) for p in atr_periods])
+        else:
+            atr_ok = np.ones((len(atr_periods), n_days), dtype=bool)
+
+        # (K, 날짜) 돌파 신호와 (K, 비용, 날짜) 매매 수익률
+        volatility_signal, trade_return = _breakout_returns(inputs, k_values, slippages, commissions)
+
+        # (K, ADX, 모멘텀, ATR, 날짜) 매수 신호
+        buy_signal = (
+            volatility_signal[:, None, None, None, :] &
+            filter_any[None, :, None, None, :] &
+            momentum_ok[None, None, :, None, :] &
+            atr_ok[None, None, None, :, :]
+        )
+
+        # (K, ADX, 모멘텀, ATR, 비용, 날짜) 일별 수익률
+        returns = np.where(buy_signal[..., None, :], trade_return[:, None, None, None, :, :], 0.0)
+
+    trades = buy_signal.sum(axis=-1)
+    wins = (returns > 0).sum(axis=-1)
+
+    # 누적 수익률은 pandas cumprod와 같이 NaN을 건너뛰되 마지막 값이 NaN이면 NaN
+    growth = np.cumprod(np.where(np.isnan(returns), 1.0, 1 + returns), axis=-1)
+    final_value = np.where(np.isnan(returns[..., -1]), np.nan, growth[..., -1])
+    running_max = np.maximum.accumulate(growth, axis=-1)
+    mdd = ((growth - running_max) / running_max).min(axis=-1)
+
+    grid = list(itertools.product(range(len(k_values)), range(len(adx_thresholds)),
+                                  range(len(momentum_thresholds)), range(len(atr_periods)),
+                                  range(len(scenarios))))
+    ki, ai, mi, pi, ci = (np.array(axis) for axis in zip(*grid))
+    trade_counts = trades[ki, ai, mi, pi]
+
+    return pd.DataFrame({
+        'k': k_values[ki],
+        'adx_threshold': adx_thresholds[ai],
+        'momentum_threshold': momentum_thresholds[mi],
+        'atr_period': np.asarray(atr_periods)[pi],
+        'cost_scenario': [scenarios[c][0] for c in ci],
+        'slippage': slippages[ci],
+        'commission': commissions[ci],
+        'total_return': (final_value[ki, ai, mi, pi, ci] - 1) * 100,
+        'trades': trade_counts,
+        'win_rate': np.where(trade_counts > 0,
+                             wins[ki, ai, mi, pi, ci] / np.maximum(trade_counts, 1) * 100, 0.0),
+        'mdd': mdd[ki, ai, mi, pi, ci] * 100
+    })
+
+
+def sweep_universe(stock_data, momentum_period=20, **grid):
+    """
+    여러 종목에 대해 sweep_volatility_breakout_v5를 실행하고 하나의 테이블로 합침
+
+    Parameters:
+    - stock_data: {ticker: DataFrame} 딕셔너리
+    - momentum_period: 절대모멘텀 계산 기간 (기본 20일)
+    - **grid: sweep_volatility_breakout_v5에 전달할 그리드/옵션 인자
+
+    Returns:
+    - DataFrame: ticker 컬럼이 추가된 조합별 결과 테이블
+    """
+    tables = []
+    for ticker, df in stock_data.items():
+        table = sweep_volatility_breakout_v5(df, momentum_period=momentum_period, **grid)
+        table.insert(0, 'ticker', ticker)
+        tables.append(table)
+
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
+
+def best_parameters(sweep_df, metric='total_return', by='ticker'):
+    """
+    스윕 결과에서 그룹별 최적 파라미터 조합 선택
+
+    Parameters:
+    - sweep_df: sweep_volatility_breakout_v5 / sweep_universe 결과
+    - metric: 최적화 기준 컬럼 (기본 'total_return')
+    - by: 그룹 컬럼 (기본 'ticker', None이면 전체에서 1개)
+
+    Returns:
+    - DataFrame: 그룹별 metric 최댓값 행
+    """
+    ranked = sweep_df.dropna(subset=[metric])
+    if by is None or by not in ranked.columns:
+        return ranked.loc[[ranked[metric].idxmax()]]
+    return ranked.loc[ranked.groupby(by)[metric].idxmax()].reset_index(drop=True)
@@ -0,0 +1,388 @@
+import pandas as pd
+import numpy as np
+
+
+def calculate_performance_metrics(returns, cumulative_returns):
+    """성과 지표 계산"""
+    if len(returns) == 0 or len(cumulative_returns) == 0:
+        return {
+            'total_return': 0,
+            'annual_return': 0,
+            'volatility': 0,
+            'sharpe_ratio': 0,
+            'mdd': 0,
+            'win_rate': 0,
+            'avg_win': 0,
+            'avg_loss': 0,
+            'trade_count': 0
+        }
+
+    try:
+        # 기본 지표
+        total_return = cumulative_returns.iloc[-1] if len(cumulative_returns) > 0 else 0
+
+        # 연환산 수익률
+        years = len(returns) / 252
+        annual_return = (1 + total_return) ** (1/years) - 1 if years > 0 else 0
+
+        # 변동성
+        volatility = returns.std() * np.sqrt(252)
+
+        # 샤프 비율
+        sharpe_ratio = annual_return / volatility if volatility > 0 else 0
+
+        # MDD
+        cumulative_returns_series = pd.Series(cumulative_returns)
+        running_max = cumulative_returns_series.expanding().max()
+        drawdown = (cumulative_returns_series - running_max) / (1 + running_max)
+        mdd = drawdown.min()
+
+        # 승률
+        wins = returns[returns > 0]
+        losses = returns[returns < 0]
+        win_rate = len(wins) / len(returns) if len(returns) > 0 else 0
+
+        # 평균 손익
+        avg_win = wins.mean() if len(wins) > 0 else 0
+        avg_loss = losses.mean() if len(losses) > 0 else 0
+
+        return {
+            'total_return': total_return,
+            'annual_return': annual_return,
+            'volatility': volatility,
+            'sharpe_ratio': sharpe_ratio,
+            'mdd': mdd,
+            'win_rate': win_rate,
+            'avg_win': avg_win,
+            'avg_loss': avg_loss,
+            'trade_count': len(returns)
+        }
+    except Exception as e:
+        print(f"성과 지표 계산 중 오류: {e}")
+        return {
+            'total_return': 0,
+            'annual_return': 0,
+            'volatility': 0,
+            'sharpe_ratio': 0,
+            'mdd': 0,
+            'win_rate': 0,
+            'avg_win': 0,
+            'avg_loss': 0,
+            'trade_count': 0
+        }
+
+
+def calculate_portfolio_returns(all_results, tickers, engine='numpy'):
+    """
+    여러 종목의 포트폴리오 수익률 계산 (동일 가중)
+
+    Parameters:
+    - all_results: {ticker: 결과 DataFrame} ('daily_return', 'buy_hold_return' 컬럼 필요)
+    - tickers: 포함할 종목 리스트 (all_results에 없는 종목은 무시)
+    - engine: 계산 방식 (기본 'numpy')
+        'numpy' - 전체 날짜 × 종목 배열로 한 번에 계산
+        'python' - 기존 날짜별 루프
+
+    Returns:
+    - DataFrame: portfolio_return, buy_hold_return, active_tickers,
+                 portfolio_cumulative, buy_hold_cumulative (index=date)
+    """
+    if engine == 'python':
+        return _portfolio_returns_python(all_results, tickers)
+
+    frames = [all_results[ticker] for ticker in tickers if ticker in all_results]
+
+    # 모든 거래일 (합집합, 정렬)
+    all_dates = None
+    for result in frames:
+        all_dates = result.index.unique() if all_dates is None else all_dates.union(result.index)
+    if all_dates is None or len(all_dates) == 0:
+        return pd.DataFrame(columns=['portfolio_return', 'buy_hold_return', 'active_tickers',
+                                     'portfolio_cumulative', 'buy_hold_cumulative'])
+    all_dates = all_dates.sort_values()
+
+    n_dates = len(all_dates)
+    daily = np.zeros((n_dates, len(frames)))
+    buy_hold = np.zeros((n_dates, len(frames)))
+    present = np.zeros((n_dates, len(frames)), dtype=bool)
+    for j, result in enumerate(frames):
+        positions = all_dates.get_indexer(result.index)
+        daily[positions, j] = result['daily_return'].to_numpy(dtype=float, na_value=np.nan)
+        buy_hold[positions, j] = result['buy_hold_return'].to_numpy(dtype=float, na_value=np.nan)
+        present[positions, j] = True
+
+    # 날짜별로 보유 종목만 모아 평균 (np.mean과 같은 합산 순서가 되도록 보유 패턴별로 묶어서 계산)
+    # 종목 값이 NaN이면 기존과 같이 그날 평균도 NaN
+    portfolio_return = np.empty(n_dates)
+    buy_hold_return = np.empty(n_dates)
+    patterns, pattern_ids = np.unique(present, axis=0, return_inverse=True)
+    pattern_ids = pattern_ids.reshape(-1)
+    for p, pattern in enumerate(patterns):
+        rows = np.flatnonzero(pattern_ids == p)
+        columns = np.flatnonzero(pattern)
+        if len(columns) == 0:
+            continue
+        block = np.ascontiguousarray(daily[np.ix_(rows, columns)])
+        portfolio_return[rows] = np.add.reduce(block, axis=1) / len(columns)
+        block = np.ascontiguousarray(buy_hold[np.ix_(rows, columns)])
+        buy_hold_return[rows] = np.add.reduce(block, axis=1) / len(columns)
+
+    active_tickers = present.sum(axis=1)
+    # 기존과 같이 날짜 값 목록으로 인덱스 생성 (freq 없음)
+    index = pd.Index(list(all_dates), name='date')
+    df = pd.DataFrame({
+        'portfolio_return': portfolio_return,
+        'buy_hold_return': buy_hold_return,
+        'active_tickers': active_tickers.astype(np.int64)
+    }, index=index)
+
+    # 누적 수익률 계산
+    df['portfolio_cumulative'] = (1 + df['portfolio_return']).cumprod() - 1
+    df['buy_hold_cumulative'] = (1 + df['buy_hold_return']).cumprod() - 1
+
+    return df
+
+
+def _portfolio_returns_python(all_results, tickers):
+    """여러 종목의 포트폴리오 수익률 계산 (동일 가중, 기존 날짜별 루프)"""
+    # 모든 거래일 추출
+    all_dates = set()
+    for ticker in tickers:
+        if ticker in all_results:
+            all_dates.update(all_results[ticker].index)
+    all_dates = sorted(all_dates)
+
+    # 날짜별 포트폴리오 수익률 계산
+    portfolio_data = []
+
+    for date in all_dates:
+        daily_returns = []
+        buy_hold_returns = []
+
+        for ticker in tickers:
+            if ticker in all_results and date in all_results[ticker].index:
+                daily_returns.append(all_results[ticker].loc[date, 'daily_return'])
+                buy_hold_returns.append(all_results[ticker].loc[date, 'buy_hold_return'])
+
+        if daily_returns:  # 해당 날짜에 데이터가 있는 경우만
+            portfolio_data.append({
+                'date': date,
+                'portfolio_return': np.mean(daily_returns),
+                'buy_hold_return': np.mean(buy_hold_returns),
+                'active_tickers': len(daily_returns)
+            })
+
+    # DataFrame 생성
+    df = pd.DataFrame(portfolio_data)
+    df.set_index('date', inplace=True)
+
+    # 누적 수익률 계산
+    df['portfolio_cumulative'] = (1 + df['portfolio_return']).cumprod() - 1
+    df['buy_hold_cumulative'] = (1 + df['buy_hold_return']).cumprod() - 1
+
+    return df
+
+
+# 여러 수익률 시리즈를 한 번에 평가하는 배열 버전
+METRIC_COLUMNS = ['total_return', 'annual_return', 'volatility', 'sharpe_ratio', 'sortino_ratio',
+                  'mdd', 'calmar_ratio', 'win_rate', 'avg_win', 'avg_loss', 'trade_count']
+
+
+def _as_2d(returns):
+    """
+    수익률 입력을 (전략 × 날짜) 배열로 정리
+
+    DataFrame은 (날짜 × 전략), ndarray는 (전략 × 날짜)로 봅니다. NaN/inf는 0으로 처리합니다.
+    """
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    if isinstance(returns, pd.DataFrame):
+        values = returns.to_numpy(dtype=float, na_value=np.nan).T
+        labels, index = returns.columns, returns.index
+    else:
+        values = np.atleast_2d(np.asarray(returns, dtype=float))
+        labels, index = pd.RangeIndex(len(values)), None
+    values = np.where(np.isfinite(values), values, 0.0)
+    return values, labels, index
+
+
+def _max_drawdown(wealth):
+    """(전략 × 날짜) 자산 곡선의 MDD (첫날부터의 최고점 대비, calculate_performance_metrics와 같은 정의)"""
+    running_max = np.maximum.accumulate(wealth, axis=1)
+    return (wealth / running_max - 1).min(axis=1)
+
+
+def calculate_performance_metrics_2d(returns, periods_per_year=252):
+    """
+    여러 수익률 시리즈의 성과 지표를 한 번에 계산
+
+    calculate_performance_metrics와 같은 정의(연환산 = 복리, 샤프 = 연수익률 / 연변동성,
+    승률 = 수익일 / 전체일)에 Sortino, Calmar를 더해 전략별로 반환합니다.
+    예외를 삼키지 않으며, 길이가 0이면 모든 지표가 0입니다.
+
+    Parameters:
+    - returns: 일별 수익률 - DataFrame/Series (날짜 × 전략) 또는 ndarray (전략 × 날짜)
+    - periods_per_year: 연환산 기간 수 (기본 252 거래일)
+
+    Returns:
+    - DataFrame: 전략별 total_return, annual_return, volatility, sharpe_ratio, sortino_ratio,
+                 mdd, calmar_ratio, win_rate, avg_win, avg_loss, trade_count
+    """
+    values, labels, _ = _as_2d(returns)
+    n_series, n_days = values.shape
+    if n_days == 0:
+        return pd.DataFrame(0, index=labels, columns=METRIC_COLUMNS)
+
+    wealth = np.cumprod(1 + values, axis=1)
+    total_return = wealth[:, -1] - 1
+    years = n_days / periods_per_year
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual_return = (1 + total_return) ** (1 / years) - 1
+        volatility = values.std(axis=1, ddof=1) * np.sqrt(periods_per_year) if n_days > 1 else np.full(n_series, np.nan)
+        sharpe_ratio = np.where(volatility > 0, annual_return / volatility, 0.0)
+
+        # 하방 편차: 손실일(수익률 < 0) 제곱 평균의 제곱근 × √기간, Sortino = 연환산(복리) 수익률 / 하방 편차
+        # (샤프와 같이 무위험수익률 0 기준, atr_backtest.analyze_backtest_results는 목표 0.02/252,
+        #  무위험수익률 0.02, 산술 평균 × 252를 사용하므로 값이 다름)
+        losses = np.minimum(values, 0.0)
+        n_losses = (values < 0).sum(axis=1)
+        n_wins = (values > 0).sum(axis=1)
+        downside = np.sqrt((losses ** 2).sum(axis=1) / n_losses) * np.sqrt(periods_per_year)
+        sortino_ratio = np.where(n_losses > 0, annual_return / downside,
+                                 np.where(annual_return > 0, np.inf, 0.0))
+
+        mdd = _max_drawdown(wealth)
+        calmar_ratio = np.where(mdd < 0, annual_return / np.abs(mdd),
+                                np.where(annual_return > 0, np.inf, 0.0))
+
+        avg_win = np.where(n_wins > 0, np.where(values > 0, values, 0.0).sum(axis=1) / n_wins, 0.0)
+        avg_loss = np.where(n_losses > 0, losses.sum(axis=1) / n_losses, 0.0)
+
+    return pd.DataFrame({
+        'total_return': total_return,
+        'annual_return': annual_return,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'mdd': mdd,
+        'calmar_ratio': calmar_ratio,
+        'win_rate': n_wins / n_days,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'trade_count': np.full(n_series, n_days)
+    }, index=labels)
+
+
+def rolling_performance_metrics(returns, window=252, periods_per_year=252):
+    """
+    이동 구간 성과 지표 (총수익률, 연환산 수익률, 변동성, 샤프, MDD)
+
+    수익률/변동성은 누적합(log(1 + r), r, r²)의 차이로 구간마다 O(1)에 계산하고,
+    MDD는 구간 시작 위치만큼의 배열 연산(window번)으로 모든 구간을 동시에 계산합니다.
+
+    Parameters:
+    - returns: 일별 수익률 - DataFrame/Series (날짜 × 전략) 또는 ndarray (전략 × 날짜)
+    - window: 구간 길이 (기본 252일)
+    - periods_per_year: 연환산 기간 수 (기본 252 거래일)
+
+    Returns:
+    - dict: {지표명: DataFrame (날짜 × 전략)}, 구간이 채워지지 않은 앞쪽 window-1일은 NaN
+    """
+    values, labels, index = _as_2d(returns)
+    n_series, n_days = values.shape
+    if index is None:
+        index = pd.RangeIndex(n_days)
+
+    metrics = {name: np.full((n_series, n_days), np.nan)
+               for name in ('total_return', 'annual_return', 'volatility', 'sharpe_ratio', 'mdd')}
+    if 0 < window <= n_days:
+        def window_sum(cumulative):
+            padded = np.concatenate((np.zeros((n_series, 1)), cumulative), axis=1)
+            return padded[:, window:] - padded[:, :-window]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_wealth = np.cumsum(np.log1p(values), axis=1)
+            total_return = np.expm1(window_sum(log_wealth))
+            annual_return = (1 + total_return) ** (periods_per_year / window) - 1
+
+            # 분산은 시리즈 평균을 뺀 값으로 계산 (누적합 차이의 자릿수 손실 방지)
+            centered = values - values.mean(axis=1, keepdims=True)
+            sum1 = window_sum(np.cumsum(centered, axis=1))
+            sum2 = window_sum(np.cumsum(centered ** 2, axis=1))
+            variance = np.maximum(sum2 - sum1 ** 2 / window, 0.0) / (window - 1) if window > 1 else np.full_like(sum1, np.nan)
+            volatility = np.sqrt(variance) * np.sqrt(periods_per_year)
+            sharpe_ratio = np.where(volatility > 0, annual_return / volatility, 0.0)
+
+        # 모든 구간을 동시에 한 칸씩 진행하며 구간 내 최고점과 최저 낙폭(로그 자산 기준) 갱신
+        n_windows = n_days - window + 1
+        running_max = np.full((n_series, n_windows), -np.inf)
+        worst = np.zeros((n_series, n_windows))
+        for offset in range(window):
+            current = log_wealth[:, offset:offset + n_windows]
+            np.maximum(running_max, current, out=running_max)
+            np.minimum(worst, current - running_max, out=worst)
+
+        filled = slice(window - 1, None)
+        metrics['total_return'][:, filled] = total_return
+        metrics['annual_return'][:, filled] = annual_return
+        metrics['volatility'][:, filled] = volatility
+        metrics['sharpe_ratio'][:, filled] = sharpe_ratio
+        metrics['mdd'][:, filled] = np.expm1(worst)
+
+    return {name: pd.DataFrame(array.T, index=index, columns=labels) for name, array in metrics.items()}
+
+
+def calculate_monthly_returns(daily_returns, cumulative_returns=None, freq='ME'):
+    """
+    기간별 복리 수익률 (%)
+
+    노트북의 resample('M').apply(lambda x: (1 + x).prod() - 1) * 100과 같은 값을
+    람다 없이 resample().prod()로 계산하며, DataFrame이면 모든 컬럼을 한 번에 계산합니다.
+
+    Parameters:
+    - daily_returns: 일별 수익률 Series 또는 DataFrame (DatetimeIndex)
+    - cumulative_returns: 사용하지 않음 (노트북 함수와 같은 호출 형태 유지용)
+    - freq: 집계 주기 (기본 'ME' 월말, 'YE'면 연간)
+
+    Returns:
+    - Series 또는 DataFrame: 기간별 수익률 (%)
+    """
+    return ((1 + daily_returns).resample(freq).prod() - 1) * 100
+
+
+def monthly_return_table(daily_returns):
+    """
+    연도 × 월 수익률 표 (%) - 마지막 컬럼은 연간 수익률
+
+    DataFrame이면 모든 컬럼을 한 번에 계산하고 (컬럼, 연도) MultiIndex로 쌓은 표를 반환합니다
+    (table.loc[컬럼]은 해당 Series로 만든 표와 같음).
+
+    Parameters:
+    - daily_returns: 일별 수익률 Series 또는 DataFrame (DatetimeIndex)
+
+    Returns:
+    - DataFrame: index=연도 (DataFrame 입력이면 (strategy, year)), columns=1~12월 + '연간'
+    """
+    monthly = calculate_monthly_returns(daily_returns)
+    annual = calculate_monthly_returns(daily_returns, freq='YE')
+
+    if isinstance(daily_returns, pd.DataFrame):
+        years = annual.index.year
+        n_series = daily_returns.shape[1]
+        values = np.full((n_series, len(years), 12), np.nan)
+        year_positions = years.get_indexer(monthly.index.year)
+        values[:, year_positions, monthly.index.month - 1] = monthly.to_numpy(dtype=float).T
+        index = pd.MultiIndex.from_arrays(
+            [np.repeat(np.asarray(daily_returns.columns, dtype=object), len(years)), np.tile(years, n_series)],
+            names=[daily_returns.columns.name or 'strategy', 'year']
+        )
+        table = pd.DataFrame(values.reshape(n_series * len(years), 12), index=index, columns=range(1, 13))
+        table['연간'] = annual.to_numpy(dtype=float).T.ravel()
+        return table
+
+    table = pd.DataFrame({'year': monthly.index.year, 'month': monthly.index.month, 'return': monthly.to_numpy()})
+    table = table.pivot(index='year', columns='month', values='return').reindex(columns=range(1, 13))
+    table['연간'] = annual.to_numpy()
+    table.columns.name = None
+    return table
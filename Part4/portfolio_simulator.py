@@ -0,0 +1,239 @@
+import pandas as pd
+import numpy as np
+
+from atr_backtest import calculate_atr, analyze_backtest_results, _EXIT_REASONS
+
+
+def build_simulation_arrays(stock_data_dict, atr_period=14):
+    """
+    종목별 DataFrame을 공통 거래일(모든 종목 날짜의 합집합) 기준 (날짜 × 종목) 배열로 정렬
+
+    ATR은 backtest_atr_strategy와 같이 종목별 자기 거래일 기준으로 계산한 뒤 배치합니다.
+
+    Parameters:
+    - stock_data_dict: {ticker: df} 형태의 딕셔너리 (open/high/low/close)
+    - atr_period: ATR 계산 기간 (기본 14)
+
+    Returns:
+    - dict: dates, tickers, open/high/low/close/prev_atr (날짜 × 종목, 데이터 없는 날은 NaN),
+            valid (데이터가 있는 날), last_row (종목별 마지막 데이터 위치)
+    """
+    tickers = list(stock_data_dict.keys())
+    dates = None
+    for df in stock_data_dict.values():
+        dates = df.index.unique() if dates is None else dates.union(df.index)
+    dates = dates.sort_values() if dates is not None else pd.DatetimeIndex([])
+
+    shape = (len(dates), len(tickers))
+    arrays = {column: np.full(shape, np.nan) for column in ('open', 'high', 'low', 'close', 'prev_atr')}
+    valid = np.zeros(shape, dtype=bool)
+    last_row = np.full(len(tickers), -1, dtype=np.int64)
+    for j, ticker in enumerate(tickers):
+        df = stock_data_dict[ticker]
+        rows = dates.get_indexer(df.index)
+        valid[rows, j] = True
+        for column in ('open', 'high', 'low', 'close'):
+            arrays[column][rows, j] = df[column].to_numpy(dtype=float, na_value=np.nan)
+        arrays['prev_atr'][rows, j] = calculate_atr(df, period=atr_period).shift(1).to_numpy(dtype=float)
+        if len(rows) > 0:
+            last_row[j] = rows.max()
+
+    arrays.update({'dates': dates, 'tickers': tickers, 'valid': valid, 'last_row': last_row})
+    return arrays
+
+
+def momentum_priority(close, momentum_period=20):
+    """
+    전일 종가 기준 momentum_period일 수익률 (당일 가격은 사용하지 않음)
+
+    데이터가 없는 날은 직전 종가로 채워 계산하고, 계산할 수 없는 칸은 -inf (가장 낮은 우선순위)입니다.
+    """
+    filled = pd.DataFrame(close).ffill()
+    scores = filled.pct_change(momentum_period, fill_method=None).shift(1).to_numpy(copy=True)
+    scores[~np.isfinite(scores)] = -np.inf
+    return scores
+
+
+def simulate_shared_cash_portfolio(stock_data_dict, initial_capital=100000,
+                                   atr_entry_multiplier=0.5,
+                                   stop_loss_atr=1.5,
+                                   take_profit_atr=3.0,
+                                   commission_rate=0.001,
+                                   slippage_rate=0.001,
+                                   atr_period=14,
+                                   position_sizing=0.02,
+                                   capital_ratio=0.5,
+                                   max_positions=10,
+                                   priority='momentum',
+                                   momentum_period=20,
+                                   arrays=None):
+    """
+    하나의 현금 계좌를 공유하는 이벤트 기반 다종목 ATR 돌파 시뮬레이터
+
+    portfolio_integrated_backtest는 종목별로 자본을 미리 나눠 독립 실행하므로 한 종목의 남는 현금을
+    다른 종목의 돌파에 쓸 수 없습니다. 이 함수는 공통 거래일을 한 번만 순회하며 매일
+    1) 보유 종목의 손절/익절 청산 → 2) 우선순위 순서로 신규 진입 → 3) 데이터가 끝난 종목 청산
+    순서로 처리합니다. 포지션 장부는 종목 배열(보유 수량, 진입가, 손절/익절가)이라
+    날짜당 연산은 종목 수에 대한 배열 연산이고, 파이썬 루프는 실제 체결에만 돕니다.
+
+    진입/청산 가격과 수수료/슬리피지 규칙은 backtest_atr_strategy와 같습니다.
+    - 포지션 크기: 리스크 = 전일 종가 기준 포트폴리오 평가액 × position_sizing, 수량 = 리스크 / (ATR × stop_loss_atr)
+    - capital_ratio: 포트폴리오 평가액 대비 동시에 보유할 수 있는 포지션 총액 한도
+    - max_positions: 동시 보유 종목 수 한도 (None이면 제한 없음)
+    - 현금이 부족하면 살 수 있는 수량까지만 매수하고, 청산한 날 같은 종목은 다시 진입하지 않음
+
+    Parameters:
+    - stock_data_dict: {ticker: df} 형태의 딕셔너리
+    - priority: 같은 날 여러 종목이 돌파할 때의 진입 순서 (점수가 높은 종목부터)
+        'momentum' - 전일 종가 기준 momentum_period일 수익률
+        None - stock_data_dict의 종목 순서
+        DataFrame - (날짜 × 종목) 점수 (당일 장중에 알 수 있는 값이어야 함)
+    - momentum_period: priority='momentum'일 때 모멘텀 기간 (기본 20일)
+    - arrays: build_simulation_arrays 결과 (파라미터를 바꿔 반복 실행할 때 재사용)
+
+    Returns:
+    - trades_df: 모든 종목의 거래 내역
+    - portfolio_df: 일별 포트폴리오 가치/현금/포지션 평가액/보유 종목 수/수익률
+    - results: analyze_backtest_results 통합 성과 분석 결과
+    """
+    if arrays is None:
+        arrays = build_simulation_arrays(stock_data_dict, atr_period)
+    dates, tickers = arrays['dates'], arrays['tickers']
+    open_, high, low, close = arrays['open'], arrays['high'], arrays['low'], arrays['close']
+    prev_atr, valid, last_row = arrays['prev_atr'], arrays['valid'], arrays['last_row']
+    n_dates, n_tickers = close.shape
+
+    # 전일 ATR이 없거나 0 이하인 날은 (기존 백테스트와 같이) 진입/청산 없이 넘어감
+    with np.errstate(invalid='ignore'):
+        active = valid & (prev_atr > 0)
+        breakout = open_ + (prev_atr * atr_entry_multiplier)
+        signal = active & (high > breakout)
+
+    if isinstance(priority, str) and priority == 'momentum':
+        scores = momentum_priority(close, momentum_period)
+    elif priority is None:
+        scores = np.zeros((n_dates, n_tickers))
+    else:
+        scores = priority.reindex(index=dates, columns=tickers).to_numpy(dtype=float, na_value=np.nan)
+        scores[~np.isfinite(scores)] = -np.inf
+    max_positions = n_tickers if max_positions is None else max_positions
+
+    # 포지션 장부 (종목 배열)
+    shares = np.zeros(n_tickers, dtype=np.int64)
+    stop_loss = np.full(n_tickers, np.nan)
+    take_profit = np.full(n_tickers, np.nan)
+    open_trade = np.full(n_tickers, -1, dtype=np.int64)
+    last_close = np.zeros(n_tickers)
+
+    cash = initial_capital
+    trades = []
+    portfolio_values = np.empty(n_dates)
+    cash_history = np.empty(n_dates)
+    exposure_history = np.empty(n_dates)
+    position_counts = np.empty(n_dates, dtype=np.int64)
+
+    def close_position(j, t, exit_price, reason):
+        nonlocal cash
+        cash += shares[j] * exit_price * (1 - commission_rate)
+        trade = trades[open_trade[j]]
+        trade.update({
+            'exit_date': dates[t],
+            'exit_price': exit_price,
+            'exit_reason': _EXIT_REASONS[reason],
+            'return': (exit_price - trade['entry_price']) / trade['entry_price'],
+            'profit_loss': shares[j] * (exit_price - trade['entry_price'])
+        })
+        shares[j] = 0
+        open_trade[j] = -1
+
+    for t in range(n_dates):
+        # 1) 청산: 손절을 먼저 확인하고 체결 가능한 가격(당일 저가/고가)으로 조정
+        check = np.flatnonzero((shares > 0) & active[t])
+        exited = np.zeros(n_tickers, dtype=bool)
+        if len(check) > 0:
+            stop_hit = low[t, check] <= stop_loss[check]
+            take_hit = ~stop_hit & (high[t, check] >= take_profit[check])
+            for j, is_stop in zip(check[stop_hit | take_hit], stop_hit[stop_hit | take_hit]):
+                if is_stop:
+                    close_position(j, t, max(stop_loss[j] * (1 - slippage_rate), low[t, j]), 1)
+                else:
+                    close_position(j, t, min(take_profit[j] * (1 - slippage_rate), high[t, j]), 2)
+                exited[j] = True
+
+        # 2) 진입: 돌파 종목을 우선순위 순서로 (전일 종가 기준 평가액으로 사이징)
+        held = np.flatnonzero(shares > 0)
+        slots = max_positions - len(held)
+        if slots > 0:
+            candidates = np.flatnonzero(signal[t] & (shares == 0) & ~exited)
+            if len(candidates) > 0:
+                invested = float((shares[held] * last_close[held]).sum())
+                equity = cash + invested
+                candidates = candidates[np.argsort(-scores[t, candidates], kind='stable')]
+                for j in candidates:
+                    if slots == 0:
+                        break
+                    atr = prev_atr[t, j]
+                    buy_price = min(breakout[t, j] * (1 + slippage_rate), high[t, j])
+                    risk_amount = equity * position_sizing
+                    position_value = min(risk_amount / (atr * stop_loss_atr) * buy_price,
+                                         equity * capital_ratio - invested)
+                    if position_value <= 0:
+                        break
+                    entry_shares = min(int(position_value / buy_price),
+                                       int(cash / (buy_price * (1 + commission_rate))))
+                    if entry_shares <= 0:
+                        continue
+
+                    cash -= entry_shares * buy_price * (1 + commission_rate)
+                    invested += entry_shares * buy_price
+                    slots -= 1
+                    shares[j] = entry_shares
+                    stop_loss[j] = buy_price - (atr * stop_loss_atr)
+                    take_profit[j] = buy_price + (atr * take_profit_atr)
+                    open_trade[j] = len(trades)
+                    trades.append({
+                        'ticker': tickers[j],
+                        'entry_date': dates[t],
+                        'entry_price': buy_price,
+                        'shares': entry_shares,
+                        'entry_atr': atr,
+                        'stop_loss': stop_loss[j],
+                        'take_profit': take_profit[j],
+                        'position_value': entry_shares * buy_price,
+                        'breakout_price': breakout[t, j],
+                        'priority_score': scores[t, j]
+                    })
+
+        # 3) 평가: 데이터가 있는 종목은 당일 종가, 없는 종목은 직전 종가
+        today = valid[t]
+        last_close[today] = close[t, today]
+
+        # 데이터가 끝난 종목은 마지막 날 종가로 청산
+        for j in np.flatnonzero((shares > 0) & (last_row == t)):
+            close_position(j, t, close[t, j] * (1 - slippage_rate), 3)
+
+        held = np.flatnonzero(shares > 0)
+        exposure = float((shares[held] * last_close[held]).sum())
+        portfolio_values[t] = cash + exposure
+        cash_history[t] = cash
+        exposure_history[t] = exposure
+        position_counts[t] = len(held)
+
+    trades_df = pd.DataFrame(trades)
+
+    daily_returns = np.zeros(n_dates)
+    if n_dates > 1:
+        daily_returns[1:] = (portfolio_values[1:] - portfolio_values[:-1]) / portfolio_values[:-1]
+    portfolio_df = pd.DataFrame({
+        'portfolio_value': portfolio_values,
+        'cash': cash_history,
+        'exposure': exposure_history,
+        'positions': position_counts,
+        'daily_returns': daily_returns
+    }, index=pd.Index(dates, name='date'))
+    portfolio_df['cumulative_returns'] = (1 + portfolio_df['daily_returns']).cumprod()
+
+    results = analyze_backtest_results(trades_df, portfolio_df, initial_capital)
+    print(f"✅ 공유 현금 시뮬레이션 완료: {n_tickers}개 종목 × {n_dates}일, 거래 {len(trades_df)}건, "
+          f"최대 동시 보유 {position_counts.max() if n_dates else 0}종목")
+    return trades_df, portfolio_df, results
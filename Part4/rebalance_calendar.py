@@ -0,0 +1,135 @@
+import pandas as pd
+import numpy as np
+
+REBALANCE_SCHEDULES = ('daily', 'weekly', 'monthly')
+
+
+def _schedule_keys(dates, schedule):
+    """날짜별 리밸런싱 구간 키 (키가 바뀌는 첫 거래일이 리밸런싱일)"""
+    days = pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[D]').astype(np.int64)
+    if schedule == 'daily':
+        return days
+    if schedule == 'weekly':
+        # 1970-01-01은 목요일이므로 +3 하면 월요일 시작 주 번호
+        return (days + 3) // 7
+    months = pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[M]').astype(np.int64)
+    return months
+
+
+def _first_of_key(keys):
+    change = np.ones(len(keys), dtype=bool)
+    change[1:] = keys[1:] != keys[:-1]
+    return np.flatnonzero(change)
+
+
+def build_rebalance_calendar(dates, schedule=30, start=0, end=None):
+    """
+    거래일마다 리밸런싱 구간 번호와 구간의 시작/끝 위치를 미리 계산한 캘린더 인덱스
+
+    유니버스의 공통 거래일마다 한 번 만들어 두면, 포트폴리오 계산은 날짜 비교 없이
+    period_ids / window_start / window_end의 정수 위치로 구간을 자릅니다.
+
+    Parameters:
+    - dates: 공통 거래일 목록 (정렬된 상태) 또는 거래일 수 (정수 N일 주기만 사용할 때)
+    - schedule: 리밸런싱 주기
+        정수 N - start부터 N거래일마다 (기존 common_dates[::rebalance_period]와 동일)
+        'daily' - 매 거래일
+        'weekly' - 주(월~일)의 첫 거래일
+        'monthly' - 월의 첫 거래일
+        정수 배열 / bool 배열 - 리밸런싱일 위치를 직접 지정
+    - start: 캘린더 시작 위치 (기본 0)
+    - end: 캘린더 끝 위치 (미포함, 기본 전체)
+
+    Returns:
+    - dict: dates, n_dates, schedule, start, end,
+            rebalance_positions (리밸런싱일 위치), period_ids (날짜별 구간 번호, 첫 리밸런싱 이전/범위 밖은 -1),
+            window_start / window_end (구간별 [시작, 끝) 위치), days_since (구간 시작 후 경과 거래일, 범위 밖 -1)
+    """
+    if isinstance(dates, (int, np.integer)):
+        n_dates, dates = int(dates), None
+    else:
+        n_dates = len(dates)
+    end = n_dates if end is None else min(end, n_dates)
+    start = min(max(start, 0), end)
+
+    if isinstance(schedule, str):
+        if schedule not in REBALANCE_SCHEDULES:
+            raise ValueError(f"지원하지 않는 리밸런싱 주기입니다: {schedule} "
+                             f"(가능: 정수 N, {', '.join(REBALANCE_SCHEDULES)})")
+        if dates is None:
+            raise ValueError(f"'{schedule}' 주기는 날짜 목록이 필요합니다.")
+        positions = start + _first_of_key(_schedule_keys(list(dates[start:end]), schedule)) if end > start \
+            else np.empty(0, dtype=np.int64)
+    elif isinstance(schedule, (int, np.integer)):
+        if schedule <= 0:
+            raise ValueError(f"리밸런싱 주기는 1 이상이어야 합니다: {schedule}")
+        positions = np.arange(start, end, schedule)
+    else:
+        positions = np.asarray(schedule)
+        if positions.dtype == bool:
+            positions = np.flatnonzero(positions)
+        positions = np.unique(positions.astype(np.int64))
+        positions = positions[(positions >= start) & (positions < end)]
+
+    positions = positions.astype(np.int64)
+    rows = np.arange(n_dates)
+    period_ids = np.searchsorted(positions, rows, side='right') - 1
+    period_ids[(rows < start) | (rows >= end)] = -1
+
+    window_start = positions
+    window_end = np.append(positions[1:], end).astype(np.int64)
+    days_since = np.where(period_ids >= 0, rows - window_start[np.maximum(period_ids, 0)], -1) \
+        if len(positions) > 0 else np.full(n_dates, -1)
+
+    return {
+        'dates': dates,
+        'n_dates': n_dates,
+        'schedule': schedule,
+        'start': start,
+        'end': end,
+        'rebalance_positions': positions,
+        'period_ids': period_ids,
+        'window_start': window_start,
+        'window_end': window_end,
+        'days_since': days_since
+    }
+
+
+def rebalance_dates(calendar):
+    """캘린더의 리밸런싱 날짜 목록"""
+    if calendar['dates'] is None:
+        raise ValueError("거래일 수로 만든 캘린더에는 날짜가 없습니다.")
+    return [calendar['dates'][position] for position in calendar['rebalance_positions']]
+
+
+def days_until_rebalance(calendar, position):
+    """
+    position 위치의 거래일부터 다음 리밸런싱일까지 남은 거래일 수 (position이 리밸런싱일이면 0)
+
+    캘린더 끝 이후 위치(예: 마지막 날 다음 거래일 = n_dates)도 계산합니다.
+    정수 N일 주기는 정확히, 'weekly'/'monthly'는 이후 날짜를 평일 기준으로 가정하고,
+    'daily'는 항상 0이며, 위치를 직접 지정한 캘린더는 알 수 없으므로 -1을 반환합니다.
+    """
+    positions = calendar['rebalance_positions']
+    k = np.searchsorted(positions, position, side='left')
+    if k < len(positions):
+        return int(positions[k] - position)
+
+    schedule = calendar['schedule']
+    start = calendar['start']
+    if isinstance(schedule, (int, np.integer)):
+        since = (position - start) % schedule
+        return int(schedule - since) if since > 0 else 0
+    if isinstance(schedule, str) and schedule == 'daily':
+        return 0
+    if not isinstance(schedule, str) or calendar['dates'] is None or calendar['end'] == 0:
+        return -1
+
+    # 캘린더 이후 날짜를 평일로 이어 붙여 다음 구간 시작을 찾음
+    last_date = pd.Timestamp(calendar['dates'][calendar['end'] - 1])
+    n_ahead = position - (calendar['end'] - 1)
+    future = pd.bdate_range(last_date + pd.Timedelta(days=1), periods=n_ahead + 32)
+    keys = _schedule_keys([last_date] + list(future), schedule)
+    changes = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    changes = changes[changes >= n_ahead]
+    return int(changes[0] - n_ahead) if len(changes) > 0 else -1
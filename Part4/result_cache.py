@@ -0,0 +1,301 @@
+import copy
+import hashlib
+import os
+import types
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+# 전략 결과 캐시 (메모리 LRU + 선택적 Parquet 디스크 계층)
+_CACHE = {
+    'entries': OrderedDict(),  # key -> (결과, 바이트 수)
+    'bytes': 0,
+    'max_bytes': 512 * 1024 ** 2,
+    'cache_dir': os.environ.get('ETF_RESULT_CACHE') or None,
+    'version': os.environ.get('ETF_RESULT_CACHE_VERSION', ''),
+    'hits': 0,
+    'disk_hits': 0,
+    'misses': 0
+}
+
+
+def configure_result_cache(max_bytes=None, cache_dir=False, version=None):
+    """
+    전략 결과 캐시 설정
+
+    Parameters:
+    - max_bytes: 메모리 캐시 용량 (바이트, 기본 512MB)
+    - cache_dir: Parquet 디스크 캐시 경로 (None이면 디스크 캐시 사용 안 함, 생략하면 기존 설정 유지)
+    - version: 캐시 버전 문자열 (바꾸면 기존 캐시 결과를 모두 무시, 환경변수 ETF_RESULT_CACHE_VERSION으로도 지정)
+        이후에 cache_strategy로 감싼 함수부터 적용됩니다.
+    """
+    if max_bytes is not None:
+        _CACHE['max_bytes'] = max_bytes
+        _evict()
+    if cache_dir is not False:
+        _CACHE['cache_dir'] = cache_dir
+    if version is not None:
+        _CACHE['version'] = str(version)
+
+
+def clear_result_cache(disk=False):
+    """메모리 캐시 비우기 (disk=True면 디스크 캐시 파일도 삭제)"""
+    _CACHE['entries'].clear()
+    _CACHE['bytes'] = 0
+    _CACHE['hits'] = _CACHE['disk_hits'] = _CACHE['misses'] = 0
+    if disk and _CACHE['cache_dir'] and os.path.isdir(_CACHE['cache_dir']):
+        for name in os.listdir(_CACHE['cache_dir']):
+            if name.endswith('.parquet'):
+                os.remove(os.path.join(_CACHE['cache_dir'], name))
+
+
+def result_cache_info():
+    """캐시 적중/미스 횟수와 메모리 사용량"""
+    return {
+        'hits': _CACHE['hits'],
+        'disk_hits': _CACHE['disk_hits'],
+        'misses': _CACHE['misses'],
+        'entries': len(_CACHE['entries']),
+        'bytes': _CACHE['bytes'],
+        'max_bytes': _CACHE['max_bytes'],
+        'cache_dir': _CACHE['cache_dir']
+    }
+
+
+def fingerprint_frame(df):
+    """
+    입력 DataFrame의 빠른 지문 (인덱스 + 컬럼별 체크섬)
+
+    숫자/날짜 컬럼은 메모리 바이트를 그대로 해시하고,
+    문자열 등 object 컬럼만 pandas 해시를 사용합니다.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((df.shape, list(df.columns), [str(dtype) for dtype in df.dtypes])).encode())
+    digest.update(_array_bytes(df.index))
+    for column in df.columns:
+        digest.update(_array_bytes(df[column]))
+    return digest.hexdigest()
+
+
+def _array_bytes(values):
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufcmM':
+        return np.ascontiguousarray(values.to_numpy()).view(np.uint8).tobytes()
+    return pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy().tobytes()
+
+
+def _argument_token(value):
+    """
+    인자 값의 식별자
+
+    repr은 큰 배열/Series를 '...'로 줄여 다른 값이 같은 키가 될 수 있으므로
+    배열/Series/Index/DataFrame은 전체 값을 해시하고, 컨테이너는 원소별로 처리합니다.
+    """
+    if isinstance(value, pd.DataFrame):
+        return f'DataFrame:{fingerprint_frame(value)}'
+    if isinstance(value, (pd.Series, pd.Index)):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((type(value).__name__, str(value.dtype), len(value), value.name)).encode())
+        digest.update(_array_bytes(value))
+        if isinstance(value, pd.Series):
+            digest.update(_array_bytes(value.index))
+        return digest.hexdigest()
+    if isinstance(value, np.ndarray):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((str(value.dtype), value.shape)).encode())
+        if value.dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(value).view(np.uint8).tobytes())
+        else:
+            digest.update(_array_bytes(pd.Series(value.ravel())))
+        return digest.hexdigest()
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}({','.join(_argument_token(item) for item in value)})"
+    if isinstance(value, dict):
+        items = sorted(value.items(), key=lambda item: repr(item[0]))
+        return '{' + ','.join(f'{key!r}:{_argument_token(item)}' for key, item in items) + '}'
+    if callable(value) and hasattr(value, '__code__'):
+        return _function_token(value)
+    return repr(value)
+
+
+def _referenced_functions(func):
+    """함수 코드(내부 comprehension/lambda 포함)가 이름으로 참조하는 전역 Python 함수 (calculate_atr 등)"""
+    code = getattr(func, '__code__', None)
+    namespace = getattr(func, '__globals__', None)
+    if code is None or namespace is None:
+        return []
+
+    names = set()
+    stack = [code]
+    while stack:
+        current = stack.pop()
+        names.update(current.co_names)
+        stack.extend(const for const in current.co_consts if isinstance(const, types.CodeType))
+    return [namespace[name] for name in sorted(names)
+            if isinstance(namespace.get(name), types.FunctionType) and namespace[name] is not func]
+
+
+def _function_token(func, depth=0):
+    """
+    함수 이름 + 코드로 만든 식별자
+
+    노트북에서 함수를 고쳐 다시 정의하면 바뀌고, make_na_safe 같은 래퍼는
+    감싼 함수까지 포함합니다. 전략이 전역 이름으로 호출하는 보조 함수
+    (atr_kernel.calculate_atr, compact_strategy_result 등)의 코드도 3단계까지 포함합니다.
+    __version__ 속성이 있으면 함께 사용합니다.
+    """
+    parts = [getattr(func, '__module__', ''), getattr(func, '__qualname__', repr(func)),
+             str(getattr(func, '__version__', ''))]
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        parts.append(code.co_code.hex())
+        parts.append(repr([const for const in code.co_consts if not hasattr(const, 'co_code')]))
+    if depth < 3:
+        inner = [getattr(func, '__wrapped__', None)]
+        inner += [cell.cell_contents for cell in (getattr(func, '__closure__', None) or ())
+                  if callable(getattr(cell, 'cell_contents', None))]
+        inner += _referenced_functions(func)
+        parts += [_function_token(f, depth + 1) for f in inner if f is not None]
+    return '|'.join(parts)
+
+
+def _result_key(func_token, df, args, kwargs):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(func_token.encode())
+    digest.update(fingerprint_frame(df).encode())
+    digest.update(_argument_token(args).encode())
+    digest.update(_argument_token(kwargs).encode())
+    return digest.hexdigest()
+
+
+def _result_bytes(result):
+    """캐시 용량 계산용 결과 크기 (ledger=True 장부 같은 dict/배열 결과 포함)"""
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    if isinstance(result, (pd.Series, pd.Index)):
+        return int(result.memory_usage(deep=True))
+    if isinstance(result, np.ndarray):
+        return int(result.nbytes)
+    if isinstance(result, dict):
+        return sum(_result_bytes(value) for value in result.values())
+    if isinstance(result, (list, tuple)):
+        return sum(_result_bytes(value) for value in result)
+    return 0
+
+
+def _evict():
+    entries = _CACHE['entries']
+    while entries and _CACHE['bytes'] > _CACHE['max_bytes']:
+        _, (_, size) = entries.popitem(last=False)
+        _CACHE['bytes'] -= size
+
+
+def _store(key, result):
+    size = _result_bytes(result)
+    if size > _CACHE['max_bytes']:
+        return
+    _CACHE['entries'][key] = (result, size)
+    _CACHE['bytes'] += size
+    _evict()
+
+
+def _disk_path(key):
+    return os.path.join(_CACHE['cache_dir'], f'{key}.parquet')
+
+
+# Parquet에 저장되지 않는 인덱스 freq (BusinessDay 등)를 보관하는 스키마 메타데이터 키
+_FREQ_METADATA_KEY = b'result_cache.index_freq'
+
+
+def _load_from_disk(key):
+    path = _disk_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        import pyarrow.parquet as pq
+
+        result = pd.read_parquet(path)
+        freq = (pq.read_schema(path).metadata or {}).get(_FREQ_METADATA_KEY)
+        if freq:
+            result.index.freq = freq.decode()
+        return result
+    except Exception as e:
+        print(f"⚠️  캐시 파일 읽기 실패 ({path}): {e}")
+        return None
+
+
+def _save_to_disk(key, result):
+    if not isinstance(result, pd.DataFrame):
+        return
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(_CACHE['cache_dir'], exist_ok=True)
+        table = pa.Table.from_pandas(result)
+        freq = getattr(result.index, 'freqstr', None)
+        if freq:
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                   _FREQ_METADATA_KEY: freq.encode()})
+        # 다른 프로세스가 읽는 중에 반쯤 쓴 파일이 보이지 않도록 임시 파일에 쓴 뒤 이동
+        tmp_path = _disk_path(key) + f'.{os.getpid()}.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, _disk_path(key))
+    except Exception as e:
+        print(f"⚠️  캐시 파일 저장 실패: {e}")
+
+
+def _copy(result):
+    """캐시 항목과 메모리를 공유하지 않는 사본 (DataFrame, 장부 dict/배열)"""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy()
+    if isinstance(result, (dict, list, tuple, np.ndarray)):
+        return copy.deepcopy(result)
+    return result
+
+
+def cache_strategy(func):
+    """
+    전략 함수 결과를 (입력 데이터 지문, 함수, 인자) 기준으로 캐시하는 데코레이터
+
+    메모리 LRU(configure_result_cache의 max_bytes 한도)를 먼저 찾고,
+    cache_dir이 설정되어 있으면 Parquet 파일을 찾은 뒤, 없을 때만 전략을 실행합니다.
+    호출하는 쪽에서 결과를 수정해도 캐시가 바뀌지 않도록 사본을 반환합니다.
+
+    캐시 키의 함수 식별자는 감쌀 때 전략과 전략이 호출하는 보조 함수의 코드로 만듭니다.
+    보조 함수가 참조하는 상수/데이터 파일이나 pandas 버전처럼 코드 밖의 변경은 반영되지 않으므로,
+    이런 변경 뒤에는 디스크 캐시가 예전 결과를 돌려줄 수 있습니다.
+    configure_result_cache(version=...)로 버전을 바꾸거나 clear_result_cache(disk=True)로 비우세요.
+    """
+    func_token = f"{_CACHE['version']}#{_function_token(func)}"
+
+    def wrapper(df, *args, **kwargs):
+        key = _result_key(func_token, df, args, kwargs)
+        entries = _CACHE['entries']
+        if key in entries:
+            entries.move_to_end(key)
+            _CACHE['hits'] += 1
+            return _copy(entries[key][0])
+
+        if _CACHE['cache_dir']:
+            result = _load_from_disk(key)
+            if result is not None:
+                _CACHE['disk_hits'] += 1
+                _store(key, result)
+                return _copy(result)
+
+        _CACHE['misses'] += 1
+        result = func(df, *args, **kwargs)
+        _store(key, _copy(result))
+        if _CACHE['cache_dir']:
+            _save_to_disk(key, result)
+        return result
+
+    wrapper.__wrapped__ = func
+    wrapper.__name__ = getattr(func, '__name__', 'wrapper')
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+# 사용 예시:
+# volatility_breakout_with_all_filters_v5 = cache_strategy(volatility_breakout_with_all_filters_v5)
+# configure_result_cache(max_bytes=1024 ** 3, cache_dir='result_cache')  # 세션 간 재사용
@@ -0,0 +1,107 @@
+"""
+노트북 없이 import해서 쓰는 백테스트 엔진 패키지
+
+Part4의 모듈(atr_kernel, atr_backtest, volatility_breakout_with_all_filters_v5 등)을
+한 곳에서 가져오는 진입점입니다. 이름을 처음 사용할 때 해당 모듈을 import하므로
+(PEP 562 모듈 __getattr__) `import systrade` 자체는 pandas도 불러오지 않고,
+BigQuery / matplotlib / seaborn은 그 기능을 호출할 때만 import됩니다.
+
+사용 예시 (Part4가 sys.path에 있을 때, 예: cd Part4 또는 PYTHONPATH=Part4):
+    import systrade
+    result = systrade.volatility_breakout_with_all_filters_v5(df, k=0.3, adx_threshold=35)
+"""
+import importlib
+
+# 공개 이름 → 모듈
+_EXPORTS = {
+    # 지표
+    'calculate_atr': 'atr_kernel',
+    'calculate_atr_batch': 'atr_kernel',
+    'true_range': 'atr_kernel',
+
+    # 전략
+    'volatility_breakout_with_all_filters_v4': 'volatility_breakout_with_all_filters_v4',
+    'volatility_breakout_with_all_filters_v5': 'volatility_breakout_with_all_filters_v5',
+    'volatility_breakout_with_all_filters_v5_safe': 'v5_na_safe',
+    'volatility_breakout_with_all_filters_v6': 'volatility_breakout_with_all_filters_v6',
+    'make_na_safe': 'na_safe_wrapper',
+    'compact_strategy_result': 'lean_results',
+    'make_lean': 'lean_results',
+
+    # 성과 지표
+    'calculate_performance_metrics': 'performance_metrics',
+    'calculate_performance_metrics_2d': 'performance_metrics',
+    'calculate_portfolio_returns': 'performance_metrics',
+    'rolling_performance_metrics': 'performance_metrics',
+    'calculate_monthly_returns': 'performance_metrics',
+    'monthly_return_table': 'performance_metrics',
+
+    # ATR 백테스트 / 포트폴리오
+    'backtest_atr_strategy': 'atr_backtest',
+    'portfolio_integrated_backtest': 'atr_backtest',
+    'analyze_backtest_results': 'atr_backtest',
+    'simulate_shared_cash_portfolio': 'portfolio_simulator',
+    'relative_momentum_portfolio_selection': 'atr_relative_momentum',
+    'sweep_relative_momentum': 'atr_relative_momentum',
+
+    # 상대모멘텀 포트폴리오
+    'calculate_momentum_portfolio_returns': 'momentum_portfolio_with_csv',
+    'build_today_signals': 'momentum_portfolio_with_csv',
+    'build_intraday_signals': 'momentum_portfolio_with_csv',
+    'calculate_multi_period_momentum_portfolio_returns': 'multi_period_momentum',
+    'sweep_multi_period_momentum': 'multi_period_momentum',
+    'build_rebalance_calendar': 'rebalance_calendar',
+    'export_momentum_results': 'momentum_export',
+    'load_momentum_results': 'momentum_export',
+    'entry_type_attribution': 'entry_attribution',
+    'rebalance_holdings': 'entry_attribution',
+
+    # 신호 갱신 / 장중 모니터
+    'init_incremental_signal_state': 'incremental_signals',
+    'append_bars_to_signal_state': 'incremental_signals',
+    'calculate_incremental_signals': 'incremental_signals',
+    'init_breakout_state': 'intraday_monitor',
+    'run_breakout_monitor': 'intraday_monitor',
+
+    # 파라미터 탐색 / 견고성
+    'sweep_volatility_breakout_v5': 'parameter_sweep',
+    'sweep_universe': 'parameter_sweep',
+    'best_parameters': 'parameter_sweep',
+    'walk_forward_optimization': 'walk_forward',
+    'extract_trade_ledger': 'cost_replay',
+    'make_ledger': 'cost_replay',
+    'replay_cost_scenarios': 'cost_replay',
+    'replay_universe_costs': 'cost_replay',
+    'build_filter_index': 'filter_bitmask',
+    'evaluate_filter_combinations': 'filter_bitmask',
+    'evaluate_universe_combinations': 'filter_bitmask',
+    'bootstrap_strategy_returns': 'monte_carlo',
+
+    # 데이터 / 실행 인프라
+    'load_stock_data': 'local_data_store',
+    'get_stock_data_with_indicators': 'local_data_store',
+    'save_stock_data': 'local_data_store',
+    'sync_from_bigquery': 'local_data_store',
+    'build_universe_panel': 'universe_panel',
+    'run_strategy_on_panel': 'universe_panel',
+    'cache_strategy': 'result_cache',
+    'configure_result_cache': 'result_cache',
+    'generate_synthetic_universe': 'benchmark_suite',
+    'run_benchmarks': 'benchmark_suite',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """처음 사용하는 이름의 모듈을 import하고 이후에는 패키지 속성으로 바로 반환"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
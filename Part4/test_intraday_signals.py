@@ -1,5 +1,11 @@
 # 장중 필터 계산 테스트
 from momentum_portfolio_with_csv import calculate_momentum_portfolio_returns
+from volatility_breakout_with_all_filters_v4 import volatility_breakout_with_all_filters_v4
+
+# 노트북에서 실행하면 이미 로드된 stock_data를 사용하고, 스크립트로 실행하면 로컬 저장소에서 로드
+if 'stock_data' not in globals():
+    from local_data_store import load_stock_data
+    stock_data = load_stock_data(['TQQQ', 'SQQQ', 'ERX'])
 
 # 노트북에서 실행할 때 사용할 수 있는 예제 코드
 print("\n📊 장중 매매를 위한 필터 상태 계산:")
@@ -21,7 +27,7 @@ results = calculate_momentum_portfolio_returns(
 )
 
 # 결과 언패킹
-mom_daily, mom_cumulative, weights, momentum_df, today_signals, intraday_signals = results
+mom_daily, mom_cumulative, weights, momentum_df, today_signals, intraday_signals, *_ = results
 
 # 장중 신호 상세 분석
 if intraday_signals is not None:
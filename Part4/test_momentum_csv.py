@@ -2,13 +2,20 @@
 
 # momentum_portfolio_with_csv.py 에서 함수 import
 from momentum_portfolio_with_csv import calculate_momentum_portfolio_returns, analyze_momentum_calculation, visualize_momentum_process
+from performance_metrics import calculate_performance_metrics
+from volatility_breakout_with_all_filters_v4 import volatility_breakout_with_all_filters_v4
+
+# 노트북에서 실행하면 이미 로드된 stock_data를 사용하고, 스크립트로 실행하면 로컬 저장소에서 로드
+if 'stock_data' not in globals():
+    from local_data_store import load_stock_data
+    stock_data = load_stock_data(['TQQQ', 'SQQQ', 'ERX'])
 
 # 기존 노트북에서 사용하던 방식 그대로, CSV 저장 옵션만 추가
 print("\n📊 상대모멘텀 포트폴리오 전략 분석 (CSV 저장 포함):")
 print("=" * 80)
 
 # CSV 저장을 포함한 상대모멘텀 계산
-mom_daily, mom_cumulative, weights, momentum_df = calculate_momentum_portfolio_returns(
+mom_daily, mom_cumulative, weights, momentum_df, *_ = calculate_momentum_portfolio_returns(
     stock_data,  # 이미 로드된 주가 데이터
     volatility_breakout_with_all_filters_v4,  # 전략 함수
     momentum_period=20,
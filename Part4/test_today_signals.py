@@ -1,12 +1,18 @@
 # 오늘 날짜 기준 필터 계산 테스트
 from momentum_portfolio_with_csv import calculate_momentum_portfolio_returns
+from volatility_breakout_with_all_filters_v4 import volatility_breakout_with_all_filters_v4
+
+# 노트북에서 실행하면 이미 로드된 stock_data를 사용하고, 스크립트로 실행하면 로컬 저장소에서 로드
+if 'stock_data' not in globals():
+    from local_data_store import load_stock_data
+    stock_data = load_stock_data(['TQQQ', 'SQQQ', 'ERX'])
 
 # 노트북에서 실행할 때 사용할 수 있는 예제 코드
 print("\n📊 오늘 기준 상대모멘텀 및 필터 계산 테스트:")
 print("=" * 80)
 
 # calculate_today_signals=True로 설정하여 오늘의 신호 계산
-mom_daily, mom_cumulative, weights, momentum_df, today_signals = calculate_momentum_portfolio_returns(
+mom_daily, mom_cumulative, weights, momentum_df, today_signals, *_ = calculate_momentum_portfolio_returns(
     stock_data,  # 이미 로드된 주가 데이터
     volatility_breakout_with_all_filters_v4,  # 전략 함수
     momentum_period=20,
@@ -61,7 +67,7 @@ if today_signals is not None:
 # 실시간 모니터링을 위한 함수
 def monitor_today_signals(stock_data, strategy_func, **kwargs):
     """매일 실행하여 현재 상태를 모니터링하는 함수"""
-    _, _, _, _, today_signals = calculate_momentum_portfolio_returns(
+    _, _, _, _, today_signals, *_ = calculate_momentum_portfolio_returns(
         stock_data,
         strategy_func,
         calculate_today_signals=True,
@@ -2,11 +2,17 @@
 import sys
 sys.path.append('/Users/cg01-piwoo/FinvizBackTest_I/backtest/주식투자_ETF로_시작하라/Part4')
 
+import numpy as np
+
+from volatility_breakout_with_all_filters_v4 import volatility_breakout_with_all_filters_v4
 from volatility_breakout_with_all_filters_v5_fixed import volatility_breakout_with_all_filters_v5
 
-# 노트북에서 이미 정의된 calculate_atr 함수가 필요합니다.
-# 노트북에서 실행 시:
-# from volatility_breakout_with_all_filters_v5_fixed import volatility_breakout_with_all_filters_v5
+# calculate_atr는 각 전략 모듈이 atr_kernel에서 import하므로 노트북 전역 함수가 필요 없습니다.
+
+# 노트북에서 실행하면 이미 로드된 stock_data를 사용하고, 스크립트로 실행하면 로컬 저장소에서 로드
+if 'stock_data' not in globals():
+    from local_data_store import load_stock_data
+    stock_data = load_stock_data(['TQQQ', 'SQQQ', 'ERX'])
 
 # v4(당일 지표) vs v5(전일 지표) 비교 테스트
 print("\n📊 당일 지표 vs 전일 지표 기준 성과 비교:")
@@ -0,0 +1,240 @@
+import os
+
+import pandas as pd
+import numpy as np
+
+# 패널에 기본으로 담는 가격/지표 컬럼 (local_data_store.INDICATOR_COLUMNS 중 숫자형 + 로더의 파생 컬럼)
+DEFAULT_PANEL_FIELDS = ['open', 'high', 'low', 'close', 'volume', 'rsi_14', 'rsi_9_signal_line',
+                        'rsi_histogram', 'macd_line', 'macd_9_signal_line', 'macd_histogram', 'atr',
+                        'adx_14', 'pdi_14', 'mdi_14', 'chaikin_oscillator', 'chaikin_signal',
+                        'stochastic_k_line', 'stochastic_d_line', 'obv_values', 'obv_9_ma',
+                        'chaikin_yesterday']
+
+
+def _new_panel(dates, tickers, fields, values, valid, ranges, shm=None, owner=False):
+    values.flags.writeable = False
+    valid.flags.writeable = False
+    return {
+        'dates': dates,
+        'tickers': list(tickers),
+        'fields': list(fields),
+        # (필드 × 종목 × 날짜): 한 종목의 한 필드가 연속된 메모리라 구간 슬라이스가 복사 없는 view
+        'values': values,
+        'valid': valid,  # (종목 × 날짜) 해당 날짜에 종목 데이터가 있는지
+        'ranges': ranges,  # {ticker: (첫 위치, 끝 위치, 빈 날짜 없이 연속인지)}
+        'shm': shm,
+        'owner': owner
+    }
+
+
+def _ticker_ranges(tickers, valid):
+    ranges = {}
+    for j, ticker in enumerate(tickers):
+        positions = np.flatnonzero(valid[j])
+        if len(positions) == 0:
+            ranges[ticker] = (0, 0, True)
+        else:
+            start, end = int(positions[0]), int(positions[-1]) + 1
+            ranges[ticker] = (start, end, len(positions) == end - start)
+    return ranges
+
+
+def build_universe_panel(stock_data, fields=None):
+    """
+    종목별 DataFrame 딕셔너리를 공통 거래일 기준의 읽기 전용 패널로 변환
+
+    필드마다 (종목 × 날짜) 연속 배열 하나에 모든 종목을 담고, 종목별 유효 마스크를 둡니다.
+    panel_frame으로 종목 DataFrame을 복사 없이 꺼낼 수 있습니다.
+
+    Parameters:
+    - stock_data: {ticker: DataFrame} 딕셔너리
+    - fields: 담을 컬럼 목록 (기본 DEFAULT_PANEL_FIELDS 중 데이터에 있는 숫자형 컬럼)
+
+    Returns:
+    - dict: 패널 (dates, tickers, fields, values, valid, ranges)
+    """
+    tickers = list(stock_data.keys())
+    if fields is None:
+        fields = [field for field in DEFAULT_PANEL_FIELDS
+                  if any(field in df.columns for df in stock_data.values())]
+
+    # 공통 거래일: 모든 종목 날짜의 합집합
+    dates = None
+    for df in stock_data.values():
+        dates = df.index.unique() if dates is None else dates.union(df.index)
+    dates = dates.sort_values() if dates is not None else pd.DatetimeIndex([])
+
+    values = np.full((len(fields), len(tickers), len(dates)), np.nan)
+    valid = np.zeros((len(tickers), len(dates)), dtype=bool)
+    for j, ticker in enumerate(tickers):
+        df = stock_data[ticker]
+        positions = dates.get_indexer(df.index)
+        valid[j, positions] = True
+        for f, field in enumerate(fields):
+            if field in df.columns:
+                values[f, j, positions] = df[field].to_numpy(dtype=float, na_value=np.nan)
+
+    panel = _new_panel(dates, tickers, fields, values, valid, _ticker_ranges(tickers, valid))
+    print(f"✅ 유니버스 패널 생성: {len(tickers)}개 종목 × {len(dates)}일 × {len(fields)}개 필드 "
+          f"({values.nbytes / 1024 ** 2:.1f}MB)")
+    return panel
+
+
+def panel_frame(panel, ticker, fields=None):
+    """
+    패널에서 한 종목의 DataFrame 꺼내기
+
+    빈 날짜 없이 연속인 종목은 패널 메모리를 그대로 가리키는 읽기 전용 view이고,
+    중간에 빠진 날짜가 있는 종목만 유효한 행을 골라 복사합니다.
+    전략 함수는 입력을 df.copy()한 뒤 컬럼을 추가하므로 그대로 전달할 수 있습니다.
+
+    Parameters:
+    - panel: build_universe_panel / attach_universe_panel 결과
+    - ticker: 종목 코드
+    - fields: 꺼낼 컬럼 목록 (기본 패널의 전체 필드)
+
+    Returns:
+    - DataFrame: 종목의 원래 날짜 인덱스를 가진 DataFrame
+    """
+    j = panel['tickers'].index(ticker)
+    start, end, contiguous = panel['ranges'][ticker]
+    fields = panel['fields'] if fields is None else fields
+
+    if contiguous:
+        rows = slice(start, end)
+        index = panel['dates'][start:end]
+    else:
+        rows = np.flatnonzero(panel['valid'][j])
+        index = panel['dates'][rows]
+
+    columns = {field: panel['values'][panel['fields'].index(field), j, rows] for field in fields}
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def share_universe_panel(panel):
+    """
+    패널을 multiprocessing.shared_memory 블록으로 옮기기
+
+    반환된 descriptor는 작은 dict라 워커 프로세스에 그대로 넘길 수 있고,
+    워커는 attach_universe_panel(descriptor)로 복사 없이 붙습니다.
+    다 쓴 뒤에는 release_universe_panel(shared_panel)로 블록을 해제하세요.
+
+    Parameters:
+    - panel: build_universe_panel 결과
+
+    Returns:
+    - shared_panel: 공유 메모리를 사용하는 패널 (이 프로세스가 블록 소유)
+    - descriptor: 워커에 전달할 접속 정보
+    """
+    from multiprocessing import shared_memory
+
+    values, valid = panel['values'], panel['valid']
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes + valid.nbytes, 1))
+    shared_values = np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)
+    shared_valid = np.ndarray(valid.shape, dtype=bool, buffer=shm.buf, offset=values.nbytes)
+    shared_values[...] = values
+    shared_valid[...] = valid
+
+    shared_panel = _new_panel(panel['dates'], panel['tickers'], panel['fields'], shared_values,
+                              shared_valid, panel['ranges'], shm=shm, owner=True)
+    return shared_panel, _panel_descriptor(shared_panel)
+
+
+def _panel_descriptor(panel):
+    """공유 메모리 패널의 접속 정보 (블록 이름 + 메타데이터)"""
+    return {
+        'name': panel['shm'].name,
+        'shape': panel['values'].shape,
+        'dates': panel['dates'],
+        'tickers': panel['tickers'],
+        'fields': panel['fields'],
+        'ranges': panel['ranges']
+    }
+
+
+def attach_universe_panel(descriptor):
+    """
+    share_universe_panel의 descriptor로 공유 메모리 패널에 연결 (워커 프로세스용)
+
+    Parameters:
+    - descriptor: share_universe_panel이 반환한 접속 정보
+
+    Returns:
+    - dict: 읽기 전용 패널 (values/valid는 공유 메모리 view)
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=descriptor['name'])
+    shape = descriptor['shape']
+    values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    valid = np.ndarray(shape[1:], dtype=bool, buffer=shm.buf, offset=values.nbytes)
+    return _new_panel(descriptor['dates'], descriptor['tickers'], descriptor['fields'], values, valid,
+                      descriptor['ranges'], shm=shm, owner=False)
+
+
+def release_universe_panel(panel):
+    """공유 메모리 패널 연결 해제 (블록을 만든 프로세스면 블록도 삭제)"""
+    shm = panel.get('shm')
+    if shm is None:
+        return
+    panel['values'] = panel['valid'] = None
+    panel['shm'] = None
+    shm.close()
+    if panel['owner']:
+        shm.unlink()
+
+
+# 워커 프로세스에서 연결한 패널
+_WORKER_PANEL = {}
+
+
+def _init_panel_worker(descriptor):
+    """프로세스 풀 워커 초기화: 공유 메모리 패널에 연결"""
+    _WORKER_PANEL['panel'] = attach_universe_panel(descriptor)
+
+
+def _panel_worker(task):
+    ticker, strategy_func, kwargs = task
+    return ticker, strategy_func(panel_frame(_WORKER_PANEL['panel'], ticker), **kwargs)
+
+
+def run_strategy_on_panel(panel, strategy_func, tickers=None, n_jobs=1, **kwargs):
+    """
+    패널의 종목들에 전략 함수 실행
+
+    Parameters:
+    - panel: build_universe_panel 결과
+    - strategy_func: 전략 함수 (n_jobs > 1이면 모듈 최상위 함수여야 함)
+    - tickers: 실행할 종목 목록 (기본 전체)
+    - n_jobs: 프로세스 수 (기본 1: 순차 실행, -1: 전체 CPU)
+        워커는 공유 메모리 패널에 붙어 종목 데이터를 pickle로 받지 않습니다.
+    - **kwargs: 전략 함수에 전달할 추가 인자
+
+    Returns:
+    - dict: {ticker: 전략 결과 DataFrame}
+    """
+    tickers = panel['tickers'] if tickers is None else list(tickers)
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if not (bool(n_jobs) and n_jobs > 1 and len(tickers) > 1):
+        return {ticker: strategy_func(panel_frame(panel, ticker), **kwargs) for ticker in tickers}
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # 이미 공유 메모리 패널이면 그대로 사용하고, 아니면 실행 동안만 공유 메모리로 옮김
+    shared_panel = None
+    if panel.get('shm') is None:
+        shared_panel, descriptor = share_universe_panel(panel)
+    else:
+        descriptor = _panel_descriptor(panel)
+    try:
+        tasks = [(ticker, strategy_func, kwargs) for ticker in tickers]
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_panel_worker,
+                                 initargs=(descriptor,)) as executor:
+            chunksize = max(1, len(tasks) // (n_jobs * 4))
+            results = dict(executor.map(_panel_worker, tasks, chunksize=chunksize))
+    finally:
+        if shared_panel is not None:
+            release_universe_panel(shared_panel)
+
+    return {ticker: results[ticker] for ticker in tickers}
@@ -1,6 +1,10 @@
+from atr_kernel import calculate_atr
+from lean_results import compact_strategy_result
+from cost_replay import extract_trade_ledger
+
 def volatility_breakout_with_all_filters_v5(df, k=0.5, adx_threshold=20, 
                                         momentum_threshold=0.0, momentum_period=20, use_atr_filter=True, atr_period=20,
-                                        slippage=0.0, commission=0.0):
+                                        slippage=0.0, commission=0.0, lean=False, ledger=False):
     """
     변동성 돌파 + ADX/Chaikin + 절대모멘텀 + ATR 필터를 모두 적용한 전략
     (전일 기준 지표 사용 버전)
@@ -12,6 +16,12 @@ def volatility_breakout_with_all_filters_v5(df, k=0.5, adx_threshold=20,
     - 절대모멘텀: 전일 기준 20일 수익률 > momentum_threshold
     - ATR 필터: 전일 ATR > 전일 기준 ATR 20일 평균
     
+    Parameters:
+    - lean: True면 포트폴리오 계산에 필요한 컬럼만 float32/bool/Categorical로 축소해서 반환
+      (중간 shift 컬럼 제거, 대규모 유니버스 메모리 절감용)
+    - ledger: True면 비용과 무관한 매매 장부(cost_replay.extract_trade_ledger)를 반환
+      (비용 시나리오는 cost_replay.replay_cost_scenarios로 한 번에 적용)
+    
     Returns:
     - DataFrame: 백테스팅 결과
     """
@@ -134,4 +144,8 @@ def volatility_breakout_with_all_filters_v5(df, k=0.5, adx_threshold=20,
     )
     result.loc[multiple_conditions, 'entry_type'] = 'Multiple'
     
+    if ledger:
+        return extract_trade_ledger(result)
+    if lean:
+        return compact_strategy_result(result)
     return result
\ No newline at end of file
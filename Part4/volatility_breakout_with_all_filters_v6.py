@@ -0,0 +1,160 @@
+from atr_kernel import calculate_atr
+from lean_results import compact_strategy_result
+from cost_replay import extract_trade_ledger
+
+# 07_05 노트북의 volatility_breakout_with_all_filters_v6 (결과는 노트북 정의와 같음, 사용하지 않는 코드 정리 및 lean/ledger 옵션 추가)
+# 07_04 노트북들의 v6는 목표가/매수 조건이 다른 실험 버전이므로 해당 노트북 정의를 사용하세요.
+def volatility_breakout_with_all_filters_v6(df, k=0.5, adx_threshold=20, 
+                                        momentum_threshold=0.0, momentum_period=20, use_atr_filter=True, atr_period=20,
+                                        slippage=0.0, commission=0.0,target_gap=0.02, lean=False, ledger=False):
+    """
+    변동성 돌파 단독 전략 (ADX/OBV/MACD/RSI/Chaikin/절대모멘텀/ATR 필터는 계산만 하고 매수 조건에는 사용하지 않음)
+    
+    매수 조건: 변동성 돌파 (당일 고가 > 시가 + 전일 Range × K)
+    - 필터 컬럼(UPTREND, obv_filter, macd_filter, rsi_filter, GREEN4, GREEN2, momentum_filter, atr_filter)과
+      yesterday_price_validation은 결과에 남겨 두므로, 필터 조합은 filter_bitmask.evaluate_filter_combinations로
+      전략을 다시 실행하지 않고 평가할 수 있습니다.
+    - entry_type: 매수일에 켜진 ADX(UPTREND)/Chaikin(GREEN4) 필터 표시 (둘 다 꺼진 매수일은 'none')
+    
+    Parameters:
+    - df: 주가 데이터프레임 (ADX, Chaikin, ATR, 모멘텀 포함)
+    - k: K값 (기본 0.5)
+    - adx_threshold: ADX 임계값 (기본 20)
+    - momentum_threshold: 절대 모멘텀 임계값 (기본 0.0)
+    - use_atr_filter: ATR 필터 사용 여부 (기본 True)
+    - slippage: 슬리피지 비율 (기본 0.0)
+    - commission: 수수료 비율 (기본 0.0)
+    - target_gap: 사용하지 않음 (07_05 노트북 시그니처 호환용)
+    - lean: True면 포트폴리오 계산에 필요한 컬럼만 float32/bool/Categorical로 축소해서 반환
+    - ledger: True면 비용과 무관한 매매 장부(cost_replay.extract_trade_ledger)를 반환
+    
+    Returns:
+    - DataFrame: 백테스팅 결과
+    """
+    result = df.copy()
+    
+    # 전일 Range 계산
+    result['prev_range'] = (result['high'] - result['low']).shift(1)
+    
+    # 진입가 계산 (당일 시가 + 전일 Range × K)
+    result['target_price'] = result['open'].shift(0) + (result['prev_range'] * k)
+    
+    # 변동성 돌파 신호
+    result['volatility_signal'] = result['high'].shift(0) > result['target_price']
+    
+    # ADX 필터 조건 (ADX > threshold & +DI > -DI)
+    result['UPTREND'] = (
+        # (result['close'].shift(1) < result['target_price']) &
+        (result['adx_14'].shift(1) > adx_threshold) & 
+        (result['pdi_14'].shift(1) > result['mdi_14'].shift(1))
+    )
+    
+    # OBV의 전일 값 계산
+    # OBV 필터 조건 (ADX < threshold & (OBV > Signal OR OBV > Yesterday))
+    result['obv_yesterday'] = result['obv_values'].shift(2)
+    result['obv_filter'] = (
+        # (result['close'].shift(1) < result['target_price']) &
+        (result['adx_14'].shift(1) > adx_threshold) & 
+         (result['obv_values'].shift(1) > result['obv_yesterday'])
+    )
+
+    # MACD 필터 조건
+    result['macd_yesterday'] = result['macd_histogram'].shift(2)
+    result['macd_filter'] = (
+        # (result['close'].shift(1) < result['target_price']) &
+        (result['adx_14'].shift(1) < adx_threshold) & 
+         (result['macd_histogram'].shift(1) > result['macd_yesterday'])
+    )
+
+    # RSI 필터 조건
+    result['rsi_yesterday'] = result['rsi_histogram'].shift(2)
+    result['rsi_filter'] = (
+        # (result['close'].shift(1) < result['target_price']) &
+        (result['adx_14'].shift(1) < adx_threshold) & 
+         (result['rsi_histogram'].shift(1) > result['rsi_yesterday'])
+    )
+
+    # GREEN4 : Chaikin의 전일 값 계산
+    # GREEN4 : Chaikin 필터 조건 (ADX < threshold & (Chaikin > Signal OR Chaikin > Yesterday))
+    result['chaikin_yesterday'] = result['chaikin_oscillator'].shift(2)    
+    result['GREEN4'] = (
+        # (result['close'].shift(1) < result['target_price']) &
+        (result['adx_14'].shift(1) > adx_threshold) &
+        # ((result['chaikin_oscillator'] > result['chaikin_signal']) | 
+         (result['chaikin_oscillator'].shift(1) > result['chaikin_yesterday'])
+    )
+    
+    # 절대 모멘텀 필터 (20일 수익률 > threshold)    
+    # 절대 모멘텀 계산 (20일 수익률)
+    result['momentum_20'] = result['close'].shift(1).pct_change(periods=momentum_period)
+    result['momentum_filter'] = result['momentum_20'] > momentum_threshold
+    
+    # ATR 필터 (ATR > 20일 평균)
+    # ATR 계산 추가
+    result['atr'] = calculate_atr(result, atr_period)
+    result['atr_ma'] = result['atr'].rolling(window=atr_period).mean()
+
+    # ATR 필터 미사용 시 항상 True
+    if use_atr_filter:
+        result['atr_filter'] = result['atr'].shift(1) > result['atr_ma'].shift(1)
+    else:
+        result['atr_filter'] = True  
+
+
+    # GREEN2 : UPTREND & OBV DIFF > 0
+    result['GREEN2'] = (
+        # (result['close'].shift(1) < result['target_price']) &
+        (result['adx_14'].shift(1) > adx_threshold) & 
+        (result['pdi_14'].shift(1) > result['mdi_14'].shift(1)) &
+        ((result['obv_values'] - result['obv_9_ma']).shift(1) > 0)
+    )    
+
+    # 종가가 목표과를 초과해야한다. 그러나, 목표가가 너무 낮을 경우 매수가 불가능하다. 때문에, target_gap을 설정한다.
+    result['yesterday_price_validation'] = (
+            (result['close'].shift(1) < result['target_price']) 
+            # ((result['close'].shift(1) - result['target_price'])/result['close'].shift(1) <= target_gap)
+        )
+
+    # 최종 매수 신호 (변동성 돌파만 사용, 필터는 매수 조건에 포함하지 않음)
+    result['buy_signal'] = result['volatility_signal']
+    
+    # 매수가와 매도가 (슬리피지 적용)
+    result['buy_price'] = result['target_price'] * (1 + slippage)
+    result['sell_price'] = result['open'].shift(-1) * (1 - slippage) if slippage > 0 else result['open'].shift(-1)
+    
+    # 수익률 계산 (수수료 포함)
+    result['returns'] = 0.0
+    buy_condition = result['buy_signal'] == True
+
+
+    
+    if commission > 0:
+        # 수수료를 고려한 수익률
+        result.loc[buy_condition, 'returns'] = (
+            (result.loc[buy_condition, 'sell_price'] - result.loc[buy_condition, 'buy_price']) / 
+            result.loc[buy_condition, 'buy_price'] - (2 * commission)
+        )
+    else:
+        # 수수료 없는 수익률
+        result.loc[buy_condition, 'returns'] = (
+            (result.loc[buy_condition, 'sell_price'] - result.loc[buy_condition, 'buy_price']) / 
+            result.loc[buy_condition, 'buy_price']
+        )
+    
+    # 누적 수익률 계산
+    result['cumulative_returns'] = (1 + result['returns']).cumprod()
+    
+    # Buy & Hold 수익률
+    result['buy_hold_returns'] = result['close'] / result['close'].iloc[0]
+    
+    # 어떤 필터로 진입했는지 표시
+    result['entry_type'] = 'none'
+    result.loc[result['buy_signal'] & result['UPTREND'], 'entry_type'] = 'ADX'
+    result.loc[result['buy_signal'] & result['GREEN4'], 'entry_type'] = 'Chaikin'
+    result.loc[result['buy_signal'] & result['UPTREND'] & result['GREEN4'], 'entry_type'] = 'Both'
+    
+    if ledger:
+        return extract_trade_ledger(result)
+    if lean:
+        return compact_strategy_result(result)
+    return result
@@ -0,0 +1,264 @@
+import itertools
+import os
+
+import pandas as pd
+import numpy as np
+
+from parameter_sweep import prepare_sweep_inputs, daily_strategy_returns
+from momentum_portfolio_engine import rebalance_returns_from_arrays
+from performance_metrics import calculate_performance_metrics
+
+
+def _calmar(metrics):
+    """Calmar 비율 = 연환산 수익률 / |MDD|"""
+    if metrics['mdd'] < 0:
+        return metrics['annual_return'] / abs(metrics['mdd'])
+    return float('inf') if metrics['annual_return'] > 0 else 0
+
+
+# 학습 구간 파라미터 선택 기준 (calculate_performance_metrics 결과 → 점수, 클수록 좋음)
+OBJECTIVES = {
+    'cagr': lambda metrics: metrics['annual_return'],
+    'sharpe': lambda metrics: metrics['sharpe_ratio'],
+    'calmar': _calmar
+}
+
+
+def build_walk_forward_panel(stock_data, k_values=(0.3, 0.5, 0.7), adx_thresholds=(15, 20, 25),
+                             slippage=0.0, commission=0.0):
+    """
+    종목별 전일 기준 지표를 한 번만 계산해 (K, ADX) 조합별 일별 수익률 패널 생성
+
+    모든 윈도우가 이 패널을 잘라 쓰므로 윈도우마다 지표/shift를 다시 계산하지 않습니다.
+
+    Parameters:
+    - stock_data: 종목 데이터 딕셔너리
+    - k_values: K값 목록
+    - adx_thresholds: ADX 임계값 목록
+    - slippage: 슬리피지
+    - commission: 수수료
+
+    Returns:
+    - dict: common_dates, tickers, k_values, adx_thresholds,
+            close (날짜 × 종목), returns (K × ADX × 날짜 × 종목, NaN/inf는 0)
+    """
+    k_values = list(k_values)
+    adx_thresholds = list(adx_thresholds)
+    tickers = list(stock_data.keys())
+
+    # 공통 날짜 (calculate_momentum_portfolio_returns와 같은 교집합)
+    all_dates = None
+    for df in stock_data.values():
+        all_dates = df.index.unique() if all_dates is None else all_dates.intersection(df.index)
+    common_dates = all_dates.sort_values() if all_dates is not None else pd.Index([])
+
+    close = np.empty((len(common_dates), len(tickers)))
+    returns = np.empty((len(k_values), len(adx_thresholds), len(common_dates), len(tickers)))
+    for j, ticker in enumerate(tickers):
+        inputs = prepare_sweep_inputs(stock_data[ticker])
+        positions = inputs['index'].get_indexer(common_dates)
+        close[:, j] = inputs['close'][positions]
+        returns[:, :, :, j] = daily_strategy_returns(inputs, k_values, adx_thresholds,
+                                                     slippage, commission)[:, :, positions]
+    returns[~np.isfinite(returns)] = 0.0
+
+    return {
+        'common_dates': common_dates,
+        'tickers': tickers,
+        'k_values': k_values,
+        'adx_thresholds': adx_thresholds,
+        'close': close,
+        'returns': returns
+    }
+
+
+def walk_forward_windows(n_dates, train_days, test_days, step_days=None, anchored=False):
+    """
+    학습/검증 구간 위치 목록 생성
+
+    검증 구간은 다음 윈도우의 검증 시작 전까지만 사용하므로 이어 붙인 구간이 겹치지 않습니다.
+
+    Parameters:
+    - n_dates: 전체 날짜 수
+    - train_days: 학습 구간 길이
+    - test_days: 검증 구간 길이
+    - step_days: 윈도우 이동 간격 (기본 test_days)
+    - anchored: True면 학습 구간 시작을 처음으로 고정 (확장 윈도우)
+
+    Returns:
+    - list: (train_start, train_end, test_start, test_end) 위치 튜플 (end 미포함)
+    """
+    step_days = test_days if step_days is None else step_days
+    if train_days <= 0 or test_days <= 0 or step_days <= 0:
+        raise ValueError("train_days, test_days, step_days는 1 이상이어야 합니다.")
+
+    windows = []
+    for train_end in range(train_days, n_dates, step_days):
+        train_start = 0 if anchored else train_end - train_days
+        test_end = min(train_end + test_days, train_end + step_days, n_dates)
+        windows.append((train_start, train_end, train_end, test_end))
+    return windows
+
+
+def _resolve_objective(objective):
+    if callable(objective):
+        return objective
+    if objective not in OBJECTIVES:
+        raise ValueError(f"지원하지 않는 objective입니다: {objective} (가능: {', '.join(OBJECTIVES)})")
+    return OBJECTIVES[objective]
+
+
+def _evaluate_window(close, returns, window, momentum_periods, rebalance_period, top_n, objective):
+    """학습 구간에서 모든 조합을 평가하고 최적 조합을 검증 구간에 적용"""
+    train_start, train_end, test_start, test_end = window
+    score_func = _resolve_objective(objective)
+    n_k, n_adx = returns.shape[:2]
+
+    scores = np.full((n_k, n_adx, len(momentum_periods)), -np.inf)
+    for m, momentum_period in enumerate(momentum_periods):
+        # 모멘텀 순위는 종가로만 정해지므로 (K, ADX) 전체를 한 번에 계산
+        train = rebalance_returns_from_arrays(close, returns, momentum_period, rebalance_period,
+                                              top_n, train_start, train_end)
+        for k, a in itertools.product(range(n_k), range(n_adx)):
+            train_returns = pd.Series(train[k, a])
+            metrics = calculate_performance_metrics(train_returns, (1 + train_returns).cumprod() - 1)
+            score = score_func(metrics)
+            if score is not None and not np.isnan(score):
+                scores[k, a, m] = score
+
+    # 동점이면 그리드 순서(K → ADX → 모멘텀 기간)상 앞의 조합
+    k, a, m = np.unravel_index(int(np.argmax(scores)), scores.shape)
+    test = rebalance_returns_from_arrays(close, returns[k, a], momentum_periods[m], rebalance_period,
+                                         top_n, test_start, test_end)
+    return (int(k), int(a), int(m)), float(scores[k, a, m]), test
+
+
+# 워커 프로세스에서 공유 메모리로 붙은 패널 배열
+_WORKER_ARRAYS = {}
+
+
+def _init_window_worker(close_name, close_shape, returns_name, returns_shape):
+    """프로세스 풀 워커 초기화: 부모가 만든 공유 메모리 블록에 연결"""
+    from multiprocessing import shared_memory
+
+    close_shm = shared_memory.SharedMemory(name=close_name)
+    returns_shm = shared_memory.SharedMemory(name=returns_name)
+    _WORKER_ARRAYS['shm'] = (close_shm, returns_shm)
+    _WORKER_ARRAYS['close'] = np.ndarray(close_shape, dtype=np.float64, buffer=close_shm.buf)
+    _WORKER_ARRAYS['returns'] = np.ndarray(returns_shape, dtype=np.float64, buffer=returns_shm.buf)
+
+
+def _window_worker(task):
+    window, momentum_periods, rebalance_period, top_n, objective = task
+    return _evaluate_window(_WORKER_ARRAYS['close'], _WORKER_ARRAYS['returns'], window,
+                            momentum_periods, rebalance_period, top_n, objective)
+
+
+def _parallel_windows(close, returns, tasks, n_jobs):
+    """윈도우별 평가를 프로세스 풀에서 실행 (패널 배열은 공유 메모리로 한 번만 전달)"""
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    close_shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    returns_shm = shared_memory.SharedMemory(create=True, size=max(returns.nbytes, 1))
+    try:
+        shared_close = np.ndarray(close.shape, dtype=np.float64, buffer=close_shm.buf)
+        shared_returns = np.ndarray(returns.shape, dtype=np.float64, buffer=returns_shm.buf)
+        shared_close[...] = close
+        shared_returns[...] = returns
+
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_window_worker,
+                                 initargs=(close_shm.name, close.shape, returns_shm.name, returns.shape)) as executor:
+            results = list(executor.map(_window_worker, tasks))
+        del shared_close, shared_returns
+    finally:
+        close_shm.close()
+        close_shm.unlink()
+        returns_shm.close()
+        returns_shm.unlink()
+
+    return results
+
+
+def walk_forward_optimization(stock_data, train_days=252, test_days=63, step_days=None,
+                              k_values=(0.3, 0.5, 0.7), adx_thresholds=(15, 20, 25),
+                              momentum_periods=(20,), rebalance_period=30, top_n=3,
+                              objective='sharpe', slippage=0.0, commission=0.0,
+                              anchored=False, n_jobs=1, panel=None):
+    """
+    상대모멘텀 포트폴리오(volatility_breakout_with_all_filters_v5 기반) 워크포워드 최적화
+
+    학습 구간에서 (K, ADX 임계값, 모멘텀 기간) 조합 중 objective가 가장 큰 조합을 고르고,
+    바로 다음 검증 구간에 적용한 수익률을 이어 붙여 표본 외(OOS) 수익 곡선을 만듭니다.
+    각 구간은 시작일부터 rebalance_period마다 리밸런싱하며, 모멘텀 lookback은 구간 이전 데이터도 사용합니다.
+
+    Parameters:
+    - stock_data: 종목 데이터 딕셔너리
+    - train_days: 학습 구간 길이 (기본 252일)
+    - test_days: 검증 구간 길이 (기본 63일)
+    - step_days: 윈도우 이동 간격 (기본 test_days)
+    - k_values: K값 목록
+    - adx_thresholds: ADX 임계값 목록
+    - momentum_periods: 모멘텀 계산 기간 목록
+    - rebalance_period: 리밸런싱 주기 (기본 30일)
+    - top_n: 상위 n개 종목 선택 (기본 3개)
+    - objective: 'sharpe', 'cagr', 'calmar' 또는 calculate_performance_metrics 결과 dict를 받아 점수를 반환하는 함수
+        (n_jobs > 1이면 모듈 최상위 함수여야 함)
+    - slippage: 슬리피지
+    - commission: 수수료
+    - anchored: True면 학습 구간 시작을 처음으로 고정 (확장 윈도우)
+    - n_jobs: 윈도우를 평가할 프로세스 수 (기본 1: 순차 실행, -1: 전체 CPU)
+    - panel: build_walk_forward_panel 결과 (여러 설정으로 반복 실행할 때 재사용)
+
+    Returns:
+    - oos_returns: 이어 붙인 검증 구간 일일 수익률 Series
+    - oos_cumulative: OOS 누적 수익률 Series ((1 + r).cumprod())
+    - windows_df: 윈도우별 구간, 선택된 파라미터, 학습 점수, 검증 성과 DataFrame
+    """
+    if panel is None:
+        panel = build_walk_forward_panel(stock_data, k_values, adx_thresholds, slippage, commission)
+    momentum_periods = list(momentum_periods)
+    _resolve_objective(objective)
+
+    common_dates = panel['common_dates']
+    windows = walk_forward_windows(len(common_dates), train_days, test_days, step_days, anchored)
+    if not windows:
+        print(f"⚠️  공통 날짜({len(common_dates)}일)가 학습 구간({train_days}일)보다 짧아 윈도우가 없습니다.")
+        empty = pd.Series(dtype=float)
+        return empty, empty, pd.DataFrame()
+
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    tasks = [(window, momentum_periods, rebalance_period, top_n, objective) for window in windows]
+    if bool(n_jobs) and n_jobs > 1 and len(windows) > 1:
+        results = _parallel_windows(panel['close'], panel['returns'], tasks, n_jobs)
+    else:
+        results = [_evaluate_window(panel['close'], panel['returns'], *task) for task in tasks]
+
+    records = []
+    segments = []
+    for (train_start, train_end, test_start, test_end), ((k, a, m), score, test) in zip(windows, results):
+        test_returns = pd.Series(test, index=common_dates[test_start:test_end], dtype=float)
+        segments.append(test_returns)
+        test_metrics = calculate_performance_metrics(test_returns, (1 + test_returns).cumprod() - 1)
+        records.append({
+            'train_start': common_dates[train_start],
+            'train_end': common_dates[train_end - 1],
+            'test_start': common_dates[test_start],
+            'test_end': common_dates[test_end - 1],
+            'k': panel['k_values'][k],
+            'adx_threshold': panel['adx_thresholds'][a],
+            'momentum_period': momentum_periods[m],
+            'train_score': score,
+            'test_total_return': test_metrics['total_return'],
+            'test_sharpe_ratio': test_metrics['sharpe_ratio'],
+            'test_mdd': test_metrics['mdd']
+        })
+
+    oos_returns = pd.concat(segments)
+    oos_cumulative = (1 + oos_returns).cumprod()
+    windows_df = pd.DataFrame(records)
+
+    print(f"✅ 워크포워드 완료: {len(windows)}개 윈도우, OOS {len(oos_returns)}일, "
+          f"누적 수익률 {(oos_cumulative.iloc[-1] - 1) * 100:.2f}%")
+    return oos_returns, oos_cumulative, windows_df